@@ -0,0 +1,117 @@
+"""
+Pytest configuration for the page-flow benchmarks
+Serves the demo site locally and provides the benchmark fixture
+"""
+import pytest
+
+from utils.benchmark import DEFAULT_BASELINE_PATH, DEFAULT_RESULTS_PATH, BenchmarkSession
+
+
+def pytest_addoption(parser):
+    """
+    Add benchmark options
+    """
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--benchmark-warmup",
+        action="store",
+        type=int,
+        default=2,
+        help="Untimed runs of each flow before measuring (default: 2).",
+    )
+    group.addoption(
+        "--benchmark-repetitions",
+        action="store",
+        type=int,
+        default=10,
+        help="Timed runs of each flow (default: 10).",
+    )
+    group.addoption(
+        "--benchmark-confidence",
+        action="store",
+        type=float,
+        default=0.99,
+        help="Confidence required to fail a flow as slower than its baseline (default: 0.99).",
+    )
+    group.addoption(
+        "--benchmark-min-change",
+        action="store",
+        type=float,
+        default=0.05,
+        help="Minimum relative slowdown of the mean to fail a flow (default: 0.05).",
+    )
+    group.addoption(
+        "--benchmark-baseline",
+        action="store",
+        default=DEFAULT_BASELINE_PATH,
+        help=f"JSON file of the baselines (default: {DEFAULT_BASELINE_PATH}).",
+    )
+    group.addoption(
+        "--benchmark-json",
+        action="store",
+        default=DEFAULT_RESULTS_PATH,
+        help=f"JSON file receiving the results (default: {DEFAULT_RESULTS_PATH}).",
+    )
+    group.addoption(
+        "--benchmark-save",
+        action="store_true",
+        default=False,
+        help="Store this run's results as the new baselines instead of comparing.",
+    )
+    group.addoption(
+        "--benchmark-require-baseline",
+        action="store_true",
+        default=False,
+        help="Fail flows that have no baseline instead of warning.",
+    )
+
+
+def pytest_configure(config):
+    """
+    Benchmark against the bundled demo site and register the benchmark session
+    """
+    # Always measure the local demo site, never a shared remote storefront
+    config.option.serve_demo_site = True
+    config.pluginmanager.register(
+        BenchmarkSession(
+            baseline_path=config.getoption("--benchmark-baseline"),
+            results_path=config.getoption("--benchmark-json"),
+            warmup=config.getoption("--benchmark-warmup"),
+            repetitions=config.getoption("--benchmark-repetitions"),
+            confidence=config.getoption("--benchmark-confidence"),
+            min_change=config.getoption("--benchmark-min-change"),
+            save=config.getoption("--benchmark-save"),
+            require_baseline=config.getoption("--benchmark-require-baseline"),
+        ),
+        "benchmark_session",
+    )
+
+
+@pytest.fixture
+def benchmark(request, browser_name):
+    """
+    Fixture measuring a flow and failing the test when it regressed
+
+    Returns:
+        Function taking a flow name, the timed callable and an optional untimed setup callable
+    """
+    session = request.config.pluginmanager.get_plugin("benchmark_session")
+
+    def run(name, flow, setup=None):
+        result = session.measure(name, browser_name, flow, setup)
+        request.node.user_properties.append(("benchmark_mean", round(result["mean"], 4)))
+        if result["baseline"] is None and not session.save:
+            message = f"{name} has no baseline in {session.baseline_path}, it was not compared"
+            if session.require_baseline:
+                pytest.fail(message, pytrace=False)
+            request.node.warn(pytest.PytestWarning(message))
+        if result["regressed"]:
+            pytest.fail(
+                f"{name} regressed: mean {result['mean']:.3f}s vs baseline "
+                f"{result['baseline']['mean']:.3f}s "
+                f"({result['change']:+.1%}, p={result['p_value']:.4f})",
+                pytrace=False,
+            )
+        return result
+
+    return run
@@ -0,0 +1,94 @@
+"""
+Page-flow benchmarks
+Times the suite's canonical flows against the local demo site
+"""
+import pytest
+
+from pages.cart_page import CartPage
+from pages.checkout_page import CheckoutPage
+from pages.login_page import LoginPage
+from pages.search_page import SearchPage
+from utils import config
+from utils.browser_pool import reset_driver
+from utils.config import PRODUCT_NAME, TEST_PASSWORD, TEST_USERNAME
+
+BILLING_DETAILS = {
+    'first_name': 'John',
+    'last_name': 'Doe',
+    'email': 'john.doe@example.com',
+    'telephone': '1234567890',
+    'address': '123 Test Street',
+    'city': 'Test City',
+    'postcode': '12345',
+    'country': 'United States',
+    'region': 'California'
+}
+
+
+def open_product(driver):
+    """
+    Start from a fresh session on the product detail page
+    """
+    reset_driver(driver)
+    search_page = SearchPage(driver)
+    search_page.search(PRODUCT_NAME)
+    search_page.click_product(PRODUCT_NAME)
+
+
+@pytest.mark.benchmark
+class TestFlowBenchmarks:
+    """
+    Benchmarks of the canonical user flows
+    Each flow runs after warm-up for a fixed number of repetitions from a fresh session
+    """
+
+    def test_homepage_load(self, driver, benchmark):
+        benchmark(
+            "homepage_load",
+            lambda: driver.get(config.BASE_URL),
+            setup=lambda: driver.get("about:blank"),
+        )
+
+    def test_search(self, driver, benchmark):
+        search_page = SearchPage(driver)
+        benchmark(
+            "search",
+            lambda: search_page.search(PRODUCT_NAME),
+            setup=lambda: reset_driver(driver),
+        )
+
+    def test_cart_add_update_remove(self, driver, benchmark):
+        cart_page = CartPage(driver)
+
+        def flow():
+            cart_page.add_product_to_cart()
+            cart_page.open_cart()
+            cart_page.update_quantity(2)
+            cart_page.remove_item_from_cart()
+
+        benchmark("cart_add_update_remove", flow, setup=lambda: open_product(driver))
+
+    def test_complete_checkout(self, driver, benchmark):
+        cart_page = CartPage(driver)
+        checkout_page = CheckoutPage(driver)
+
+        def setup():
+            open_product(driver)
+            cart_page.add_product_to_cart()
+            cart_page.open_cart()
+            cart_page.click_checkout()
+
+        benchmark(
+            "complete_checkout",
+            lambda: checkout_page.complete_checkout(billing_details=BILLING_DETAILS),
+            setup=setup,
+        )
+
+    def test_login(self, driver, benchmark):
+        login_page = LoginPage(driver)
+
+        def setup():
+            reset_driver(driver)
+            login_page.navigate_to_login()
+
+        benchmark("login", lambda: login_page.login(TEST_USERNAME, TEST_PASSWORD), setup=setup)
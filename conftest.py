@@ -3,12 +3,63 @@ Pytest configuration file
 Contains fixtures and test setup/teardown
 """
 import os
+import warnings
 
 import pytest
-from selenium.webdriver.remote.webdriver import WebDriver
 
-from utils.config import BROWSER, HEADLESS
+from utils import config as suite_config
+from utils.artifact_store import ArtifactStore
+from utils.artifacts import (
+    ArtifactWriter,
+    artifact_stem,
+    attach_references,
+    capture_failure,
+    format_reference,
+)
+from utils.browser_memory import BrowserMemoryTracker
+from utils.browser_pool import (
+    BrowserPool,
+    cleanup_slots,
+    parse_browser_limits,
+    parse_browser_list,
+    run_id,
+    worker_id,
+)
+from utils.browser_report import (
+    build_matrix,
+    format_html_summary,
+    format_matrix,
+    teardown_properties,
+)
+from utils.cart_service import CART_COOKIE, CartClient
+from utils.catalogue import Catalogue
+from utils.datasets import DEFAULT_DATA_DIR, DEFAULT_MAX_CASES, open_dataset, select_cases
+from utils.demo_server import CACHE_LONG, CACHE_POLICIES, DemoSiteServer
 from utils.driver_setup import create_driver, quit_driver
+from utils.fault_proxy import DEFAULT_PROFILE, PROFILES, FaultProxy
+from utils.flakiness import DEFAULT_HISTORY_PATH, FlakinessStore, FlakinessTracker
+from utils.logger import (
+    flush_logging,
+    get_logger,
+    merge_logs,
+    run_log_dir,
+    set_log_context,
+    setup_logger,
+)
+from utils.method_timing import DEFAULT_DB_PATH, MethodTimingRecorder
+from utils.sharding import (
+    DEFAULT_DURATIONS_PATH,
+    DurationRecorder,
+    load_durations,
+    parse_shard,
+    partition,
+)
+from utils.stages import ABORT, SHRINK, StagedExecution
+from utils.telemetry import TelemetryPlugin
+from utils.screencast import DEFAULT_SECONDS, ScreencastRecorder
+from utils.state_guard import diff_state, snapshot_state
+from utils.web_vitals import WebVitalsCollector
+from utils.webdriver_trace import WebDriverTracer
 
 
 def pytest_addoption(parser):
@@ -19,32 +70,603 @@ def pytest_addoption(parser):
         "--browser",
         action="store",
         default=None,
-        help="Browser to use for tests (chrome, firefox, edge). Overrides BROWSER env var.",
+        help="Browser(s) to use for tests, comma separated (e.g. chrome,firefox,edge). "
+        "Overrides BROWSER env var.",
     )
+    parser.addoption(
+        "--serve-demo-site",
+        action="store_true",
+        default=suite_config.SERVE_DEMO_SITE,
+        help="Serve demo-site from a threaded in-process server per worker and point "
+        "BASE_URL at it. Also enabled by SERVE_DEMO_SITE=True.",
+    )
+    parser.addoption(
+        "--demo-site-cache",
+        action="store",
+        choices=CACHE_POLICIES,
+        default=CACHE_LONG,
+        help="Caching of the served demo site: long (cache assets, revalidate HTML), "
+        "revalidate (ETag only) or none (no validators, for before/after comparison).",
+    )
+    parser.addoption(
+        "--demo-site-watch",
+        action="store_true",
+        default=False,
+        help="Reload demo site files changed on disk while serving.",
+    )
+    parser.addoption(
+        "--catalogue-size",
+        action="store",
+        type=int,
+        default=suite_config.CATALOGUE_SIZE,
+        help="Number of products in the synthetic catalogue served with --serve-demo-site "
+        "(default: CATALOGUE_SIZE env var, 0 = the 8 demo products).",
+    )
+    parser.addoption(
+        "--catalogue-seed",
+        action="store",
+        type=int,
+        default=suite_config.CATALOGUE_SEED,
+        help="Seed of the synthetic catalogue (default: CATALOGUE_SEED env var).",
+    )
+    parser.addoption(
+        "--network-profile",
+        action="store",
+        default=suite_config.NETWORK_PROFILE,
+        help=f"Put a fault-injection proxy in front of BASE_URL: one of {', '.join(PROFILES)} "
+        "or a JSON profile file (default: NETWORK_PROFILE env var, none).",
+    )
+    parser.addoption(
+        "--network-seed",
+        action="store",
+        type=int,
+        default=0,
+        help="Seed of the injected latency and errors.",
+    )
+    parser.addoption(
+        "--browser-limit",
+        action="store",
+        default=None,
+        help="Max concurrent tests per browser across all workers (e.g. chrome=4,firefox=2).",
+    )
+    parser.addoption(
+        "--browser-pool-size",
+        action="store",
+        type=int,
+        default=0,
+        help="Idle drivers kept per browser and worker for reuse (0 = new driver per test).",
+    )
+    parser.addoption(
+        "--shard",
+        action="store",
+        default=None,
+        help="Run only shard i of N, balanced by recorded durations (e.g. 2/4).",
+    )
+    parser.addoption(
+        "--durations-path",
+        action="store",
+        default=DEFAULT_DURATIONS_PATH,
+        help="Test durations history used for sharding.",
+    )
+    parser.addoption(
+        "--store-durations",
+        action="store_true",
+        default=False,
+        help="Record test durations after the run.",
+    )
+    parser.addoption(
+        "--durations-output",
+        action="store",
+        default=None,
+        help="Where --store-durations writes (defaults to --durations-path).",
+    )
+    parser.addoption(
+        "--staged",
+        action="store_true",
+        default=False,
+        help="Run smoke tests first and gate the regression stage on their failure rate.",
+    )
+    parser.addoption(
+        "--smoke-failure-threshold",
+        action="store",
+        type=float,
+        default=0.5,
+        help="Smoke failure rate above which the regression stage is gated (default: 0.5).",
+    )
+    parser.addoption(
+        "--smoke-abort-mode",
+        action="store",
+        choices=[ABORT, SHRINK],
+        default=ABORT,
+        help="Skip the whole regression stage (abort) or keep one test per class (shrink).",
+    )
+    parser.addoption(
+        "--track-flaky",
+        action="store_true",
+        default=False,
+        help="Record pass/fail history, retry known-flaky tests and quarantine chronic ones.",
+    )
+    parser.addoption(
+        "--flaky-history",
+        action="store",
+        default=DEFAULT_HISTORY_PATH,
+        help="Pass/fail history file used by --track-flaky.",
+    )
+    parser.addoption(
+        "--flaky-retries",
+        action="store",
+        type=int,
+        default=2,
+        help="Extra in-session attempts for known-flaky tests (default: 2).",
+    )
+    parser.addoption(
+        "--flaky-retry-threshold",
+        action="store",
+        type=float,
+        default=0.1,
+        help="Flakiness score from which a test is retried (default: 0.1).",
+    )
+    parser.addoption(
+        "--quarantine-threshold",
+        action="store",
+        type=float,
+        default=0.4,
+        help="Flakiness score from which a test is quarantined (default: 0.4).",
+    )
+    parser.addoption(
+        "--readonly-guard",
+        action="store",
+        choices=["fail", "isolate"],
+        default="fail",
+        help="What to do when a readonly test mutates browser state: fail it, or only "
+        "isolate it by discarding the shared driver (default: fail).",
+    )
+    parser.addoption(
+        "--trace-webdriver",
+        action="store",
+        default=None,
+        metavar="DIR",
+        help="Trace WebDriver commands per page-object method and write a flamegraph "
+        "(.folded) and a Chrome trace (.trace.json) per test to DIR.",
+    )
+    parser.addoption(
+        "--artifact-store",
+        action="store",
+        default=None,
+        metavar="DIR",
+        help="Store failure screenshots, DOM dumps and console logs once per distinct content "
+        "in the content-addressed store DIR instead of screenshots/.",
+    )
+    parser.addoption(
+        "--telemetry-port",
+        action="store",
+        type=int,
+        default=None,
+        help="Serve live progress of the run (JSON at /, Prometheus metrics at /metrics) "
+        "on this local port, 0 picks a free one.",
+    )
+    parser.addoption(
+        "--screencast",
+        action="store_true",
+        default=False,
+        help="Keep the last seconds of every Chrome/Edge test in memory and save them as "
+        "a video next to the failure artifacts when the test fails.",
+    )
+    parser.addoption(
+        "--screencast-seconds",
+        action="store",
+        type=float,
+        default=DEFAULT_SECONDS,
+        help=f"Length of the saved failure video (default: {DEFAULT_SECONDS:.0f}).",
+    )
+    parser.addoption(
+        "--track-memory",
+        action="store_true",
+        default=False,
+        help="Sample the RSS/PSS of each browser's process tree around every test and "
+        "report the tests that grow it the most.",
+    )
+    parser.addoption(
+        "--memory-recycle-mb",
+        action="store",
+        type=float,
+        default=None,
+        help="With --track-memory, restart a pooled browser once its PSS has grown by "
+        "this many MiB since it started.",
+    )
+    parser.addoption(
+        "--web-vitals",
+        action="store_true",
+        default=False,
+        help="Collect Navigation Timing, paint, LCP and CLS metrics of every page the page "
+        "objects navigate to and report them per page.",
+    )
+    parser.addoption(
+        "--dataset-dir",
+        action="store",
+        default=DEFAULT_DATA_DIR,
+        help="Directory the @pytest.mark.dataset files are read from (default: data/), "
+        "e.g. a directory of generated 100k-case sweeps.",
+    )
+    parser.addoption(
+        "--dataset-sample",
+        action="store",
+        type=int,
+        default=None,
+        help="Run this many randomly drawn rows of each dataset instead of the marker's "
+        "sample (0 runs every row).",
+    )
+    parser.addoption(
+        "--dataset-seed",
+        action="store",
+        type=int,
+        default=0,
+        help="Seed of --dataset-sample, the same seed runs the same rows.",
+    )
+    parser.addoption(
+        "--dataset-max-cases",
+        action="store",
+        type=int,
+        default=DEFAULT_MAX_CASES,
+        help="Refuse to collect more rows of one dataset per node than this; use "
+        f"--dataset-sample or --shard for larger files (default: {DEFAULT_MAX_CASES}, 0 for "
+        "no limit).",
+    )
+    parser.addoption(
+        "--time-methods",
+        action="store_true",
+        default=False,
+        help="Time every page-object method call and append the timings to --timing-db.",
+    )
+    parser.addoption(
+        "--timing-db",
+        action="store",
+        default=DEFAULT_DB_PATH,
+        help=f"SQLite database of page-object method timings (default: {DEFAULT_DB_PATH}).",
+    )
+    parser.addoption(
+        "--timing-commit",
+        action="store",
+        default=None,
+        help="Commit the timings are recorded under (default: CI commit variable or git HEAD).",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    """
+    Parametrize driver-based tests across every browser given to --browser
+    and dataset-driven tests over the rows of their dataset
+    """
+    marker = metafunc.definition.get_closest_marker("dataset")
+    if marker and "dataset_row" in metafunc.fixturenames:
+        config = metafunc.config
+        dataset = open_dataset(marker.args[0], config.getoption("--dataset-dir"))
+        sample = config.getoption("--dataset-sample")
+        shard = config.getoption("--shard")
+        # Only the row numbers are collected, dataset_row reads the row at setup
+        cases = select_cases(
+            len(dataset),
+            sample=marker.kwargs.get("sample") if sample is None else sample,
+            seed=config.getoption("--dataset-seed"),
+            shard=parse_shard(shard) if shard else None,
+        )
+        # Every case becomes a test item, in every xdist worker
+        limit = config.getoption("--dataset-max-cases")
+        if limit and len(cases) > limit:
+            pytest.fail(
+                f"{metafunc.definition.nodeid}: {dataset.name} selects {len(cases)} rows on this "
+                f"node, more than --dataset-max-cases {limit}. Run a sample with --dataset-sample, "
+                "split the rows with --shard or raise --dataset-max-cases.",
+                pytrace=False,
+            )
+        metafunc.parametrize(
+            "dataset_row", cases, ids=lambda index: f"{dataset.name}-{index}", indirect=True
+        )
+
+    if "browser_name" not in metafunc.fixturenames:
+        return
+    browsers = parse_browser_list(metafunc.config.getoption("--browser"))
+    if len(browsers) > 1:
+        metafunc.parametrize("browser_name", browsers, ids=browsers, indirect=True)
+
+
+demo_server_stats_key = pytest.StashKey[list]()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def demo_site_server(request):
+    """
+    Session fixture serving the demo site from this worker on a free port
+    Points BASE_URL at the server while it runs
+
+    Yields:
+        DemoSiteServer instance, or None when --serve-demo-site is not given
+    """
+    config = request.config
+    if not config.getoption("--serve-demo-site"):
+        yield None
+        return
+
+    catalogue = Catalogue(config.getoption("--catalogue-size"),
+                          config.getoption("--catalogue-seed"))
+    server = DemoSiteServer(
+        cache_policy=config.getoption("--demo-site-cache"),
+        watch=config.getoption("--demo-site-watch"),
+        catalogue=catalogue,
+    ).start()
+    previous = suite_config.BASE_URL
+    suite_config.BASE_URL = os.environ["BASE_URL"] = server.url
+    try:
+        yield server
+    finally:
+        suite_config.BASE_URL = os.environ["BASE_URL"] = previous
+        server.stop()
+        stats = dict(server.stats.summary(), worker=os.environ.get("PYTEST_XDIST_WORKER", "master"))
+        if hasattr(config, "workeroutput"):
+            config.workeroutput["demo_server"] = stats
+        else:
+            config.stash.setdefault(demo_server_stats_key, []).append(stats)
+
+
+network_proxy_stats_key = pytest.StashKey[list]()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def network_proxy(request, demo_site_server):
+    """
+    Session fixture proxying BASE_URL through injected latency, bandwidth
+    limits and errors while it runs
+
+    Yields:
+        FaultProxy instance, or None for the "none" profile
+    """
+    config = request.config
+    profile = config.getoption("--network-profile")
+    if profile == DEFAULT_PROFILE:
+        yield None
+        return
+
+    seed = config.getoption("--network-seed")
+    proxy = FaultProxy(suite_config.BASE_URL, profile, seed=seed).start()
+    previous = suite_config.BASE_URL
+    suite_config.BASE_URL = os.environ["BASE_URL"] = proxy.url
+    try:
+        yield proxy
+    finally:
+        suite_config.BASE_URL = os.environ["BASE_URL"] = previous
+        proxy.stop()
+        stats = dict(proxy.stats.summary(), profile=profile,
+                     worker=os.environ.get("PYTEST_XDIST_WORKER", "master"))
+        if hasattr(config, "workeroutput"):
+            config.workeroutput["network_proxy"] = stats
+        else:
+            config.stash.setdefault(network_proxy_stats_key, []).append(stats)
+
+
+@pytest.fixture(scope="session")
+def catalogue(request, demo_site_server):
+    """
+    Session fixture exposing the product catalogue the demo site serves
+
+    Returns:
+        Catalogue instance
+    """
+    if demo_site_server is not None:
+        return demo_site_server.catalogue
+    config = request.config
+    return Catalogue(config.getoption("--catalogue-size"), config.getoption("--catalogue-seed"))
+
+
+@pytest.fixture(scope="session")
+def search_term(catalogue):
+    """
+    SEARCH_TERM, checked to match at least one catalogue product
+    """
+    try:
+        catalogue.known_match(suite_config.SEARCH_TERM)
+    except LookupError as e:
+        pytest.fail(f"SEARCH_TERM has no match in the catalogue: {e}")
+    return suite_config.SEARCH_TERM
+
+
+@pytest.fixture(scope="session")
+def product_name(catalogue):
+    """
+    PRODUCT_NAME, checked to match at least one catalogue product
+    """
+    try:
+        catalogue.known_match(suite_config.PRODUCT_NAME)
+    except LookupError as e:
+        pytest.fail(f"PRODUCT_NAME has no match in the catalogue: {e}")
+    return suite_config.PRODUCT_NAME
+
+
+@pytest.fixture
+def seed_cart(driver, demo_site_server):
+    """
+    Seed the browser's cart with one HTTP call instead of UI clicks
+    Switches the demo site to its server-backed cart for the test
+
+    Returns:
+        Function taking a list of {"name", "price", "quantity"} items and
+        returning the CartClient of the browser's cart session
+    """
+    if demo_site_server is None:
+        pytest.skip("Seeding a cart needs the served demo site (--serve-demo-site)")
+
+    def seed(items):
+        client = CartClient(suite_config.BASE_URL)
+        client.replace(items)
+        # Cookies can only be added for the origin the browser is on
+        driver.get(suite_config.BASE_URL)
+        driver.add_cookie({"name": CART_COOKIE, "value": client.session, "path": "/"})
+        driver.refresh()
+        return client
+
+    return seed
+
+
+@pytest.fixture(autouse=True)
+def demo_site_traffic(request, demo_site_server):
+    """
+    Auto-use fixture attributing demo site requests and bytes to each test
+    """
+    if demo_site_server is None:
+        yield
+        return
+    requests_before, bytes_before, not_modified_before = demo_site_server.stats.counters()
+    yield
+    requests_after, bytes_after, not_modified_after = demo_site_server.stats.counters()
+    request.node.user_properties.append(("demo_site_traffic", (
+        requests_after - requests_before,
+        bytes_after - bytes_before,
+        not_modified_after - not_modified_before,
+    )))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """
+    Collect demo site server and network proxy statistics from finished xdist workers
+    """
+    stats = getattr(node, "workeroutput", {}).get("demo_server")
+    if stats:
+        node.config.stash.setdefault(demo_server_stats_key, []).append(stats)
+    stats = getattr(node, "workeroutput", {}).get("network_proxy")
+    if stats:
+        node.config.stash.setdefault(network_proxy_stats_key, []).append(stats)
+
+
+@pytest.fixture
+def browser_name(request):
+    """
+    Fixture providing the browser for the current test
+
+    Returns:
+        Browser name (chrome, firefox, edge)
+    """
+    if hasattr(request, "param"):
+        return request.param
+    return parse_browser_list(request.config.getoption("--browser"))[0]
+
+
+@pytest.fixture
+def dataset_row(request):
+    """
+    Fixture providing the row of a @pytest.mark.dataset test, read from disk on setup
+
+    Returns:
+        Dictionary of column name to value
+    """
+    marker = request.node.get_closest_marker("dataset")
+    dataset = open_dataset(marker.args[0], request.config.getoption("--dataset-dir"))
+    return dataset.row(request.param)
+
+
+@pytest.fixture(scope="session")
+def browser_pools(request):
+    """
+    Fixture holding one BrowserPool per requested browser for this worker
+
+    Yields:
+        Dictionary of browser name to BrowserPool
+    """
+    config = request.config
+    limits = parse_browser_limits(config.getoption("--browser-limit"))
+    pools = {
+        name: BrowserPool(
+            name,
+            limit=limits.get(name),
+            max_idle=config.getoption("--browser-pool-size"),
+        )
+        for name in parse_browser_list(config.getoption("--browser"))
+    }
+    yield pools
+    for pool in pools.values():
+        pool.close()
 
 
 @pytest.fixture(scope="function")
-def driver(request):
+def driver(request, browser_name, browser_pools):
     """
     Fixture to create and manage WebDriver instance
-    Creates a new driver for each test and quits after test completion
+    Takes a driver from the browser's pool for each test and returns it after completion
 
     Yields:
         WebDriver instance
     """
-    # Get browser from CLI argument or use default from config
-    browser_arg = request.config.getoption("--browser")
-    browser_name = browser_arg if browser_arg else None
+    request.node.user_properties.append(("browser", browser_name))
+    set_log_context(browser=browser_name)
+    pool = browser_pools[browser_name]
 
-    driver = None
+    if request.node.get_closest_marker("readonly"):
+        yield from _readonly_driver(request, pool)
+        _report_pools(request, browser_pools)
+        return
+
+    driver = _traced(request, pool.acquire())
+    memory = request.config.pluginmanager.get_plugin("browser_memory")
+    if memory:
+        memory.before(request.node, driver)
     try:
-        # Create driver instance with optional browser override
-        driver = create_driver(browser_name=browser_name)
         yield driver
     finally:
-        # Cleanup: Quit driver after test
-        if driver:
-            quit_driver(driver)
+        # Cleanup: Only reuse drivers of tests that passed or are about to be retried,
+        # and never one whose browser has outgrown the recycle threshold
+        rep = getattr(request.node, "rep_call", None)
+        retrying = getattr(request.node, "retry_pending", False)
+        recycle = memory is not None and memory.after(request.node, driver)
+        reusable = not recycle and (retrying or (rep is not None and rep.passed))
+        pool.release(driver, reusable=reusable, keep=retrying)
+        _report_pools(request, browser_pools)
+
+
+def _report_pools(request, browser_pools):
+    """
+    Send the driver pool counters to the live telemetry endpoint when enabled
+    """
+    telemetry = request.config.pluginmanager.get_plugin("telemetry")
+    if telemetry:
+        telemetry.pool_stats([pool.stats() for pool in browser_pools.values()])
+
+
+def _readonly_driver(request, pool):
+    """
+    Serve a read-only test from the worker's shared driver
+    The state guard fails or isolates tests that mutate browser state
+    """
+    driver = _traced(request, pool.acquire_shared())
+    memory = request.config.pluginmanager.get_plugin("browser_memory")
+    if memory:
+        memory.before(request.node, driver)
+    discard = False
+    try:
+        before = snapshot_state(driver)
+        yield driver
+        changes = diff_state(before, snapshot_state(driver))
+        if changes:
+            # Never hand a polluted browser to the next read-only test
+            discard = True
+            message = f"read-only test mutated browser state: {', '.join(changes)}"
+            if request.config.getoption("--readonly-guard") == "fail":
+                pytest.fail(message, pytrace=False)
+            request.node.user_properties.append(("readonly_violation", message))
+            warnings.warn(message)
+    except Exception:
+        discard = True
+        raise
+    finally:
+        if memory and memory.after(request.node, driver):
+            discard = True
+        pool.release_shared(discard=discard)
+
+
+def _traced(request, driver):
+    """
+    Trace the driver's commands when --trace-webdriver is given
+    """
+    tracer = request.config.pluginmanager.get_plugin("webdriver_tracer")
+    return tracer.attach(driver) if tracer else driver
 
 
 @pytest.fixture(scope="session")
@@ -56,13 +678,13 @@ def session_driver(request):
     Yields:
         WebDriver instance
     """
-    # Get browser from CLI argument or use default from config
-    browser_arg = request.config.getoption("--browser")
-    browser_name = browser_arg if browser_arg else None
+    # Session driver always uses the first requested browser
+    browser_name = parse_browser_list(request.config.getoption("--browser"))[0]
+    set_log_context(browser=browser_name)
 
     driver = None
     try:
-        driver = create_driver(browser_name=browser_name)
+        driver = _traced(request, create_driver(browser_name=browser_name))
         yield driver
     finally:
         if driver:
@@ -105,26 +727,252 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "checkout: marks tests related to checkout functionality"
     )
+    config.addinivalue_line(
+        "markers", "readonly: marks tests that only read state and may share a browser"
+    )
+    config.addinivalue_line(
+        "markers", "quarantine: marks chronically flaky tests (added by --track-flaky)"
+    )
+    config.addinivalue_line(
+        "markers", "benchmark: marks page-flow benchmarks (run with pytest benchmarks/)"
+    )
+    config.addinivalue_line(
+        "markers",
+        "dataset(path, sample=None): runs the test once per row of a CSV/JSONL file in data/",
+    )
+
+    # Pick the run's log directory before xdist starts the workers, they inherit it
+    if not hasattr(config, "workerinput"):
+        run_log_dir()
+    setup_logger()
+
+    # Only the controller records durations, it receives the reports of every worker
+    if config.getoption("--store-durations") and not hasattr(config, "workerinput"):
+        output = config.getoption("--durations-output") or config.getoption("--durations-path")
+        config.pluginmanager.register(DurationRecorder(output), "duration_recorder")
+
+    if config.getoption("--track-flaky"):
+        config.pluginmanager.register(
+            FlakinessTracker(
+                FlakinessStore(config.getoption("--flaky-history")),
+                max_retries=config.getoption("--flaky-retries"),
+                retry_threshold=config.getoption("--flaky-retry-threshold"),
+                quarantine_threshold=config.getoption("--quarantine-threshold"),
+                record=not hasattr(config, "workerinput"),
+            ),
+            "flakiness_tracker",
+        )
+
+    if config.getoption("--trace-webdriver"):
+        config.pluginmanager.register(
+            WebDriverTracer(config.getoption("--trace-webdriver")), "webdriver_tracer"
+        )
+
+    if config.getoption("--telemetry-port") is not None:
+        config.pluginmanager.register(
+            TelemetryPlugin(config, config.getoption("--telemetry-port")), "telemetry"
+        )
+
+    if config.getoption("--web-vitals"):
+        config.pluginmanager.register(WebVitalsCollector(), "web_vitals_collector")
+
+    if config.getoption("--screencast"):
+        config.pluginmanager.register(
+            ScreencastRecorder(config.getoption("--screencast-seconds")), "screencast"
+        )
+
+    if config.getoption("--track-memory"):
+        config.pluginmanager.register(
+            BrowserMemoryTracker(config.getoption("--memory-recycle-mb")), "browser_memory"
+        )
+
+    if config.getoption("--time-methods"):
+        recorder = MethodTimingRecorder(config.getoption("--timing-db"),
+                                        config.getoption("--timing-commit"))
+        config.pluginmanager.register(recorder, "method_timing_recorder")
+
+    if config.getoption("--staged"):
+        config.pluginmanager.register(
+            StagedExecution(
+                threshold=config.getoption("--smoke-failure-threshold"),
+                mode=config.getoption("--smoke-abort-mode"),
+            ),
+            "staged_execution",
+        )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    Keep only the tests of the requested shard
+    Runs last so shards are balanced over the tests left after -k/-m selection
+    """
+    shard = config.getoption("--shard")
+    if not shard:
+        return
+    index, count = parse_shard(shard)
+    durations = load_durations(config.getoption("--durations-path"))
+    # Dataset rows were already split between shards when the tests were parametrized
+    rows = {item.nodeid for item in items if item.get_closest_marker("dataset")}
+    others = [item.nodeid for item in items if item.nodeid not in rows]
+    selected = set(partition(others, durations, count)[index - 1])
+    selected |= rows
+
+    deselected = [item for item in items if item.nodeid not in selected]
+    items[:] = [item for item in items if item.nodeid in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+
+
+artifact_writer_key = pytest.StashKey[ArtifactWriter]()
 
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     """
-    Hook to capture screenshot on test failure
+    Hook to capture screenshot, DOM, console logs and screencast on test failure
+    Only the browser calls block the test, files are written in the background;
+    with --artifact-store the report waits for the digests of the stored blobs
     """
     outcome = yield
     rep = outcome.get_result()
+    setattr(item, f"rep_{rep.when}", rep)
 
-    # Check if test failed and screenshot is enabled
     if rep.when == "call" and rep.failed:
-        # Get driver from fixture if available
-        if "driver" in item.fixturenames:
-            driver = item.funcargs.get("driver")
-            if driver:
-                screenshot_path = f"screenshots/{item.name}_failure.png"
-                try:
-                    driver.save_screenshot(screenshot_path)
-                    print(f"\nScreenshot saved: {screenshot_path}")
-                except Exception as e:
-                    print(f"\nFailed to save screenshot: {e}")
+        driver = item.funcargs.get("driver") or item.funcargs.get("session_driver")
+        if driver:
+            writer = item.config.stash.get(artifact_writer_key, None)
+            if writer is None:
+                store_dir = item.config.getoption("--artifact-store")
+                store = ArtifactStore(store_dir) if store_dir else None
+                writer = ArtifactWriter(store=store, run=run_id())
+                item.config.stash[artifact_writer_key] = writer
+            browser = dict(item.user_properties).get("browser")
+            stem = writer.unique_stem(artifact_stem(item.nodeid, browser, worker_id()))
+            try:
+                paths = capture_failure(driver, writer, stem)
+                screencast = item.config.pluginmanager.get_plugin("screencast")
+                video = screencast.save(item, writer, stem) if screencast else None
+                if video:
+                    paths.append(video)
+                references = [writer.reference(path) for path in paths]
+                item.user_properties.append(("failure_artifacts", references))
+                attach_references(item, rep, references)
+                get_logger().info("Failure artifacts: %s",
+                                  ", ".join(format_reference(r) for r in references))
+            except Exception as e:
+                get_logger().error("Failed to capture failure artifacts: %s", e)
+
+
+def pytest_runtest_logstart(nodeid, location):
+    """
+    Tag log records with the running test
+    """
+    set_log_context(test_id=nodeid, browser=None)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """
+    Flush this process's logs; the controller then merges the run's worker logs
+    Workers finish their session before the controller does
+    """
+    flush_logging()
+    if not hasattr(session.config, "workerinput"):
+        merge_logs(run_log_dir())
+
+
+def pytest_unconfigure(config):
+    """
+    Remove browser slot lock files once the whole run is over
+    and finish writing failure artifacts
+    """
+    writer = config.stash.get(artifact_writer_key, None)
+    if writer is not None:
+        writer.close()
+        for error in writer.errors:
+            print(f"Failed to write failure artifact {error}")
+    if not hasattr(config, "workerinput"):
+        cleanup_slots()
+
+
+def _all_reports(config):
+    terminalreporter = config.pluginmanager.get_plugin("terminalreporter")
+    if terminalreporter is None:
+        return []
+    return [
+        rep
+        for reports in terminalreporter.stats.values()
+        for rep in reports
+        if hasattr(rep, "when") and hasattr(rep, "nodeid")
+    ]
+
 
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """
+    Show results of multi-browser runs side by side with per-browser timing,
+    the request rate and latency of the demo site servers and injected network faults
+    """
+    server_stats = config.stash.get(demo_server_stats_key, [])
+    if server_stats:
+        terminalreporter.write_sep("=", "demo site server")
+        for stats in sorted(server_stats, key=lambda s: s["worker"]):
+            terminalreporter.write_line(
+                f"{stats['worker']}: {stats['requests']} requests, {stats['rate']:.1f} req/s, "
+                f"{stats['bytes'] / 1024:.0f} KiB, p50 {stats['p50_ms']:.2f} ms, "
+                f"p95 {stats['p95_ms']:.2f} ms, max {stats['max_ms']:.2f} ms"
+            )
+        traffic = [
+            value
+            for rep in _all_reports(config)
+            for value in teardown_properties(rep, "demo_site_traffic")
+        ]
+        if traffic:
+            count = len(traffic)
+            terminalreporter.write_line(
+                f"per test ({config.getoption('--demo-site-cache')} caching): "
+                f"{sum(t[0] for t in traffic) / count:.1f} requests, "
+                f"{sum(t[1] for t in traffic) / count / 1024:.1f} KiB, "
+                f"{sum(t[2] for t in traffic) / count:.1f} not modified"
+            )
+
+    proxy_stats = config.stash.get(network_proxy_stats_key, [])
+    if proxy_stats:
+        terminalreporter.write_sep("=", f"network profile {proxy_stats[0]['profile']}")
+        for stats in sorted(proxy_stats, key=lambda s: s["worker"]):
+            terminalreporter.write_line(
+                f"{stats['worker']}: {stats['requests']} requests, "
+                f"{stats['errors_injected']} injected errors, "
+                f"{stats['delay_s']:.1f}s added latency, "
+                f"{stats['throttled_bytes'] / 1024:.0f} KiB throttled"
+            )
+
+    lines = format_matrix(build_matrix(_all_reports(config)))
+    if lines:
+        terminalreporter.write_sep("=", "browser matrix")
+        for line in lines:
+            terminalreporter.write_line(line)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix, session):
+    """
+    Add per-browser totals to the pytest-html report
+    """
+    prefix.extend(format_html_summary(build_matrix(_all_reports(session.config))))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_table_header(cells):
+    """
+    Add a Browser column to the pytest-html results table
+    """
+    cells.insert(2, "<th>Browser</th>")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_table_row(report, cells):
+    """
+    Fill the Browser column of the pytest-html results table
+    """
+    browser = next((v for k, v in report.user_properties if k == "browser"), "")
+    cells.insert(2, f"<td>{browser}</td>")
@@ -3,30 +3,68 @@
 // Cart management using localStorage
 const CART_KEY = 'demo_ecommerce_cart';
 
+// Optional server mode: with a cart_session cookie (set by test fixtures, or by
+// visiting any page with ?cart=server) the cart lives in the demo site server
+// behind /api/cart instead of localStorage
+const CART_COOKIE = 'cart_session';
+
+if (new URLSearchParams(window.location.search).get('cart') === 'server' && !isServerCart()) {
+    const session = Math.random().toString(16).slice(2) + Date.now().toString(16);
+    document.cookie = `${CART_COOKIE}=${session}; path=/; SameSite=Lax`;
+}
+
+function isServerCart() {
+    return document.cookie.split(';').some(c => c.trim().startsWith(`${CART_COOKIE}=`));
+}
+
+// Synchronous so getCart() keeps the same contract in both modes
+function cartRequest(method, path, payload) {
+    const xhr = new XMLHttpRequest();
+    xhr.open(method, path, false);
+    xhr.setRequestHeader('Content-Type', 'application/json');
+    xhr.send(payload === undefined ? null : JSON.stringify(payload));
+    if (xhr.status !== 200) {
+        throw new Error(`Cart API returned ${xhr.status}`);
+    }
+    return JSON.parse(xhr.responseText).items;
+}
+
 function getCart() {
+    if (isServerCart()) {
+        return cartRequest('GET', 'api/cart');
+    }
     const cart = localStorage.getItem(CART_KEY);
     return cart ? JSON.parse(cart) : [];
 }
 
 function saveCart(cart) {
+    if (isServerCart()) {
+        cartRequest('PUT', 'api/cart', { items: cart });
+        return;
+    }
     localStorage.setItem(CART_KEY, JSON.stringify(cart));
 }
 
 function addToCart(productName, price) {
-    const cart = getCart();
-    const existingItem = cart.find(item => item.name === productName);
-    
-    if (existingItem) {
-        existingItem.quantity += 1;
+    if (isServerCart()) {
+        // Incremented atomically on the server, concurrent tabs do not lose updates
+        cartRequest('POST', 'api/cart/items', { name: productName, price: price, quantity: 1 });
     } else {
-        cart.push({
-            name: productName,
-            price: price,
-            quantity: 1
-        });
+        const cart = getCart();
+        const existingItem = cart.find(item => item.name === productName);
+        
+        if (existingItem) {
+            existingItem.quantity += 1;
+        } else {
+            cart.push({
+                name: productName,
+                price: price,
+                quantity: 1
+            });
+        }
+        
+        saveCart(cart);
     }
-    
-    saveCart(cart);
     updateCartCount();
     
     // Show notification
@@ -35,8 +73,12 @@ function addToCart(productName, price) {
 
 function removeFromCart(index) {
     const cart = getCart();
-    cart.splice(index, 1);
-    saveCart(cart);
+    if (isServerCart()) {
+        cartRequest('DELETE', `api/cart/items?name=${encodeURIComponent(cart[index].name)}`);
+    } else {
+        cart.splice(index, 1);
+        saveCart(cart);
+    }
     updateCartCount();
     if (typeof loadCart === 'function') {
         loadCart();
@@ -48,8 +90,12 @@ function updateCartQuantity(index, quantity) {
     if (quantity <= 0) {
         removeFromCart(index);
     } else {
-        cart[index].quantity = quantity;
-        saveCart(cart);
+        if (isServerCart()) {
+            cartRequest('PATCH', 'api/cart/items', { name: cart[index].name, quantity: quantity });
+        } else {
+            cart[index].quantity = quantity;
+            saveCart(cart);
+        }
         if (typeof loadCart === 'function') {
             loadCart();
         }
@@ -66,7 +112,11 @@ function updateCartCount() {
 }
 
 function clearCart() {
-    localStorage.removeItem(CART_KEY);
+    if (isServerCart()) {
+        cartRequest('DELETE', 'api/cart');
+    } else {
+        localStorage.removeItem(CART_KEY);
+    }
     updateCartCount();
 }
 
@@ -1,6 +1,7 @@
 // Products page functionality
 
-// Sample products database
+// Sample products database, used when the catalogue API is not available
+// (e.g. when the site is served by a plain static file server)
 const PRODUCTS = [
     { name: 'Laptop', price: 999.99, category: 'electronics' },
     { name: 'MacBook', price: 1299.99, category: 'electronics' },
@@ -12,6 +13,52 @@ const PRODUCTS = [
     { name: 'Monitor', price: 299.99, category: 'electronics' },
 ];
 
+// Products rendered per page, only one page is in the DOM at a time
+const PAGE_SIZE = 48;
+
+// Catalogue API of utils/demo_server.py, searches are answered from its index
+// null until tried, false when unavailable
+let catalogueApi = null;
+
+// Search currently displayed, kept for the pagination links
+let currentSearch = '';
+
+function filterProducts(term) {
+    if (!term) {
+        return PRODUCTS;
+    }
+    return PRODUCTS.filter(product =>
+        product.name.toLowerCase().includes(term)
+    );
+}
+
+function loadProducts(term, page) {
+    if (catalogueApi === false) {
+        const products = filterProducts(term);
+        const first = (page - 1) * PAGE_SIZE;
+        return Promise.resolve({
+            products: products.slice(first, first + PAGE_SIZE),
+            page: page,
+            total: products.length,
+            pages: Math.max(1, Math.ceil(products.length / PAGE_SIZE)),
+        });
+    }
+
+    const params = new URLSearchParams({ q: term, page: page, per_page: PAGE_SIZE });
+    return fetch(`api/products?${params}`)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Catalogue API returned ${response.status}`);
+            }
+            catalogueApi = true;
+            return response.json();
+        })
+        .catch(() => {
+            catalogueApi = false;
+            return loadProducts(term, page);
+        });
+}
+
 function displayProducts(products) {
     const grid = document.getElementById('products-grid');
     const noResults = document.getElementById('no-results');
@@ -34,31 +81,65 @@ function displayProducts(products) {
     `).join('');
 }
 
-function searchProducts(searchTerm) {
-    const term = searchTerm.toLowerCase().trim();
-    
-    if (!term) {
-        displayProducts(PRODUCTS);
+function displayPagination(result) {
+    const pagination = document.getElementById('pagination');
+    const summary = document.getElementById('results-summary');
+    if (!pagination || !summary) {
         return;
     }
     
-    const filtered = PRODUCTS.filter(product => 
-        product.name.toLowerCase().includes(term)
-    );
+    const first = result.total ? (result.page - 1) * PAGE_SIZE + 1 : 0;
+    const last = Math.min(result.page * PAGE_SIZE, result.total);
+    summary.textContent = `Showing ${first} to ${last} of ${result.total} (${result.pages} Pages)`;
+    
+    // Same markup as OpenCart: |< < 1 2 3 > >|, links only to other pages
+    const link = (page, text) => `<li><a href="#" data-page="${page}">${text}</a></li>`;
+    const items = [];
+    if (result.page > 1) {
+        items.push(link(1, '|&lt;'), link(result.page - 1, '&lt;'));
+    }
+    const from = Math.max(1, result.page - 4);
+    const to = Math.min(result.pages, from + 9);
+    for (let page = from; page <= to; page++) {
+        items.push(page === result.page ? `<li class="active"><span>${page}</span></li>` : link(page, page));
+    }
+    if (result.page < result.pages) {
+        items.push(link(result.page + 1, '&gt;'), link(result.pages, '&gt;|'));
+    }
+    pagination.innerHTML = result.pages > 1 ? items.join('') : '';
+}
+
+function showPage(page) {
+    const term = currentSearch.toLowerCase().trim();
     
-    displayProducts(filtered);
+    return loadProducts(term, page).then(result => {
+        displayProducts(result.products);
+        displayPagination(result);
+        return result;
+    });
+}
+
+function searchProducts(searchTerm) {
+    currentSearch = searchTerm;
+    const term = searchTerm.toLowerCase().trim();
     
-    // Update message
-    const messageDiv = document.getElementById('search-results-message');
-    if (messageDiv) {
-        if (filtered.length > 0) {
-            messageDiv.textContent = `Found ${filtered.length} product(s) for "${searchTerm}"`;
-            messageDiv.className = 'alert alert-success';
-        } else {
-            messageDiv.textContent = `No products found for "${searchTerm}"`;
-            messageDiv.className = 'alert alert-danger';
+    return showPage(1).then(result => {
+        if (!term) {
+            return;
         }
-    }
+        
+        // Update message
+        const messageDiv = document.getElementById('search-results-message');
+        if (messageDiv) {
+            if (result.total > 0) {
+                messageDiv.textContent = `Found ${result.total} product(s) for "${searchTerm}"`;
+                messageDiv.className = 'alert alert-success';
+            } else {
+                messageDiv.textContent = `No products found for "${searchTerm}"`;
+                messageDiv.className = 'alert alert-danger';
+            }
+        }
+    });
 }
 
 // Handle search form submission
@@ -74,7 +155,18 @@ document.addEventListener('DOMContentLoaded', function() {
         searchInput.value = searchParam;
         searchProducts(searchParam);
     } else {
-        displayProducts(PRODUCTS);
+        searchProducts('');
+    }
+    
+    const pagination = document.getElementById('pagination');
+    if (pagination) {
+        pagination.addEventListener('click', function(e) {
+            const link = e.target.closest('a[data-page]');
+            if (link) {
+                e.preventDefault();
+                showPage(Number(link.dataset.page));
+            }
+        });
     }
     
     if (searchForm) {
@@ -5,5 +5,5 @@ echo Open your browser and go to: http://localhost:8000
 echo.
 echo Press Ctrl+C to stop the server
 echo.
-python -m http.server 8000
+cd /d "%~dp0.." && python -m utils.demo_server --port 8000
 
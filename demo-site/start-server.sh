@@ -5,5 +5,5 @@ echo "Open your browser and go to: http://localhost:8000"
 echo ""
 echo "Press Ctrl+C to stop the server"
 echo ""
-python3 -m http.server 8000
+cd "$(dirname "$0")/.." && python3 -m utils.demo_server --port 8000
 
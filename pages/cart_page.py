@@ -7,8 +7,11 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 from utils.config import EXPLICIT_WAIT
+from utils.method_timing import timed_methods
+from utils.web_vitals import record_page_visit
 
 
+@timed_methods
 class CartPage:
     """
     Page Object Model for Shopping Cart Page
@@ -55,6 +58,7 @@ class CartPage:
             EC.element_to_be_clickable(self.CART_ICON)
         )
         cart_icon.click()
+        record_page_visit(self.driver, "cart.html")
     
     def get_cart_items_count(self) -> int:
         """
@@ -151,6 +155,7 @@ class CartPage:
             EC.element_to_be_clickable(self.CHECKOUT_BUTTON)
         )
         checkout_btn.click()
+        record_page_visit(self.driver, "checkout.html")
     
     def click_continue_shopping(self):
         """
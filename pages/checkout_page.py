@@ -7,8 +7,11 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select, WebDriverWait
 
 from utils.config import EXPLICIT_WAIT
+from utils.method_timing import timed_methods
+from utils.web_vitals import record_page_visit
 
 
+@timed_methods
 class CheckoutPage:
     """
     Page Object Model for Checkout Page
@@ -184,6 +187,7 @@ class CheckoutPage:
             EC.element_to_be_clickable(self.CONFIRM_ORDER_BUTTON)
         )
         confirm_btn.click()
+        record_page_visit(self.driver, "success.html")
     
     def is_order_successful(self) -> bool:
         """
@@ -9,9 +9,13 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
-from utils.config import BASE_URL, EXPLICIT_WAIT
+from utils import config
+from utils.config import EXPLICIT_WAIT
+from utils.method_timing import timed_methods
+from utils.web_vitals import record_page_visit
 
 
+@timed_methods
 class LoginPage:
     """
     Page Object Model for Login Page
@@ -87,7 +91,7 @@ class LoginPage:
             except TimeoutException:
                 # Strategy 3: Direct navigation to login URL
                 # Try multiple URL patterns
-                base = BASE_URL.rstrip("/")
+                base = config.BASE_URL.rstrip("/")
                 login_urls = [
                     f"{base}/index.php?route=account/login",
                     f"{base}/account/login",
@@ -125,6 +129,7 @@ class LoginPage:
             lambda driver: driver.execute_script("return document.readyState")
             == "complete"
         )
+        record_page_visit(self.driver)
 
         # Wait for login page to load by checking for email field with multiple selectors
         email_selectors = [
@@ -2,14 +2,21 @@
 Search Page Object Model
 Handles product search functionality
 """
+import re
+from typing import Callable, Iterator, List, Optional
+
+from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select, WebDriverWait
 
 from utils.config import EXPLICIT_WAIT
+from utils.method_timing import timed_methods
+from utils.web_vitals import record_page_visit
 
 
+@timed_methods
 class SearchPage:
     """
     Page Object Model for Search Page
@@ -24,6 +31,8 @@ class SearchPage:
     PRODUCT_NAME = (By.CSS_SELECTOR, '.product-layout h4 a')
     PRODUCT_PRICE = (By.CSS_SELECTOR, '.price')
     SORT_DROPDOWN = (By.ID, 'input-sort')
+    PAGINATION_LINKS = (By.CSS_SELECTOR, 'ul.pagination li a')
+    RESULTS_SUMMARY = (By.CSS_SELECTOR, 'div.text-right')
     
     def __init__(self, driver):
         """
@@ -64,8 +73,10 @@ class SearchPage:
         Args:
             search_term: Product name or keyword to search
         """
+        record_page_visit(self.driver)
         self.enter_search_term(search_term)
         self.click_search_button()
+        record_page_visit(self.driver, "products.html")
     
     def search_with_enter(self, search_term: str):
         """
@@ -74,27 +85,31 @@ class SearchPage:
         Args:
             search_term: Product name or keyword to search
         """
+        record_page_visit(self.driver)
         search_input = self.wait.until(
             EC.presence_of_element_located(self.SEARCH_INPUT)
         )
         search_input.clear()
         search_input.send_keys(search_term)
         search_input.send_keys(Keys.RETURN)
+        record_page_visit(self.driver, "products.html")
     
     def get_search_results_count(self) -> int:
         """
-        Get the number of search results displayed
+        Get the number of search results across all pages
 
         Returns:
-            Number of search results
+            Total from the "Showing 1 to 15 of N" summary when results are
+            paginated, otherwise the number of results displayed
         """
         try:
             results = self.wait.until(
                 EC.presence_of_all_elements_located(self.SEARCH_RESULTS)
             )
-            return len(results)
         except Exception:
             return 0
+        match = re.search(r'of (\d+)', self._get_pager()['summary'])
+        return int(match.group(1)) if match else len(results)
     
     def is_no_results_message_displayed(self) -> bool:
         """
@@ -113,7 +128,7 @@ class SearchPage:
     
     def get_product_names(self) -> list:
         """
-        Get list of product names from search results
+        Get list of product names from the current page of search results
 
         Returns:
             List of product names
@@ -126,28 +141,112 @@ class SearchPage:
         except Exception:
             return []
     
-    def click_product(self, product_name: str):
+    def _get_pager(self) -> dict:
+        """
+        Read the pagination state in a single round trip
+        Avoids the implicit wait find_elements would spend on the last page
+
+        Returns:
+            Dictionary with the "next" link element (or None) and the summary text
         """
-        Click on a specific product by name
+        return self.driver.execute_script("""
+            const [linkSelector, summarySelector] = arguments;
+            const next = Array.from(document.querySelectorAll(linkSelector))
+                .find(link => link.textContent.trim() === '>');
+            const summary = Array.from(document.querySelectorAll(summarySelector))
+                .map(element => element.textContent.trim())
+                .find(text => text.startsWith('Showing'));
+            return {next: next || null, summary: summary || ''};
+        """, self.PAGINATION_LINKS[1], self.RESULTS_SUMMARY[1])
+
+    def iter_result_pages(self, max_pages: Optional[int] = None) -> Iterator[List]:
+        """
+        Yield search results page by page, only moving to the next page when
+        the consumer asks for it
 
         Args:
-            product_name: Name of the product to click
+            max_pages: Maximum number of pages to visit, None for all
+
+        Yields:
+            List of product name elements of one results page
         """
         try:
-            product_link = self.wait.until(
-                EC.element_to_be_clickable(
-                    (By.LINK_TEXT, product_name)
-                )
+            product_elements = self.wait.until(
+                EC.presence_of_all_elements_located(self.PRODUCT_NAME)
             )
-            product_link.click()
         except Exception:
-            # Fallback: Try partial link text
-            product_link = self.wait.until(
-                EC.element_to_be_clickable(
-                    (By.PARTIAL_LINK_TEXT, product_name)
+            return
+        visited = 0
+        while True:
+            yield product_elements
+            visited += 1
+            if max_pages is not None and visited >= max_pages:
+                return
+            next_link = self._get_pager()['next']
+            if next_link is None:
+                return
+            next_link.click()
+            self.wait.until(EC.staleness_of(product_elements[0]))
+            try:
+                product_elements = self.wait.until(
+                    EC.presence_of_all_elements_located(self.PRODUCT_NAME)
                 )
-            )
-            product_link.click()
+            except Exception:
+                return
+
+    def iter_product_names(self, max_pages: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield product names across all result pages, lazily
+
+        Args:
+            max_pages: Maximum number of pages to visit, None for all
+
+        Yields:
+            Product names in result order
+        """
+        for product_elements in self.iter_result_pages(max_pages):
+            for product in product_elements:
+                yield product.text
+
+    def find_product(self, predicate: Callable[[str], bool], max_pages: Optional[int] = None):
+        """
+        Page through the results until a product name matches
+
+        Args:
+            predicate: Function called with each product name
+            max_pages: Maximum number of pages to visit, None for all
+
+        Returns:
+            Matching product name element on the current page, or None
+        """
+        for product_elements in self.iter_result_pages(max_pages):
+            for product in product_elements:
+                if predicate(product.text):
+                    return product
+        return None
+
+    def click_product(self, product_name: str):
+        """
+        Click on a specific product by name, paging through results until it is listed
+        An exact name match is preferred over a partial one on the same page
+
+        Args:
+            product_name: Name of the product to click
+
+        Raises:
+            NoSuchElementException: If no results page lists the product
+        """
+        # Stops on the first page listing the product instead of reading every page
+        for product_elements in self.iter_result_pages():
+            names = [(product.text, product) for product in product_elements]
+            matches = [(name, product) for name, product in names if product_name in name]
+            if matches:
+                matches.sort(key=lambda match: match[0] != product_name)
+                matches[0][1].click()
+                return
+        raise NoSuchElementException(
+            f"Product '{product_name}' is not listed in the search results"
+        )
     
     def sort_results(self, sort_option: str):
         """
@@ -170,6 +269,8 @@ class SearchPage:
     def verify_search_results_contain(self, search_term: str) -> bool:
         """
         Verify that search results contain the search term
+        Pages through the results until a match, so the browser may be left
+        on a later results page
 
         Args:
             search_term: Term to verify in results
@@ -177,12 +278,8 @@ class SearchPage:
         Returns:
             True if results contain the term, False otherwise
         """
-        product_names = self.get_product_names()
         search_term_lower = search_term.lower()
         
-        # Check if any product name contains the search term
-        for product_name in product_names:
-            if search_term_lower in product_name.lower():
-                return True
-        return False
+        # Stop at the first product name containing the search term
+        return self.find_product(lambda name: search_term_lower in name.lower()) is not None
 
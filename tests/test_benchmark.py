@@ -0,0 +1,57 @@
+"""
+Unit tests for the benchmark regression statistics
+Run without a browser
+"""
+import math
+
+import pytest
+
+from utils.benchmark import student_t_sf, summarize, welch_slower
+
+
+class TestStudentT:
+    """
+    Test class for the Student's t survival function
+    """
+
+    @pytest.mark.parametrize('t', [-3.0, -0.5, 0.0, 0.5, 1.0, 4.0])
+    def test_one_degree_of_freedom_is_cauchy(self, t):
+        assert student_t_sf(t, 1) == pytest.approx(0.5 - math.atan(t) / math.pi, abs=1e-9)
+
+    def test_known_critical_values(self):
+        # Upper 5% and 1% points of t with 10 degrees of freedom
+        assert student_t_sf(1.812461, 10) == pytest.approx(0.05, abs=1e-6)
+        assert student_t_sf(2.763769, 10) == pytest.approx(0.01, abs=1e-6)
+
+    def test_large_df_approaches_the_normal_distribution(self):
+        assert student_t_sf(1.644854, 1e6) == pytest.approx(0.05, abs=1e-5)
+
+
+class TestWelchSlower:
+    """
+    Test class for the one-sided Welch's t-test
+    """
+
+    def test_clearly_slower_run_has_a_small_p_value(self):
+        baseline = summarize([1.00, 1.02, 0.98, 1.01, 0.99, 1.00, 1.01, 0.99])
+        current = summarize([1.20, 1.22, 1.18, 1.21, 1.19, 1.20, 1.21, 1.19])
+
+        assert welch_slower(current, baseline) < 1e-6
+
+    def test_faster_run_is_not_slower(self):
+        baseline = summarize([1.20, 1.22, 1.18, 1.21, 1.19])
+        current = summarize([1.00, 1.02, 0.98, 1.01, 0.99])
+
+        assert welch_slower(current, baseline) > 0.99
+
+    def test_equal_means_give_one_half(self):
+        samples = summarize([1.0, 1.1, 0.9, 1.05, 0.95])
+
+        assert welch_slower(samples, samples) == pytest.approx(0.5)
+
+    def test_too_few_samples_never_regress(self):
+        assert welch_slower(summarize([5.0]), summarize([1.0, 1.1])) == 1.0
+
+    def test_constant_samples(self):
+        assert welch_slower(summarize([2.0, 2.0]), summarize([1.0, 1.0])) == 0.0
+        assert welch_slower(summarize([1.0, 1.0]), summarize([1.0, 1.0])) == 1.0
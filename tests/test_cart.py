@@ -6,7 +6,6 @@ import pytest
 
 from pages.cart_page import CartPage
 from pages.search_page import SearchPage
-from utils.config import PRODUCT_NAME
 
 
 @pytest.mark.cart
@@ -17,7 +16,7 @@ class TestCart:
     Contains test cases for various cart operations
     """
 
-    def test_add_product_to_cart(self, driver):
+    def test_add_product_to_cart(self, driver, product_name):
         """
         Test Case: Add Product to Cart
         This test verifies that a product can be added to cart
@@ -33,7 +32,7 @@ class TestCart:
         cart_page = CartPage(driver)
         
         # Search and select product
-        search_page.search(PRODUCT_NAME)
+        search_page.search(product_name)
         product_names = search_page.get_product_names()
         
         if len(product_names) > 0:
@@ -46,14 +45,14 @@ class TestCart:
             cart_page.open_cart()
             
             # Assert: Verify product is in cart
-            assert cart_page.verify_product_in_cart(PRODUCT_NAME), \
-                f"Product '{PRODUCT_NAME}' should be in cart"
+            assert cart_page.verify_product_in_cart(product_name), \
+                f"Product '{product_name}' should be in cart"
             
             # Assert: Verify cart has items
             assert cart_page.get_cart_items_count() > 0, \
                 "Cart should contain at least one item"
     
-    def test_remove_product_from_cart(self, driver):
+    def test_remove_product_from_cart(self, driver, product_name):
         """
         Test Case: Remove Product from Cart
         This test verifies that a product can be removed from cart
@@ -69,7 +68,7 @@ class TestCart:
         cart_page = CartPage(driver)
         
         # Add product to cart first
-        search_page.search(PRODUCT_NAME)
+        search_page.search(product_name)
         product_names = search_page.get_product_names()
         
         if len(product_names) > 0:
@@ -95,7 +94,7 @@ class TestCart:
                 assert new_count < initial_count, \
                     "Cart item count should decrease after removal"
     
-    def test_update_cart_quantity(self, driver):
+    def test_update_cart_quantity(self, driver, product_name):
         """
         Test Case: Update Cart Quantity
         This test verifies that product quantity can be updated in cart
@@ -111,7 +110,7 @@ class TestCart:
         cart_page = CartPage(driver)
         
         # Add product to cart
-        search_page.search(PRODUCT_NAME)
+        search_page.search(product_name)
         product_names = search_page.get_product_names()
         
         if len(product_names) > 0:
@@ -158,7 +157,7 @@ class TestCart:
         assert cart_page.is_cart_empty(), \
             "Empty cart message should be displayed when cart is empty"
     
-    def test_cart_total_calculation(self, driver):
+    def test_cart_total_calculation(self, driver, product_name):
         """
         Test Case: Cart Total Calculation
         This test verifies that cart total is calculated correctly
@@ -173,7 +172,7 @@ class TestCart:
         cart_page = CartPage(driver)
         
         # Add product to cart
-        search_page.search(PRODUCT_NAME)
+        search_page.search(product_name)
         product_names = search_page.get_product_names()
         
         if len(product_names) > 0:
@@ -190,4 +189,31 @@ class TestCart:
             
             # Note: Detailed price calculation verification
             # would require parsing and comparing individual prices
-
+    
+    def test_seeded_cart_contents(self, driver, seed_cart, catalogue, product_name):
+        """
+        Test Case: Seeded Cart Contents
+        This test verifies that a cart seeded through the cart API is shown in the browser
+        
+        Steps:
+        1. Seed the cart with two units of a product in one HTTP call
+        2. Open cart
+        3. Verify the product is in the cart
+        4. Verify the server-side cart matches
+        """
+        cart_page = CartPage(driver)
+        product = catalogue.known_match(product_name)
+        
+        # Seed cart without UI clicks
+        cart = seed_cart([{"name": product["name"], "price": product["price"], "quantity": 2}])
+        
+        # Open cart
+        cart_page.open_cart()
+        
+        # Assert: Verify product is in cart
+        assert cart_page.verify_product_in_cart(product_name), \
+            f"Seeded product '{product_name}' should be in cart"
+        
+        # Assert: Verify the server holds the seeded quantity
+        assert cart.get()["count"] == 2, \
+            "Server-side cart should hold the seeded quantity"
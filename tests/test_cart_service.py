@@ -0,0 +1,79 @@
+"""
+Unit tests for the demo site's cart storage
+Run without a browser
+"""
+import threading
+
+from utils.cart_service import CartStore
+
+
+class TestCartStore:
+    """
+    Test class for concurrent cart updates
+    """
+
+    def test_concurrent_adds_to_one_cart_are_not_lost(self):
+        store = CartStore()
+        threads, adds = 16, 200
+        start = threading.Barrier(threads)
+
+        def add_many():
+            start.wait()
+            for _ in range(adds):
+                store.add('shared', 'Laptop', 999.99)
+
+        workers = [threading.Thread(target=add_many) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        cart = store.get('shared')
+        assert cart['count'] == threads * adds
+        assert cart['version'] == threads * adds
+        assert len(cart['items']) == 1
+
+    def test_concurrent_adds_to_different_carts_stay_separate(self):
+        store = CartStore()
+        sessions = [f"session-{i}" for i in range(8)]
+
+        def add_products(session):
+            for product in ('Laptop', 'Mouse', 'Laptop'):
+                store.add(session, product, 10.0)
+
+        workers = [threading.Thread(target=add_products, args=(s,)) for s in sessions]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert store.sessions() == len(sessions)
+        for session in sessions:
+            cart = store.get(session)
+            assert [(item['name'], item['quantity']) for item in cart['items']] == [
+                ('Laptop', 2), ('Mouse', 1)
+            ]
+            assert cart['total'] == 30.0
+
+    def test_reading_an_unknown_cart_does_not_create_it(self):
+        store = CartStore()
+        assert store.get('unknown') == {'items': [], 'count': 0, 'total': 0, 'version': 0}
+        assert store.sessions() == 0
+
+    def test_clearing_a_cart_drops_its_session(self):
+        store = CartStore()
+        store.add('session', 'Laptop', 999.99)
+        cart = store.clear('session')
+        assert (cart['count'], cart['version']) == (0, 2)
+        assert store.sessions() == 0
+        assert store.add('session', 'Mouse', 10.0)['count'] == 1
+
+    def test_least_recently_used_carts_are_dropped_beyond_the_limit(self):
+        store = CartStore(max_sessions=3)
+        for session in ('a', 'b', 'c'):
+            store.add(session, 'Laptop', 999.99)
+        store.get('a')
+        store.add('d', 'Mouse', 10.0)
+        assert store.sessions() == 3
+        assert store.get('b')['count'] == 0
+        assert store.get('a')['count'] == 1
@@ -2,13 +2,15 @@
 Test cases for Checkout functionality
 Tests complete checkout process
 """
+import json
+
 import pytest
 
 from pages.cart_page import CartPage
 from pages.checkout_page import CheckoutPage
 from pages.login_page import LoginPage
 from pages.search_page import SearchPage
-from utils.config import PRODUCT_NAME, TEST_PASSWORD, TEST_USERNAME
+from utils.config import TEST_PASSWORD, TEST_USERNAME
 
 
 @pytest.mark.checkout
@@ -20,7 +22,7 @@ class TestCheckout:
     """
 
     @pytest.fixture(autouse=True)
-    def setup_cart(self, driver):
+    def setup_cart(self, driver, product_name):
         """
         Fixture to set up cart before checkout tests
         Adds a product to cart for testing checkout flow
@@ -38,7 +40,7 @@ class TestCheckout:
         search_page = SearchPage(driver)
         cart_page = CartPage(driver)
         
-        search_page.search(PRODUCT_NAME)
+        search_page.search(product_name)
         product_names = search_page.get_product_names()
         
         if len(product_names) > 0:
@@ -98,6 +100,48 @@ class TestCheckout:
         assert order_id != "", \
             "Order ID should be displayed after successful order"
     
+    @pytest.mark.dataset("billing_details.csv")
+    def test_checkout_with_dataset_billing_details(self, driver, dataset_row):
+        """
+        Test Case: Checkout with Billing Details from data/billing_details.csv
+        This test verifies that each row of billing details is accepted and
+        submitted with the order
+
+        Steps:
+        1. Add product to cart (done in fixture)
+        2. Proceed to checkout
+        3. Fill billing details from the dataset row
+        4. Complete checkout
+        5. Verify the order carries the submitted details
+        """
+        cart_page = CartPage(driver)
+        checkout_page = CheckoutPage(driver)
+
+        cart_page.open_cart()
+        cart_page.click_checkout()
+
+        checkout_page.complete_checkout(
+            billing_details=dataset_row,
+            shipping_method="Flat Rate",
+            payment_method="Cash On Delivery"
+        )
+
+        assert checkout_page.is_order_successful(), \
+            f"Order should be placed successfully for {dataset_row}"
+
+        # The demo site keeps the submitted form of the last order
+        order = json.loads(driver.execute_script("return localStorage.getItem('lastOrderData');"))
+        submitted = {
+            'first_name': order['firstname'],
+            'last_name': order['lastname'],
+            'city': order['city'],
+            'postcode': order['postcode'],
+            'country': order['country'],
+            'region': order['zone'],
+        }
+        assert submitted == {field: dataset_row[field] for field in submitted}, \
+            "Order should carry the billing details that were entered"
+
     def test_checkout_without_terms_acceptance(self, driver):
         """
         Test Case: Checkout without Accepting Terms
@@ -0,0 +1,54 @@
+"""
+Unit tests for dataset case selection
+Run without a browser
+"""
+import pytest
+
+from utils.datasets import Dataset, select_cases, write_dataset
+
+
+class TestSelectCases:
+    """
+    Test class for sampling and sharding dataset rows
+    """
+
+    def test_no_sample_selects_every_row(self):
+        assert list(select_cases(5)) == [0, 1, 2, 3, 4]
+        assert list(select_cases(5, sample=0)) == [0, 1, 2, 3, 4]
+        assert list(select_cases(5, sample=10)) == [0, 1, 2, 3, 4]
+
+    def test_sample_is_sorted_reproducible_and_seeded(self):
+        first = select_cases(100_000, sample=50, seed=7)
+
+        assert len(first) == 50
+        assert list(first) == sorted(set(first))
+        assert select_cases(100_000, sample=50, seed=7) == first
+        assert select_cases(100_000, sample=50, seed=8) != first
+
+    @pytest.mark.parametrize('sample', [None, 37])
+    def test_shards_split_the_same_selection(self, sample):
+        selected = list(select_cases(200, sample=sample, seed=3))
+
+        shards = [list(select_cases(200, sample=sample, seed=3, shard=(i, 4))) for i in range(1, 5)]
+
+        assert sorted(row for shard in shards for row in shard) == selected
+        assert max(map(len, shards)) - min(map(len, shards)) <= 1
+
+
+class TestDataset:
+    """
+    Test class for reading rows through the offset index
+    """
+
+    @pytest.mark.parametrize('suffix', ['.csv', '.jsonl'])
+    def test_rows_are_read_back_by_index(self, tmp_path, suffix):
+        records = [{'term': f"term {i}", 'expected': 'results'} for i in range(20)]
+        path = tmp_path / f"terms{suffix}"
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            write_dataset(records, f)
+
+        dataset = Dataset(str(path))
+
+        assert len(dataset) == 20
+        assert dataset.row(13) == records[13]
+        assert list(dataset.rows([19, 0, 7])) == [records[19], records[0], records[7]]
@@ -89,6 +89,33 @@ class TestLogin:
             "Error message should be displayed for invalid password"
         )
     
+    @pytest.mark.dataset("credentials.jsonl")
+    def test_login_from_dataset(self, driver, dataset_row):
+        """
+        Test Case: Credentials from data/credentials.jsonl
+        This test verifies that each credential pair logs in or is rejected
+        as the dataset row expects
+
+        Steps:
+        1. Navigate to login page
+        2. Enter the email and password of the dataset row
+        3. Click login button
+        4. Verify successful login or the error message
+        """
+        login_page = LoginPage(driver)
+        login_page.navigate_to_login()
+
+        login_page.login(dataset_row['email'], dataset_row['password'])
+
+        if dataset_row['expected'] == 'success':
+            assert login_page.is_login_successful(), (
+                f"Login should be successful for {dataset_row['email']}"
+            )
+        else:
+            assert login_page.is_error_message_displayed(), (
+                f"Error message should be displayed for {dataset_row['email']}"
+            )
+
     def test_empty_credentials_login(self, driver):
         """
         Test Case: Empty Credentials Login
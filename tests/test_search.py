@@ -5,18 +5,18 @@ Tests product search and search results validation
 import pytest
 
 from pages.search_page import SearchPage
-from utils.config import PRODUCT_NAME, SEARCH_TERM
 
 
 @pytest.mark.search
 @pytest.mark.smoke
+@pytest.mark.readonly
 class TestSearch:
     """
     Test class for search functionality
     Contains test cases for various search scenarios
     """
 
-    def test_search_valid_product(self, driver):
+    def test_search_valid_product(self, driver, search_term):
         """
         Test Case: Search Valid Product
         This test verifies that searching for a valid product returns results
@@ -31,17 +31,43 @@ class TestSearch:
         search_page = SearchPage(driver)
         
         # Perform search
-        search_page.search(SEARCH_TERM)
+        search_page.search(search_term)
         
         # Assert: Verify search results are displayed
         results_count = search_page.get_search_results_count()
         assert results_count > 0, \
-            f"Search should return results for '{SEARCH_TERM}'"
+            f"Search should return results for '{search_term}'"
         
         # Assert: Verify results contain the search term
-        assert search_page.verify_search_results_contain(SEARCH_TERM), \
-            f"Search results should contain '{SEARCH_TERM}'"
+        assert search_page.verify_search_results_contain(search_term), \
+            f"Search results should contain '{search_term}'"
     
+    @pytest.mark.dataset("search_terms.csv")
+    def test_search_from_dataset(self, driver, dataset_row):
+        """
+        Test Case: Search Terms from data/search_terms.csv
+        This test verifies each search term returns matching results,
+        or the "no results" message when none are expected
+
+        Steps:
+        1. Navigate to homepage
+        2. Search for the term of the dataset row
+        3. Verify matching results or the "no results" message
+        """
+        search_page = SearchPage(driver)
+        term = dataset_row['term']
+
+        search_page.search(term)
+
+        if dataset_row['expected'] == 'results':
+            assert search_page.get_search_results_count() > 0, \
+                f"Search should return results for '{term}'"
+            assert search_page.verify_search_results_contain(term), \
+                f"Search results should contain '{term}'"
+        else:
+            assert search_page.is_no_results_message_displayed(), \
+                f"No results message should be displayed for '{term}'"
+
     def test_search_invalid_product(self, driver):
         """
         Test Case: Search Invalid Product
@@ -107,7 +133,7 @@ class TestSearch:
         # May show all products, show error, or prevent search
         assert True, "System should handle empty search appropriately"
     
-    def test_search_case_insensitive(self, driver):
+    def test_search_case_insensitive(self, driver, search_term):
         """
         Test Case: Case Insensitive Search
         This test verifies that search is case-insensitive
@@ -121,18 +147,18 @@ class TestSearch:
         search_page = SearchPage(driver)
         
         # Search with uppercase
-        search_page.search(SEARCH_TERM.upper())
+        search_page.search(search_term.upper())
         upper_results = search_page.get_search_results_count()
         
         # Search with lowercase
-        search_page.search(SEARCH_TERM.lower())
+        search_page.search(search_term.lower())
         lower_results = search_page.get_search_results_count()
         
         # Assert: Results should be the same regardless of case
         assert upper_results == lower_results, \
             "Search should be case-insensitive"
     
-    def test_search_and_select_product(self, driver):
+    def test_search_and_select_product(self, driver, product_name):
         """
         Test Case: Search and Select Product
         This test verifies that user can click on a product from search results
@@ -146,19 +172,43 @@ class TestSearch:
         search_page = SearchPage(driver)
         
         # Search for product
-        search_page.search(PRODUCT_NAME)
+        search_page.search(product_name)
         
         # Get product names from results
         product_names = search_page.get_product_names()
         assert len(product_names) > 0, \
-            f"Search should return results for '{PRODUCT_NAME}'"
+            f"Search should return results for '{product_name}'"
         
         # Click on first product
         search_page.click_product(product_names[0])
         
         # Assert: Verify we're on product detail page
         # This can be verified by checking URL or page elements
-        assert PRODUCT_NAME.lower() in driver.current_url.lower() or \
-               PRODUCT_NAME.lower() in driver.page_source.lower(), \
+        assert product_name.lower() in driver.current_url.lower() or \
+               product_name.lower() in driver.page_source.lower(), \
             "Product detail page should be opened"
-
+    
+    def test_search_results_across_pages(self, driver, search_term):
+        """
+        Test Case: Search Results Across Pages
+        This test verifies that paging through the results yields every match
+        
+        Steps:
+        1. Navigate to homepage
+        2. Search for a product
+        3. Read product names page by page
+        4. Verify every result matches and the total count is reached
+        """
+        search_page = SearchPage(driver)
+        
+        # Search for product
+        search_page.search(search_term)
+        
+        # Read every results page
+        product_names = list(search_page.iter_product_names())
+        
+        # Assert: Every page was visited and every result matches
+        assert len(product_names) == search_page.get_search_results_count(), \
+            "Paging should visit every search result"
+        assert all(search_term.lower() in name.lower() for name in product_names), \
+            f"All search results should contain '{search_term}'"
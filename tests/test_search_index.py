@@ -0,0 +1,44 @@
+"""
+Unit tests for the demo site's trigram search index
+Run without a browser
+"""
+import pytest
+
+from utils.catalogue import Catalogue
+from utils.search_index import SearchIndex
+
+
+@pytest.fixture(scope="module")
+def index():
+    """
+    Index of a small synthetic catalogue
+    """
+    return SearchIndex.from_catalogue(Catalogue(2000, seed=3))
+
+
+class TestSearchIndex:
+    """
+    Test class comparing indexed search with a linear scan
+    """
+
+    @pytest.mark.parametrize('term', [
+        '', ' ', 'a', 'La', 'lap', 'LAPTOP', 'top ', 'mac', 'pro', '-1', 'x-19', 'book a',
+        'zzzq', 'ä', 'headphones',
+    ])
+    def test_search_matches_a_linear_scan(self, index, term):
+        assert index.search(term) == index.scan(term)
+
+    def test_every_product_name_finds_itself(self, index):
+        for position in range(0, len(index), 97):
+            assert position in index.search(index.names[position])
+
+    def test_page_slices_the_matches(self, index):
+        matches = index.scan('pro')
+        catalogue = Catalogue(2000, seed=3)
+
+        result = index.page(catalogue, 2, 5, 'pro')
+
+        assert result['total'] == len(matches)
+        assert [p['name'] for p in result['products']] == [
+            catalogue.product(position)['name'] for position in matches[5:10]
+        ]
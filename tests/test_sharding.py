@@ -0,0 +1,53 @@
+"""
+Unit tests for duration-balanced sharding
+Run without a browser
+"""
+import itertools
+
+import pytest
+
+from utils.sharding import parse_shard, partition
+
+
+class TestPartition:
+    """
+    Test class for the longest-processing-time-first partition
+    """
+
+    def test_every_test_lands_in_exactly_one_shard(self):
+        nodeids = [f"tests/test_{i}.py::test" for i in range(25)]
+        durations = {nodeid: float(i % 7 + 1) for i, nodeid in enumerate(nodeids)}
+
+        shards = partition(nodeids, durations, 4)
+
+        assert len(shards) == 4
+        assert sorted(itertools.chain.from_iterable(shards)) == sorted(nodeids)
+
+    def test_shards_are_balanced_by_duration(self):
+        durations = {'a': 8.0, 'b': 7.0, 'c': 6.0, 'd': 5.0, 'e': 4.0}
+
+        shards = partition(durations, durations, 2)
+
+        loads = sorted(sum(durations[n] for n in shard) for shard in shards)
+        # a | b, then c joins b, d joins a and e breaks the 13/13 tie towards the first shard
+        assert loads == [13.0, 17.0]
+
+    def test_result_is_deterministic(self):
+        nodeids = ['z', 'y', 'x', 'w']
+        durations = {'z': 1.0, 'y': 1.0, 'x': 1.0, 'w': 1.0}
+
+        assert partition(nodeids, durations, 3) == partition(reversed(nodeids), durations, 3)
+        assert partition(nodeids, durations, 3) == [['w', 'z'], ['x'], ['y']]
+
+    def test_unknown_tests_get_the_average_duration(self):
+        durations = {'slow': 10.0, 'fast': 2.0}
+
+        shards = partition(['slow', 'fast', 'new1', 'new2'], durations, 2)
+
+        # New tests weigh 6s each: slow | new1, new2 joins new1 and fast evens out at 12/12
+        assert shards == [['slow', 'fast'], ['new1', 'new2']]
+
+    @pytest.mark.parametrize('value', ['0/3', '4/3', '1', 'a/b', '1/0'])
+    def test_invalid_shard_specs_are_rejected(self, value):
+        with pytest.raises(ValueError):
+            parse_shard(value)
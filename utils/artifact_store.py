@@ -0,0 +1,338 @@
+"""
+Content-addressed artifact store for E-commerce Test Suite
+Stores screenshots, DOM dumps, logs and report assets once per distinct
+content, keyed by SHA-256, with a manifest mapping runs and file names to
+blobs and an eviction policy by age and total size
+
+Usage:
+    python -m utils.artifact_store ingest screenshots allure-results htmlcov logs --run 42
+    python -m utils.artifact_store restore --run 42 restored/
+    python -m utils.artifact_store gc --max-age-days 14 --max-size 2GB
+    python -m utils.artifact_store stats
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional
+
+DEFAULT_STORE_DIR = 'artifacts'
+MANIFEST_NAME = 'manifest.jsonl'
+CHUNK_SIZE = 1024 * 1024
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a size such as "500MB" or "2GB"
+
+    Args:
+        value: Number of bytes, optionally with a KB, MB or GB suffix
+
+    Returns:
+        Size in bytes
+    """
+    value = value.strip().upper()
+    for suffix, factor in (('GB', 1024 ** 3), ('MB', 1024 ** 2), ('KB', 1024), ('B', 1)):
+        if value.endswith(suffix):
+            return int(float(value[:-len(suffix)]) * factor)
+    return int(value)
+
+
+class ArtifactStore:
+    """
+    Directory of blobs named by the SHA-256 of their content
+
+    Blobs live in blobs/<first two hex digits>/<digest>. Every stored file
+    appends a reference (run, name, digest, size) to manifest.jsonl, so the
+    same screenshot stored by several retries, browsers or runs takes disk
+    space once. Blobs are written to a temporary file and renamed, which
+    makes concurrent writers of the same content (xdist workers) safe, and a
+    blob's mtime is refreshed on every reference so eviction keeps what is
+    still being produced.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR):
+        """
+        Initialize ArtifactStore
+
+        Args:
+            root: Store directory, created if missing
+        """
+        self.root = root
+        self.blobs_dir = os.path.join(root, 'blobs')
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        os.makedirs(self.blobs_dir, exist_ok=True)
+
+    def blob_path(self, digest: str) -> str:
+        """
+        Path of a blob
+
+        Args:
+            digest: SHA-256 hex digest
+
+        Returns:
+            Path inside the store
+        """
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    def _add_blob(self, digest: str, write) -> bool:
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            os.utime(path)
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+        return True
+
+    def _reference(self, digest: str, name: str, size: int, run: str, meta: Optional[Dict]):
+        entry = {'run': run, 'name': name, 'hash': digest, 'size': size, 'time': time.time()}
+        if meta:
+            entry.update(meta)
+        # One short append per reference, atomic for concurrent workers
+        with open(self.manifest_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    def put_bytes(self, data: bytes, name: str, run: str = '', meta: Optional[Dict] = None) -> str:
+        """
+        Store content and reference it under a name
+
+        Args:
+            data: File content
+            name: File name the content is referenced by (e.g. "screenshots/test-chrome-gw0.png")
+            run: Run the reference belongs to
+            meta: Extra manifest fields (e.g. test id)
+
+        Returns:
+            SHA-256 hex digest
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        self._add_blob(digest, lambda f: f.write(data))
+        self._reference(digest, name, len(data), run, meta)
+        return digest
+
+    def put_file(self, path: str, name: Optional[str] = None, run: str = '',
+                 meta: Optional[Dict] = None) -> str:
+        """
+        Store a file's content and reference it under a name
+
+        Args:
+            path: File to store
+            name: Reference name, the path by default
+            run: Run the reference belongs to
+            meta: Extra manifest fields
+
+        Returns:
+            SHA-256 hex digest
+        """
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+
+        def copy(target):
+            with open(path, 'rb') as source:
+                shutil.copyfileobj(source, target, CHUNK_SIZE)
+
+        self._add_blob(digest, copy)
+        name = (name or path).replace(os.sep, '/')
+        self._reference(digest, name, os.path.getsize(path), run, meta)
+        return digest
+
+    def ingest(self, directory: str, run: str = '') -> Dict[str, str]:
+        """
+        Store every file of a directory tree
+
+        Args:
+            directory: Directory such as screenshots/, allure-results/ or htmlcov/
+            run: Run the references belong to
+
+        Returns:
+            Dictionary of reference name -> digest
+        """
+        stored = {}
+        for folder, _, files in os.walk(directory):
+            for file_name in sorted(files):
+                path = os.path.join(folder, file_name)
+                stored[path.replace(os.sep, '/')] = self.put_file(path, run=run)
+        return stored
+
+    def references(self, run: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Iterate over the manifest
+
+        Args:
+            run: Only references of this run
+
+        Yields:
+            Manifest entries, oldest first
+        """
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    if run is None or entry['run'] == run:
+                        yield entry
+
+    def restore(self, run: str, destination: str, link: bool = False) -> int:
+        """
+        Recreate a run's files from their blobs
+
+        Files are copied by default. Hard links share the blob, so linked
+        files (and with them the blobs) are made read-only to keep an edit
+        from changing every run that references the same content.
+
+        Args:
+            run: Run to restore
+            destination: Directory receiving the files under their reference names
+            link: Hard-link the blobs where possible instead of copying
+
+        Returns:
+            Number of files restored
+        """
+        latest = {entry['name']: entry['hash'] for entry in self.references(run)}
+        for name, digest in latest.items():
+            target = os.path.join(destination, name)
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            if os.path.exists(target):
+                os.unlink(target)
+            if link:
+                try:
+                    os.link(self.blob_path(digest), target)
+                    os.chmod(target, 0o444)
+                    continue
+                except OSError:
+                    pass
+            shutil.copyfile(self.blob_path(digest), target)
+        return len(latest)
+
+    def _blobs(self) -> List[tuple]:
+        blobs = []
+        for folder, _, files in os.walk(self.blobs_dir):
+            for file_name in files:
+                if file_name.startswith('.tmp-'):
+                    continue
+                stat = os.stat(os.path.join(folder, file_name))
+                blobs.append((stat.st_mtime, stat.st_size, file_name))
+        return blobs
+
+    def gc(self, max_age_days: Optional[float] = None, max_bytes: Optional[int] = None) -> Dict:
+        """
+        Evict blobs by age, then least recently referenced first down to a size budget
+
+        References to evicted blobs are dropped from the manifest.
+
+        Args:
+            max_age_days: Evict blobs not referenced for longer than this
+            max_bytes: Evict the least recently referenced blobs until the store fits
+
+        Returns:
+            Dictionary with evicted blob count, freed bytes and remaining bytes
+        """
+        blobs = sorted(self._blobs())
+        evicted = set()
+        freed = 0
+        total = sum(size for _, size, _ in blobs)
+        cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+        for mtime, size, digest in blobs:
+            expired = cutoff is not None and mtime < cutoff
+            if expired or (max_bytes is not None and total > max_bytes):
+                os.unlink(self.blob_path(digest))
+                evicted.add(digest)
+                freed += size
+                total -= size
+
+        if evicted and os.path.exists(self.manifest_path):
+            kept = [entry for entry in self.references() if entry['hash'] not in evicted]
+            temp = self.manifest_path + '.tmp'
+            with open(temp, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(entry) + '\n' for entry in kept)
+            os.replace(temp, self.manifest_path)
+        return {'evicted': len(evicted), 'freed_bytes': freed, 'remaining_bytes': total}
+
+    def stats(self) -> Dict:
+        """
+        Measure the space saved by deduplication
+
+        Returns:
+            Dictionary with blob count and bytes, reference count and referenced bytes
+        """
+        blobs = self._blobs()
+        references = list(self.references())
+        return {
+            'blobs': len(blobs),
+            'stored_bytes': sum(size for _, size, _ in blobs),
+            'references': len(references),
+            'referenced_bytes': sum(entry['size'] for entry in references),
+        }
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description='Content-addressed artifact store')
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help='Store directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    ingest = subparsers.add_parser('ingest', help='Store every file of some directories')
+    ingest.add_argument('directories', nargs='+')
+    ingest.add_argument('--run', default='', help='Run id the files belong to (e.g. CI run number)')
+    ingest.add_argument('--remove', action='store_true', help='Delete the originals once stored')
+    restore = subparsers.add_parser('restore', help="Recreate a run's files")
+    restore.add_argument('destination')
+    restore.add_argument('--run', default='')
+    restore.add_argument('--link', action='store_true',
+                         help='Hard-link read-only files to the blobs instead of copying')
+    collect = subparsers.add_parser('gc', help='Evict blobs by age and total size')
+    collect.add_argument('--max-age-days', type=float)
+    collect.add_argument('--max-size', type=parse_size, help='Size budget, e.g. 2GB')
+    subparsers.add_parser('stats', help='Show deduplication savings')
+    args = parser.parse_args(argv)
+
+    store = ArtifactStore(args.store)
+    if args.command == 'ingest':
+        for directory in args.directories:
+            if not os.path.isdir(directory):
+                continue
+            stored = store.ingest(directory, args.run)
+            print(f"{directory}: {len(stored)} files, {len(set(stored.values()))} distinct")
+            if args.remove:
+                shutil.rmtree(directory)
+    elif args.command == 'restore':
+        restored = store.restore(args.run, args.destination, args.link)
+        print(f"Restored {restored} files to {args.destination}")
+    elif args.command == 'gc':
+        result = store.gc(args.max_age_days, args.max_size)
+        print(f"Evicted {result['evicted']} blobs, "
+              f"freed {result['freed_bytes'] / 1024 ** 2:.1f} MiB, "
+              f"{result['remaining_bytes'] / 1024 ** 2:.1f} MiB left")
+    else:
+        stats = store.stats()
+        saved = stats['referenced_bytes'] - stats['stored_bytes']
+        print(f"{stats['references']} references to {stats['blobs']} blobs, "
+              f"{stats['stored_bytes'] / 1024 ** 2:.1f} MiB stored, "
+              f"{saved / 1024 ** 2:.1f} MiB saved by deduplication")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+Failure artifact capture for E-commerce Test Suite
+Grabs the screenshot, DOM and console logs of a failing test from the
+browser and leaves decoding, compression and disk writes to a background
+writer thread, so failures do not slow down the tests that follow
+"""
+import base64
+import gzip
+import json
+import os
+import queue
+import re
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from utils.artifact_store import ArtifactStore
+
+try:
+    import allure
+except ImportError:  # allure-pytest is optional
+    allure = None
+
+DEFAULT_ARTIFACTS_DIR = 'screenshots'
+
+
+def artifact_stem(nodeid: str, browser: Optional[str], worker: str) -> str:
+    """
+    Collision-free file name stem for a test's artifacts
+
+    Args:
+        nodeid: Test node id
+        browser: Browser the test ran in, None without a driver
+        worker: xdist worker id
+
+    Returns:
+        Node id with unsafe characters replaced, followed by browser and worker
+    """
+    test = re.sub(r'[^\w.-]+', '_', nodeid).strip('_')[-150:]
+    return '-'.join(part for part in (test, browser, worker) if part)
+
+
+class ArtifactWriter:
+    """
+    Background thread turning raw artifact payloads into files
+
+    Each job is a path and a callable producing the file's bytes, so the
+    expensive part (base64 decoding, gzip, JSON encoding) runs on the writer
+    thread too. Up to max_pending jobs are queued; beyond that submit() waits
+    rather than holding an unbounded number of screenshots in memory.
+
+    With a content-addressed store, files are stored as deduplicated blobs
+    referenced by their path in the store's manifest instead, and reference()
+    gives the blob digest for reports.
+    """
+
+    def __init__(self, directory: str = DEFAULT_ARTIFACTS_DIR, max_pending: int = 64,
+                 store: Optional[ArtifactStore] = None, run: str = ''):
+        """
+        Initialize ArtifactWriter
+
+        Args:
+            directory: Directory receiving the artifacts
+            max_pending: Maximum number of queued jobs
+            store: Content-addressed store to write to instead of the directory
+            run: Run the stored artifacts belong to
+        """
+        self.directory = directory
+        self.store = store
+        self.run = run
+        self.jobs: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.stems: Dict[str, int] = {}
+        self.digests: Dict[str, Future] = {}
+        self.written = 0
+        self.errors: List[str] = []
+        self.thread = threading.Thread(target=self._run, name='artifact-writer', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            path, produce, future = job
+            digest = None
+            try:
+                data = produce()
+                if self.store is not None:
+                    digest = self.store.put_bytes(data, path.replace(os.sep, '/'), self.run)
+                else:
+                    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                    with open(path, 'wb') as f:
+                        f.write(data)
+                self.written += 1
+            except Exception as e:
+                self.errors.append(f"{path}: {e}")
+            finally:
+                if future is not None:
+                    future.set_result(digest)
+
+    def unique_stem(self, stem: str) -> str:
+        """
+        Reserve a stem, numbering repeats such as in-session retries
+
+        Args:
+            stem: Stem from artifact_stem()
+
+        Returns:
+            Stem not handed out before by this writer
+        """
+        count = self.stems.get(stem, 0) + 1
+        self.stems[stem] = count
+        return stem if count == 1 else f"{stem}-{count}"
+
+    def submit(self, name: str, produce: Callable[[], bytes]) -> str:
+        """
+        Queue a file for writing
+
+        Args:
+            name: File name inside the artifacts directory
+            produce: Callable returning the file content, run on the writer thread
+
+        Returns:
+            Path the file will be written to, its name in the store's manifest with a store
+        """
+        path = os.path.join(self.directory, name)
+        future = None
+        if self.store is not None:
+            future = self.digests[path] = Future()
+        self.jobs.put((path, produce, future))
+        return path
+
+    def reference(self, path: str, timeout: float = 60) -> Dict[str, Optional[str]]:
+        """
+        Reference of a submitted file for reports
+
+        With a store, waits until the file is stored to get the digest of
+        its blob; without one, files are referenced by path only.
+
+        Args:
+            path: Path returned by submit()
+            timeout: Seconds to wait for the file to be stored
+
+        Returns:
+            Dictionary with the name and the SHA-256 digest of the blob,
+            None without a store or if storing failed
+        """
+        future = self.digests.pop(path, None)
+        return {'name': path, 'sha256': future.result(timeout) if future else None}
+
+    def close(self):
+        """
+        Write every queued artifact and stop the thread
+        """
+        self.jobs.put(None)
+        self.thread.join()
+
+
+def capture_failure(driver, writer: ArtifactWriter, stem: str) -> List[str]:
+    """
+    Grab a failing test's screenshot, DOM and console logs
+
+    Only the WebDriver calls run on the test's thread; the payloads are
+    handed to the writer as they come from the browser.
+
+    Args:
+        driver: WebDriver instance
+        writer: Background writer
+        stem: Stem reserved with writer.unique_stem()
+
+    Returns:
+        Paths the artifacts will be written to
+    """
+    paths = []
+
+    screenshot = driver.get_screenshot_as_base64()
+    paths.append(writer.submit(f"{stem}.png", lambda: base64.b64decode(screenshot)))
+
+    try:
+        dom = driver.page_source
+    except Exception:
+        dom = None
+    if dom is not None:
+        paths.append(writer.submit(
+            f"{stem}.html.gz", lambda: gzip.compress(dom.encode('utf-8'), 6, mtime=0)
+        ))
+
+    try:
+        # Only Chromium-based drivers expose the browser console
+        console = driver.get_log('browser')
+    except Exception:
+        console = None
+    if console:
+        paths.append(writer.submit(
+            f"{stem}.console.jsonl",
+            lambda: ''.join(json.dumps(entry) + '\n' for entry in console).encode('utf-8'),
+        ))
+    return paths
+
+
+def format_reference(reference: Dict[str, Optional[str]]) -> str:
+    """
+    Format an artifact reference as "name sha256:<digest>"
+
+    Args:
+        reference: Result of ArtifactWriter.reference()
+
+    Returns:
+        Name followed by the blob digest, the name alone without one
+    """
+    if reference['sha256']:
+        return f"{reference['name']} sha256:{reference['sha256']}"
+    return reference['name'] or ''
+
+
+def attach_references(item, report, references: List[Dict[str, Optional[str]]]):
+    """
+    Attach a failing test's artifact references to its pytest-html row and Allure result
+
+    Args:
+        item: Test item
+        report: Call phase report of the test
+        references: Results of ArtifactWriter.reference()
+    """
+    text = '\n'.join(format_reference(reference) for reference in references)
+    html = item.config.pluginmanager.getplugin('html')
+    if html is not None:
+        extras = getattr(report, 'extras', [])
+        extras.append(html.extras.text(text, name='Failure artifacts'))
+        report.extras = extras
+    if allure is not None:
+        allure.attach(text, name='failure artifacts', attachment_type=allure.attachment_type.TEXT)
@@ -0,0 +1,326 @@
+"""
+Page-flow benchmarking for E-commerce Test Suite
+Runs canonical flows with warm-up and repetitions, compares them with stored
+baselines using Welch's t-test and writes the results as JSON
+
+Usage:
+    pytest benchmarks/
+    pytest benchmarks/ --benchmark-save            # record new baselines
+    pytest benchmarks/ --benchmark-confidence 0.95 --benchmark-json results.json
+    python -m utils.benchmark save benchmark-results.json   # promote a run to the baselines
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from utils.method_timing import current_commit, percentile
+
+DEFAULT_BASELINE_PATH = os.path.join('benchmarks', 'baselines.json')
+DEFAULT_RESULTS_PATH = 'benchmark-results.json'
+BASELINE_KEYS = ('n', 'mean', 'stdev', 'median', 'p95', 'samples')
+
+
+def _betacf(a: float, b: float, x: float) -> float:
+    # Continued fraction of the incomplete beta function (modified Lentz)
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 201):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= d * c
+        if abs(d * c - 1.0) < 1e-12:
+            break
+    return result
+
+
+def regularized_beta(a: float, b: float, x: float) -> float:
+    """
+    Regularized incomplete beta function I_x(a, b)
+
+    Args:
+        a: First shape parameter
+        b: Second shape parameter
+        x: Point between 0 and 1
+
+    Returns:
+        Value between 0 and 1
+    """
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def student_t_sf(t: float, df: float) -> float:
+    """
+    Survival function P(T > t) of Student's t distribution
+
+    Args:
+        t: t statistic
+        df: Degrees of freedom
+
+    Returns:
+        One-sided p-value
+    """
+    tail = 0.5 * regularized_beta(df / 2, 0.5, df / (df + t * t))
+    return tail if t > 0 else 1.0 - tail
+
+
+def summarize(samples: List[float]) -> Dict:
+    """
+    Summary statistics of a flow's repetitions
+
+    Args:
+        samples: Durations in seconds
+
+    Returns:
+        Dictionary with n, mean, stdev, min, median, p95 and the samples
+    """
+    return {
+        'n': len(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'p95': percentile(samples, 0.95),
+        'samples': samples,
+    }
+
+
+def welch_slower(current: Dict, baseline: Dict) -> float:
+    """
+    One-sided Welch's t-test that the current mean is above the baseline mean
+
+    Args:
+        current: summarize() output of the current run
+        baseline: summarize() output of the baseline
+
+    Returns:
+        p-value, small when the current run is significantly slower
+    """
+    if current['n'] < 2 or baseline['n'] < 2:
+        return 1.0
+    var_current = current['stdev'] ** 2 / current['n']
+    var_baseline = baseline['stdev'] ** 2 / baseline['n']
+    difference = current['mean'] - baseline['mean']
+    error = math.sqrt(var_current + var_baseline)
+    if error == 0:
+        return 0.0 if difference > 0 else 1.0
+    df = (var_current + var_baseline) ** 2 / (
+        (var_current ** 2 / (current['n'] - 1) if var_current else 0.0)
+        + (var_baseline ** 2 / (baseline['n'] - 1) if var_baseline else 0.0)
+    )
+    return student_t_sf(difference / error, df)
+
+
+class BenchmarkSession:
+    """
+    pytest plugin measuring flows and gating them against baselines
+
+    Baselines are kept per browser in a JSON file. A flow regresses when its
+    mean is slower than the baseline with the configured confidence and by
+    more than the minimum relative change, so small but consistent noise on a
+    quiet machine does not fail the gate.
+    """
+
+    def __init__(self, baseline_path: str = DEFAULT_BASELINE_PATH,
+                 results_path: str = DEFAULT_RESULTS_PATH, warmup: int = 2,
+                 repetitions: int = 10, confidence: float = 0.99, min_change: float = 0.05,
+                 save: bool = False, require_baseline: bool = False):
+        """
+        Initialize BenchmarkSession
+
+        Args:
+            baseline_path: JSON file of the baselines
+            results_path: JSON file receiving this run's results
+            warmup: Untimed runs before measuring each flow
+            repetitions: Timed runs per flow
+            confidence: Confidence required to call a flow slower (0.99 = p < 0.01)
+            min_change: Minimum relative slowdown of the mean to fail (0.05 = 5%)
+            save: Store this run's results as the new baselines
+            require_baseline: Fail flows that have no baseline instead of warning
+        """
+        self.baseline_path = baseline_path
+        self.results_path = results_path
+        self.warmup = warmup
+        self.repetitions = repetitions
+        self.confidence = confidence
+        self.min_change = min_change
+        self.save = save
+        self.require_baseline = require_baseline
+        self.baselines: Dict[str, Dict] = {}
+        if os.path.exists(baseline_path):
+            with open(baseline_path, encoding='utf-8') as f:
+                self.baselines = json.load(f)
+        self.results: Dict[str, Dict[str, Dict]] = {}
+        self.missing: List[str] = []
+
+    def measure(self, name: str, browser: str, flow: Callable,
+                setup: Optional[Callable] = None) -> Dict:
+        """
+        Run a flow with warm-up and repetitions and compare it with its baseline
+
+        Args:
+            name: Flow name
+            browser: Browser the flow runs in
+            flow: Callable timed on each repetition
+            setup: Untimed callable run before every warm-up and repetition
+
+        Returns:
+            summarize() output plus baseline, change, p_value and regressed;
+            baseline stays None when the flow has no baseline
+        """
+        samples = []
+        for repetition in range(self.warmup + self.repetitions):
+            if setup:
+                setup()
+            started = time.perf_counter()
+            flow()
+            elapsed = time.perf_counter() - started
+            if repetition >= self.warmup:
+                samples.append(elapsed)
+
+        result = summarize(samples)
+        baseline = self.baselines.get(browser, {}).get(name)
+        result.update(baseline=None, change=None, p_value=None, regressed=False)
+        if baseline and not self.save:
+            result['baseline'] = {key: baseline[key] for key in ('n', 'mean', 'stdev', 'commit')}
+            result['change'] = result['mean'] / baseline['mean'] - 1
+            result['p_value'] = welch_slower(result, baseline)
+            result['regressed'] = (result['p_value'] < 1 - self.confidence
+                                   and result['change'] > self.min_change)
+        elif not self.save:
+            self.missing.append(f"{browser}/{name}")
+        self.results.setdefault(browser, {})[name] = result
+        return result
+
+    def pytest_sessionfinish(self, session):
+        if not self.results:
+            return
+        commit = current_commit()
+        with open(self.results_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'commit': commit,
+                'recorded_at': time.time(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'warmup': self.warmup,
+                'repetitions': self.repetitions,
+                'confidence': self.confidence,
+                'min_change': self.min_change,
+                'results': self.results,
+            }, f, indent=2)
+        if self.save:
+            update_baselines(self.baselines, self.results, commit)
+            write_baselines(self.baselines, self.baseline_path)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.results:
+            return
+        terminalreporter.write_sep('=', 'benchmarks')
+        terminalreporter.write_line(
+            f"{'browser':<8} {'flow':<28} {'mean s':>8} {'stdev':>7} {'p95 s':>8} "
+            f"{'change':>8} {'p':>7}"
+        )
+        for browser, flows in self.results.items():
+            for name, result in flows.items():
+                change = f"{result['change']:+.1%}" if result['change'] is not None else 'new'
+                p_value = f"{result['p_value']:.3f}" if result['p_value'] is not None else '-'
+                flag = '  REGRESSED' if result['regressed'] else ''
+                terminalreporter.write_line(
+                    f"{browser:<8} {name:<28} {result['mean']:>8.3f} {result['stdev']:>7.3f} "
+                    f"{result['p95']:>8.3f} {change:>8} {p_value:>7}{flag}"
+                )
+        if self.missing:
+            terminalreporter.write_line(
+                f"NO BASELINE in {self.baseline_path} for {len(self.missing)} flows, "
+                f"not gated: {', '.join(self.missing)}",
+                yellow=True, bold=True,
+            )
+        saved = f", baselines saved to {self.baseline_path}" if self.save else ''
+        terminalreporter.write_line(f"Results written to {self.results_path}{saved}")
+
+
+def update_baselines(baselines: Dict[str, Dict], results: Dict[str, Dict[str, Dict]],
+                     commit: Optional[str]) -> Dict[str, Dict]:
+    """
+    Replace the baselines of the measured flows with their results
+
+    Args:
+        baselines: Baselines per browser and flow, updated in place
+        results: Results per browser and flow as recorded by BenchmarkSession
+        commit: Commit the results were measured on
+
+    Returns:
+        The updated baselines
+    """
+    for browser, flows in results.items():
+        for name, result in flows.items():
+            baseline = {key: result[key] for key in BASELINE_KEYS}
+            baseline['commit'] = commit
+            baselines.setdefault(browser, {})[name] = baseline
+    return baselines
+
+
+def write_baselines(baselines: Dict[str, Dict], path: str):
+    """
+    Write baselines as sorted JSON
+
+    Args:
+        baselines: Baselines per browser and flow
+        path: JSON file
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description='Page-flow benchmark baselines')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    save = subparsers.add_parser('save', help='Store a results file as the baselines')
+    save.add_argument('results', nargs='?', default=DEFAULT_RESULTS_PATH)
+    save.add_argument('--baseline', default=DEFAULT_BASELINE_PATH)
+    args = parser.parse_args(argv)
+
+    with open(args.results, encoding='utf-8') as f:
+        run = json.load(f)
+    baselines: Dict[str, Dict] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baselines = json.load(f)
+    update_baselines(baselines, run['results'], run.get('commit'))
+    write_baselines(baselines, args.baseline)
+    flows = sum(len(flows) for flows in run['results'].values())
+    print(f"Saved {flows} flow baselines from {args.results} to {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,372 @@
+"""
+Browser memory tracking for E-commerce Test Suite
+Samples the RSS and PSS of each driver's browser process tree before and
+after every test, attributes the growth to the test, recycles browsers whose
+memory keeps growing and reports the tests that leak the most
+
+Usage:
+    pytest --track-memory --memory-recycle-mb 300
+"""
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+import pytest
+
+from utils.browser_report import teardown_properties
+
+try:
+    import psutil
+except ImportError:  # psutil is optional, /proc is read directly on Linux
+    psutil = None
+
+MIB = 1024 * 1024
+PROC = '/proc'
+
+
+def service_pid(driver) -> Optional[int]:
+    """
+    Process id of the driver's service (chromedriver, geckodriver, msedgedriver)
+
+    Args:
+        driver: WebDriver instance
+
+    Returns:
+        Process id, None for remote drivers
+    """
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    return getattr(process, 'pid', None)
+
+
+def _proc_children() -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {}
+    for name in os.listdir(PROC):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"{PROC}/{name}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces and parentheses, the fields after it do not
+        ppid = int(stat[stat.rindex(')') + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def browser_processes(pid: int) -> List[int]:
+    """
+    Every descendant of a process, i.e. the browser started by a driver service
+
+    Args:
+        pid: Driver service process id
+
+    Returns:
+        Process ids, empty if the process is gone
+    """
+    if psutil is not None:
+        try:
+            return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return []
+    children = _proc_children()
+    found, stack = [], list(children.get(pid, []))
+    while stack:
+        child = stack.pop()
+        found.append(child)
+        stack.extend(children.get(child, []))
+    return found
+
+
+def process_memory(pid: int) -> Optional[Dict[str, Optional[int]]]:
+    """
+    Resident and proportional set size of one process
+
+    PSS splits shared pages between the processes sharing them, so it adds
+    up correctly over a multi-process browser; it is None where the platform
+    does not provide it.
+
+    Args:
+        pid: Process id
+
+    Returns:
+        Dictionary with rss and pss in bytes, None if the process is gone
+    """
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            try:
+                info = process.memory_full_info()
+            except psutil.AccessDenied:
+                info = process.memory_info()
+            return {'rss': info.rss, 'pss': getattr(info, 'pss', None)}
+        except psutil.Error:
+            return None
+    try:
+        with open(f"{PROC}/{pid}/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+    pss = None
+    try:
+        with open(f"{PROC}/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    pss = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    return {'rss': rss, 'pss': pss}
+
+
+def process_cpu_time(pid: int) -> Optional[float]:
+    """
+    User plus system CPU time of one process
+
+    Args:
+        pid: Process id
+
+    Returns:
+        CPU seconds, None if the process is gone
+    """
+    if psutil is not None:
+        try:
+            times = psutil.Process(pid).cpu_times()
+        except psutil.Error:
+            return None
+        return times.user + times.system
+    try:
+        with open(f"{PROC}/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # utime and stime are fields 14 and 15, counted in clock ticks
+    fields = stat[stat.rindex(')') + 2:].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def sample_cpu(driver) -> Optional[Dict[int, float]]:
+    """
+    CPU time of every process of a driver's browser
+
+    Args:
+        driver: WebDriver instance
+
+    Returns:
+        Dictionary of process id -> CPU seconds, None when the processes
+        cannot be read (remote driver, no /proc or psutil)
+    """
+    pid = service_pid(driver)
+    if pid is None or (psutil is None and not os.path.isdir(PROC)):
+        return None
+    times: Dict[int, float] = {}
+    for child in browser_processes(pid):
+        cpu = process_cpu_time(child)
+        if cpu is not None:
+            times[child] = cpu
+    return times
+
+
+def sample_memory(driver) -> Optional[Dict[str, int]]:
+    """
+    Total memory of a driver's browser process tree
+
+    Args:
+        driver: WebDriver instance
+
+    Returns:
+        Dictionary of rss, pss (rss where PSS is unavailable) and process count,
+        None when the processes cannot be read (remote driver, no /proc or psutil)
+    """
+    pid = service_pid(driver)
+    if pid is None or (psutil is None and not os.path.isdir(PROC)):
+        return None
+    rss = pss = processes = 0
+    for child in browser_processes(pid):
+        memory = process_memory(child)
+        if memory is None or memory['rss'] is None:
+            continue
+        rss += memory['rss']
+        pss += memory['pss'] if memory['pss'] is not None else memory['rss']
+        processes += 1
+    if not processes:
+        return None
+    return {'rss': rss, 'pss': pss, 'processes': processes}
+
+
+def top_leakers(results: Iterable[Dict], top: int = 10) -> List[Dict]:
+    """
+    Tests that grew browser memory the most
+
+    Args:
+        results: Per-test dictionaries recorded by BrowserMemoryTracker
+        top: Number of tests to keep
+
+    Returns:
+        Results with a positive PSS delta, largest first
+    """
+    leakers = [result for result in results if result['delta_pss'] > 0]
+    return sorted(leakers, key=lambda result: result['delta_pss'], reverse=True)[:top]
+
+
+def format_memory(results: Iterable[Dict], top: int = 10) -> List[str]:
+    """
+    Format the tests that grew browser memory the most as text lines
+
+    Args:
+        results: Per-test dictionaries recorded by BrowserMemoryTracker
+        top: Number of tests to list
+
+    Returns:
+        Table lines, sizes in MiB
+    """
+    lines = [f"{'PSS delta':>10} {'RSS delta':>10} {'PSS after':>10} {'procs':>5}  test"]
+    for result in top_leakers(results, top):
+        lines.append(
+            f"{result['delta_pss'] / MIB:>+10.1f} {result['delta_rss'] / MIB:>+10.1f} "
+            f"{result['pss'] / MIB:>10.1f} {result['processes']:>5}  {result['test']}"
+            + ("  (recycled)" if result.get('recycled') else '')
+        )
+    return lines
+
+
+def format_html_memory(results: Iterable[Dict], top: int = 10) -> List[str]:
+    """
+    Render the tests that grew browser memory the most as HTML for pytest-html
+
+    Args:
+        results: Per-test dictionaries recorded by BrowserMemoryTracker
+        top: Number of tests to list
+
+    Returns:
+        List of HTML strings
+    """
+    leakers = top_leakers(results, top)
+    if not leakers:
+        return []
+    rows = ''.join(
+        f"<tr><td>{r['test']}</td><td>{r['delta_pss'] / MIB:+.1f}</td>"
+        f"<td>{r['delta_rss'] / MIB:+.1f}</td><td>{r['pss'] / MIB:.1f}</td>"
+        f"<td>{'yes' if r.get('recycled') else ''}</td></tr>"
+        for r in leakers
+    )
+    return [
+        "<h2>Browser memory growth (MiB)</h2>"
+        "<table><tr><th>Test</th><th>PSS delta</th><th>RSS delta</th><th>PSS after</th>"
+        f"<th>Recycled</th></tr>{rows}</table>"
+    ]
+
+
+class BrowserMemoryTracker:
+    """
+    pytest plugin sampling browser memory around every test
+
+    The driver fixtures call before() once the driver is handed out and
+    after() before it goes back to the pool; tests on session_driver are
+    sampled from the setup and teardown hooks. Per-test results are attached
+    as "browser_memory" user properties, so they reach the controller with
+    the reports under xdist and are ranked there.
+    """
+
+    def __init__(self, recycle_mb: Optional[float] = None, top: int = 10):
+        """
+        Initialize BrowserMemoryTracker
+
+        Args:
+            recycle_mb: Restart a browser once its PSS has grown by this many MiB since it started
+            top: Number of tests listed in the report
+        """
+        self.recycle_bytes = recycle_mb * MIB if recycle_mb else None
+        self.top = top
+        self.baselines: Dict[str, int] = {}
+        self.pending: Dict[str, Dict] = {}
+        self.warned: Set[str] = set()
+        self.results: List[Dict] = []
+
+    def before(self, item, driver):
+        """
+        Sample a driver's browser before a test uses it
+
+        Args:
+            item: Test item
+            driver: WebDriver instance
+        """
+        sample = sample_memory(driver)
+        if sample is not None:
+            self.baselines.setdefault(driver.session_id, sample['pss'])
+            self.pending[driver.session_id] = sample
+
+    def after(self, item, driver) -> bool:
+        """
+        Sample a driver's browser after a test and attribute the growth to it
+
+        Args:
+            item: Test item
+            driver: WebDriver instance
+
+        Returns:
+            True when the browser has grown past the recycle threshold and should be restarted
+        """
+        before = self.pending.pop(driver.session_id, None)
+        after = sample_memory(driver) if before is not None else None
+        if before is None or after is None:
+            return False
+        growth = after['pss'] - self.baselines[driver.session_id]
+        recycle = self.recycle_bytes is not None and growth > self.recycle_bytes
+        if recycle:
+            del self.baselines[driver.session_id]
+        item.user_properties.append(("browser_memory", {
+            'test': item.nodeid,
+            'rss': after['rss'],
+            'pss': after['pss'],
+            'processes': after['processes'],
+            'delta_rss': after['rss'] - before['rss'],
+            'delta_pss': after['pss'] - before['pss'],
+            'growth': growth,
+            'recycled': recycle,
+        }))
+        return recycle
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        yield
+        driver = self._session_driver(item)
+        if driver is not None:
+            self.before(item, driver)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        driver = self._session_driver(item)
+        if driver is not None and self.after(item, driver) and driver.session_id not in self.warned:
+            # Restarting the session driver would drop the state it exists to keep
+            self.warned.add(driver.session_id)
+            item.warn(pytest.PytestWarning(
+                f"session_driver browser grew past {self.recycle_bytes / MIB:.0f} MiB; "
+                "it is not restarted, move these tests to the pooled driver fixture"
+            ))
+        yield
+
+    @staticmethod
+    def _session_driver(item):
+        funcargs = getattr(item, 'funcargs', {})
+        if 'driver' in funcargs:
+            return None
+        return funcargs.get('session_driver')
+
+    def pytest_runtest_logreport(self, report):
+        self.results.extend(teardown_properties(report, 'browser_memory'))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.results:
+            return
+        recycled = sum(1 for result in self.results if result.get('recycled'))
+        terminalreporter.write_sep('=', 'browser memory (top leakers, MiB)')
+        terminalreporter.write_line(
+            f"{len(self.results)} tests sampled, {recycled} browsers recycled, "
+            f"peak PSS {max(result['pss'] for result in self.results) / MIB:.1f} MiB"
+        )
+        for line in format_memory(self.results, self.top):
+            terminalreporter.write_line(line)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_html_results_summary(self, prefix, summary, postfix, session):
+        prefix.extend(format_html_memory(self.results, self.top))
@@ -0,0 +1,367 @@
+"""
+Browser pool utility for E-commerce Test Suite
+Manages per-browser WebDriver pools and cross-worker concurrency limits
+"""
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from utils import config
+from utils.driver_setup import create_driver, quit_driver
+
+SUPPORTED_BROWSERS = ('chrome', 'firefox', 'edge')
+
+
+def parse_browser_list(value: Optional[str]) -> List[str]:
+    """
+    Parse a comma separated browser list such as "chrome,firefox,edge"
+
+    Args:
+        value: Raw option value. Falls back to the BROWSER config when empty.
+
+    Returns:
+        Ordered list of unique, lower-cased browser names
+    """
+    raw = value or config.BROWSER
+    browsers = []
+    for name in raw.split(','):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in SUPPORTED_BROWSERS:
+            raise ValueError(f"Unsupported browser: {name}")
+        if name not in browsers:
+            browsers.append(name)
+    return browsers or [SUPPORTED_BROWSERS[0]]
+
+
+def parse_browser_limits(value: Optional[str]) -> Dict[str, int]:
+    """
+    Parse per-browser concurrency limits such as "chrome=4,firefox=2"
+
+    Args:
+        value: Raw option value
+
+    Returns:
+        Mapping of browser name to maximum concurrent tests
+    """
+    limits: Dict[str, int] = {}
+    if not value:
+        return limits
+    for entry in value.split(','):
+        if not entry.strip():
+            continue
+        name, _, limit = entry.partition('=')
+        limits[name.strip().lower()] = max(1, int(limit))
+    return limits
+
+
+def run_id() -> str:
+    """
+    Identifier shared by the controller and all xdist workers of one run
+
+    Returns:
+        xdist test run uid, or the current process id without xdist
+    """
+    return os.environ.get('PYTEST_XDIST_TESTRUNUID') or str(os.getpid())
+
+
+def worker_id() -> str:
+    """
+    Name of the current xdist worker
+
+    Returns:
+        Worker id such as "gw0", or "master" without xdist
+    """
+    return os.environ.get('PYTEST_XDIST_WORKER', 'master')
+
+
+def slots_dir() -> str:
+    """
+    Directory holding the slot lock files of the current run
+
+    Returns:
+        Path inside the system temp directory
+    """
+    return os.path.join(tempfile.gettempdir(), f"ecommerce-browser-slots-{run_id()}")
+
+
+def cleanup_slots():
+    """
+    Remove the slot lock files of the current run
+    """
+    shutil.rmtree(slots_dir(), ignore_errors=True)
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == 'nt':
+        # os.kill() would terminate the process on Windows, keep the lock until it times out
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _slot_owner(path: str) -> Optional[int]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return int(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        # Gone, or created but not written yet
+        return None
+
+
+class BrowserSlots:
+    """
+    Counting semaphore shared by every process of a test run
+    Each slot is a lock file created atomically with O_EXCL and holding the
+    owner's process id, so slots of a crashed worker are reclaimed
+    """
+
+    def __init__(self, browser: str, limit: int, timeout: float = 600, poll: float = 0.1):
+        """
+        Initialize BrowserSlots
+
+        Args:
+            browser: Browser the slots belong to
+            limit: Maximum number of concurrently held slots
+            timeout: Seconds to wait for a free slot before giving up
+            poll: Seconds between attempts
+        """
+        self.browser = browser
+        self.limit = limit
+        self.timeout = timeout
+        self.poll = poll
+        self.directory = slots_dir()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def acquire(self) -> str:
+        """
+        Block until a slot is free and claim it
+
+        Returns:
+            Path of the claimed slot file
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            for index in range(self.limit):
+                path = os.path.join(self.directory, f"{self.browser}.{index}.lock")
+                try:
+                    fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                except FileExistsError:
+                    if not self._reclaim(path):
+                        continue
+                    try:
+                        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                    except FileExistsError:
+                        continue
+                os.write(fd, f"{os.getpid()} {worker_id()}".encode())
+                os.close(fd)
+                return path
+            if time.monotonic() > deadline:
+                raise TimeoutError(
+                    f"No free {self.browser} slot after {self.timeout}s (limit {self.limit})"
+                )
+            time.sleep(self.poll)
+
+    @staticmethod
+    def _reclaim(path: str) -> bool:
+        """
+        Remove a slot file whose owner process has exited
+
+        Args:
+            path: Slot file
+
+        Returns:
+            True if the slot was freed
+        """
+        owner = _slot_owner(path)
+        if owner is None or _pid_alive(owner):
+            return False
+        # Move the file aside first, so two processes cannot both reclaim it
+        claimed = f"{path}.{os.getpid()}.stale"
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            return False
+        if _slot_owner(claimed) != owner:
+            # Another process reclaimed it in between and this is its new lock
+            os.rename(claimed, path)
+            return False
+        os.remove(claimed)
+        return True
+
+    @staticmethod
+    def release(path: str):
+        """
+        Release a previously claimed slot
+
+        Args:
+            path: Slot file returned by acquire()
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def reset_driver(driver):
+    """
+    Bring a reused driver back to a fresh-session state
+
+    Args:
+        driver: WebDriver instance to reset
+    """
+    driver.delete_all_cookies()
+    driver.get(config.BASE_URL)
+    driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    driver.get(config.BASE_URL)
+
+
+class BrowserPool:
+    """
+    Per-worker pool of WebDriver instances for a single browser
+    Limits concurrent use across workers and optionally keeps idle drivers for reuse
+    """
+
+    def __init__(self, browser: str, limit: Optional[int] = None, max_idle: int = 0):
+        """
+        Initialize BrowserPool
+
+        Args:
+            browser: Browser name (chrome, firefox, edge)
+            limit: Maximum concurrent tests for this browser across all workers
+            max_idle: Number of idle drivers kept for reuse, 0 disables reuse
+        """
+        self.browser = browser
+        self.slots = BrowserSlots(browser, limit) if limit else None
+        self.max_idle = max_idle
+        self.idle: List = []
+        self.held: Dict[int, Optional[str]] = {}
+        self.shared = None
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self):
+        """
+        Get a driver, reusing an idle one when available
+
+        Returns:
+            WebDriver instance
+        """
+        slot = self.slots.acquire() if self.slots else None
+        try:
+            driver = None
+            while self.idle and driver is None:
+                candidate = self.idle.pop()
+                try:
+                    reset_driver(candidate)
+                    driver = candidate
+                    self.reused += 1
+                except Exception:
+                    quit_driver(candidate)
+            if driver is None:
+                driver = create_driver(browser_name=self.browser)
+                self.created += 1
+        except Exception:
+            if slot:
+                BrowserSlots.release(slot)
+            raise
+        self.held[id(driver)] = slot
+        return driver
+
+    def release(self, driver, reusable: bool = True, keep: bool = False):
+        """
+        Return a driver to the pool
+
+        Args:
+            driver: WebDriver instance obtained from acquire()
+            reusable: False to always quit the driver (e.g. after a failure)
+            keep: Keep the driver even if the idle pool is full (e.g. for a retry);
+                  the excess is trimmed by the next release without keep
+        """
+        slot = self.held.pop(id(driver), None)
+        if reusable and (keep or len(self.idle) < self.max_idle):
+            self.idle.append(driver)
+        else:
+            quit_driver(driver)
+        if not keep:
+            # Drivers kept for a retry that never took them, oldest first
+            while len(self.idle) > self.max_idle:
+                quit_driver(self.idle.pop(0))
+        if slot:
+            BrowserSlots.release(slot)
+
+    def acquire_shared(self):
+        """
+        Get the worker's shared driver, creating it on first use
+        Only a cheap navigation to the base URL separates consecutive users
+
+        Returns:
+            WebDriver instance
+        """
+        slot = self.slots.acquire() if self.slots else None
+        try:
+            if self.shared is None:
+                self.shared = create_driver(browser_name=self.browser)
+                self.created += 1
+            else:
+                self.shared.get(config.BASE_URL)
+                self.reused += 1
+        except Exception:
+            if slot:
+                BrowserSlots.release(slot)
+            self.discard_shared()
+            raise
+        self.held[id(self.shared)] = slot
+        return self.shared
+
+    def release_shared(self, discard: bool = False):
+        """
+        Give the shared driver back after a test
+
+        Args:
+            discard: Quit the shared driver so the next user gets a fresh one
+        """
+        slot = self.held.pop(id(self.shared), None)
+        if discard:
+            self.discard_shared()
+        if slot:
+            BrowserSlots.release(slot)
+
+    def discard_shared(self):
+        """
+        Quit the shared driver
+        """
+        if self.shared is not None:
+            quit_driver(self.shared)
+            self.shared = None
+
+    def close(self):
+        """
+        Quit every idle driver and the shared driver
+        """
+        while self.idle:
+            quit_driver(self.idle.pop())
+        self.discard_shared()
+
+    def stats(self) -> dict:
+        """
+        Pool counters for reporting
+
+        Returns:
+            Dictionary of pool statistics
+        """
+        return {
+            'browser': self.browser,
+            'created': self.created,
+            'reused': self.reused,
+            'idle': len(self.idle),
+            'in_use': len(self.held),
+        }
@@ -0,0 +1,174 @@
+"""
+Browser report utility for E-commerce Test Suite
+Merges per-browser results into a side-by-side summary
+"""
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def get_browser(report) -> Optional[str]:
+    """
+    Get the browser a test report was produced with
+
+    Args:
+        report: pytest TestReport
+
+    Returns:
+        Browser name, or None if the test did not use a driver
+    """
+    for key, value in getattr(report, 'user_properties', []):
+        if key == 'browser':
+            return value
+    return None
+
+
+def teardown_properties(report, key: str) -> List:
+    """
+    Get the values a test attached under a user property
+
+    Plugins attach per-test figures up to teardown, so only the teardown
+    report carries all of them. Under xdist it reaches the controller's
+    pytest_runtest_logreport, where the plugins collect them.
+
+    Args:
+        report: pytest TestReport
+        key: User property name
+
+    Returns:
+        Values in the order they were attached, empty for other phases
+    """
+    if report.when != 'teardown':
+        return []
+    return [value for name, value in getattr(report, 'user_properties', []) if name == key]
+
+
+def strip_browser(nodeid: str, browser: str) -> str:
+    """
+    Remove the browser parameter from a test node id
+
+    Args:
+        nodeid: pytest node id, e.g. "tests/test_login.py::TestLogin::test_valid_login[chrome]"
+        browser: Browser parameter to remove
+
+    Returns:
+        Node id without the browser parameter
+    """
+    if not nodeid.endswith(']') or '[' not in nodeid:
+        return nodeid
+    base, params = nodeid[:-1].split('[', 1)
+    remaining = [param for param in params.split('-') if param != browser]
+    return f"{base}[{'-'.join(remaining)}]" if remaining else base
+
+
+def build_matrix(reports: Iterable) -> Dict:
+    """
+    Aggregate test reports per test and browser
+
+    Args:
+        reports: pytest TestReports from all workers
+
+    Returns:
+        Dictionary with "browsers", "rows" (test -> browser -> cell) and "totals"
+    """
+    browsers: List[str] = []
+    rows: Dict[str, Dict[str, Dict]] = OrderedDict()
+    totals: Dict[str, Dict[str, Any]] = defaultdict(
+        lambda: {'passed': 0, 'failed': 0, 'skipped': 0, 'duration': 0.0,
+                 'start': None, 'stop': None}
+    )
+
+    for report in reports:
+        browser = get_browser(report)
+        if browser is None:
+            continue
+        if browser not in browsers:
+            browsers.append(browser)
+        test = strip_browser(report.nodeid, browser)
+        cell = rows.setdefault(test, {}).setdefault(
+            browser, {'outcome': 'passed', 'duration': 0.0}
+        )
+        cell['duration'] += report.duration
+        if report.failed:
+            cell['outcome'] = 'error' if report.when != 'call' else 'failed'
+        elif report.skipped and cell['outcome'] == 'passed':
+            cell['outcome'] = 'skipped'
+
+        total = totals[browser]
+        total['duration'] += report.duration
+        start, stop = getattr(report, 'start', None), getattr(report, 'stop', None)
+        if start is not None:
+            total['start'] = start if total['start'] is None else min(total['start'], start)
+            total['stop'] = stop if total['stop'] is None else max(total['stop'], stop)
+
+    for cells in rows.values():
+        for browser, cell in cells.items():
+            outcome = 'failed' if cell['outcome'] == 'error' else cell['outcome']
+            totals[browser][outcome] += 1
+
+    return {'browsers': browsers, 'rows': rows, 'totals': dict(totals)}
+
+
+def _wall(total: dict) -> float:
+    if total['start'] is None:
+        return 0.0
+    return total['stop'] - total['start']
+
+
+def format_matrix(matrix: Dict) -> List[str]:
+    """
+    Render the browser matrix as terminal lines
+
+    Args:
+        matrix: Result of build_matrix()
+
+    Returns:
+        List of lines, empty when fewer than two browsers ran
+    """
+    browsers = matrix['browsers']
+    if len(browsers) < 2:
+        return []
+
+    width = max(len(test) for test in matrix['rows'])
+    lines = ['  '.join([' ' * width] + [f"{b:>18}" for b in browsers])]
+    for test, cells in matrix['rows'].items():
+        columns = []
+        for browser in browsers:
+            cell = cells.get(browser)
+            text = f"{cell['outcome']} {cell['duration']:.2f}s" if cell else '-'
+            columns.append(f"{text:>18}")
+        lines.append('  '.join([test.ljust(width)] + columns))
+
+    lines.append('')
+    for browser in browsers:
+        total = matrix['totals'][browser]
+        lines.append(
+            f"{browser}: {total['passed']} passed, {total['failed']} failed, "
+            f"{total['skipped']} skipped, test time {total['duration']:.2f}s, "
+            f"wall time {_wall(total):.2f}s"
+        )
+    return lines
+
+
+def format_html_summary(matrix: Dict) -> List[str]:
+    """
+    Render per-browser totals as HTML snippets for pytest-html
+
+    Args:
+        matrix: Result of build_matrix()
+
+    Returns:
+        List of HTML strings
+    """
+    browsers = matrix['browsers']
+    if len(browsers) < 2:
+        return []
+    rows = ''.join(
+        f"<tr><td>{b}</td><td>{t['passed']}</td><td>{t['failed']}</td>"
+        f"<td>{t['skipped']}</td><td>{t['duration']:.2f}s</td><td>{_wall(t):.2f}s</td></tr>"
+        for b, t in ((b, matrix['totals'][b]) for b in browsers)
+    )
+    return [
+        "<h2>Browsers</h2>"
+        "<table><tr><th>Browser</th><th>Passed</th><th>Failed</th><th>Skipped</th>"
+        f"<th>Test time</th><th>Wall time</th></tr>{rows}</table>"
+    ]
@@ -0,0 +1,300 @@
+"""
+Cart service for E-commerce Test Suite
+Thread-safe per-session cart storage behind the demo site's /api/cart, and
+a small client to seed or inspect carts from tests without the browser
+"""
+import json
+import threading
+import urllib.request
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+CART_COOKIE = 'cart_session'
+# Carts held before the least recently used ones are dropped
+MAX_SESSIONS = 100_000
+
+
+def new_session_id() -> str:
+    """
+    Generate a cart session id
+
+    Returns:
+        Random hexadecimal id
+    """
+    return uuid.uuid4().hex
+
+
+class CartStore:
+    """
+    In-memory carts keyed by session id
+
+    Each session has its own lock, so concurrent updates of one cart are
+    serialized while different carts are updated in parallel. Every mutation
+    is a single read-modify-write under that lock, so no update is lost.
+
+    A cart is created by its first update, dropped when it is cleared, and
+    beyond max_sessions carts the least recently used idle ones are dropped,
+    so a load run's sessions do not accumulate.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS):
+        """
+        Initialize CartStore
+
+        Args:
+            max_sessions: Number of carts held before the least recently used are dropped
+        """
+        self.max_sessions = max_sessions
+        self.lock = threading.Lock()
+        self.carts: Dict[str, OrderedDict] = {}
+        # Least recently used first
+        self.locks: 'OrderedDict[str, threading.Lock]' = OrderedDict()
+        self.versions: Dict[str, int] = {}
+
+    @contextmanager
+    def _session(self, session: str, create: bool = True) -> Iterator[bool]:
+        while True:
+            with self.lock:
+                lock = self.locks.get(session)
+                if lock is None and not create:
+                    break
+                if lock is None:
+                    lock = self.locks[session] = threading.Lock()
+                    self.carts[session] = OrderedDict()
+                    self.versions[session] = 0
+                    self._evict(session)
+                else:
+                    self.locks.move_to_end(session)
+            with lock:
+                # The cart may have been dropped while waiting for its lock
+                if self.locks.get(session) is lock:
+                    yield True
+                    return
+        yield False
+
+    def _evict(self, keep: str):
+        # Called with self.lock held; carts being updated keep their lock held and are skipped
+        excess = len(self.locks) - self.max_sessions
+        for session, lock in list(self.locks.items()):
+            if excess <= 0:
+                break
+            if session != keep and not lock.locked():
+                self._drop(session)
+                excess -= 1
+
+    def _drop(self, session: str):
+        del self.locks[session], self.carts[session], self.versions[session]
+
+    def _snapshot(self, session: str) -> Dict:
+        items = [dict(item) for item in self.carts[session].values()]
+        return {
+            'items': items,
+            'count': sum(item['quantity'] for item in items),
+            'total': round(sum(item['price'] * item['quantity'] for item in items), 2),
+            'version': self.versions[session],
+        }
+
+    def _mutated(self, session: str) -> Dict:
+        self.versions[session] += 1
+        return self._snapshot(session)
+
+    def get(self, session: str) -> Dict:
+        """
+        Get a cart, without creating it
+
+        Args:
+            session: Cart session id
+
+        Returns:
+            Dictionary with items, count, total and version, empty at version 0
+            for an unknown session
+        """
+        with self._session(session, create=False) as found:
+            if not found:
+                return {'items': [], 'count': 0, 'total': 0, 'version': 0}
+            return self._snapshot(session)
+
+    def add(self, session: str, name: str, price: float, quantity: int = 1) -> Dict:
+        """
+        Add a product, increasing its quantity if it is already in the cart
+
+        Args:
+            session: Cart session id
+            name: Product name
+            price: Unit price
+            quantity: Quantity to add
+
+        Returns:
+            Updated cart
+        """
+        with self._session(session):
+            cart = self.carts[session]
+            if name in cart:
+                cart[name]['quantity'] += quantity
+            else:
+                cart[name] = {'name': name, 'price': price, 'quantity': quantity}
+            return self._mutated(session)
+
+    def set_quantity(self, session: str, name: str, quantity: int) -> Dict:
+        """
+        Set the quantity of a product, removing it at 0 or below
+
+        Args:
+            session: Cart session id
+            name: Product name
+            quantity: New quantity
+
+        Returns:
+            Updated cart
+        """
+        with self._session(session):
+            cart = self.carts[session]
+            if quantity <= 0:
+                cart.pop(name, None)
+            elif name in cart:
+                cart[name]['quantity'] = quantity
+            else:
+                raise KeyError(name)
+            return self._mutated(session)
+
+    def remove(self, session: str, name: str) -> Dict:
+        """
+        Remove a product
+
+        Args:
+            session: Cart session id
+            name: Product name
+
+        Returns:
+            Updated cart
+        """
+        return self.set_quantity(session, name, 0)
+
+    def replace(self, session: str, items: List[Dict]) -> Dict:
+        """
+        Replace the whole cart, e.g. to seed it for a test
+
+        Args:
+            session: Cart session id
+            items: Items with name, price and optional quantity (default 1)
+
+        Returns:
+            Updated cart
+        """
+        with self._session(session):
+            cart = self.carts[session]
+            cart.clear()
+            for item in items:
+                cart[item['name']] = {
+                    'name': item['name'],
+                    'price': float(item['price']),
+                    'quantity': int(item.get('quantity', 1)),
+                }
+            return self._mutated(session)
+
+    def clear(self, session: str) -> Dict:
+        """
+        Empty a cart and drop its session, a later update starts a new cart
+
+        Args:
+            session: Cart session id
+
+        Returns:
+            Empty cart with the version of the dropped one increased
+        """
+        with self._session(session, create=False) as found:
+            if not found:
+                return self.get(session)
+            cleared = {'items': [], 'count': 0, 'total': 0, 'version': self.versions[session] + 1}
+            with self.lock:
+                self._drop(session)
+            return cleared
+
+    def sessions(self) -> int:
+        """
+        Number of carts held
+
+        Returns:
+            Session count
+        """
+        with self.lock:
+            return len(self.carts)
+
+
+class CartClient:
+    """
+    Client of the demo site's /api/cart for one cart session
+    """
+
+    def __init__(self, base_url: str, session: Optional[str] = None, timeout: float = 10):
+        """
+        Initialize CartClient
+
+        Args:
+            base_url: Demo site base URL
+            session: Cart session id, a new one by default
+            timeout: Seconds allowed per request
+        """
+        self.base_url = base_url.rstrip('/')
+        self.session = session or new_session_id()
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, payload=None) -> Dict:
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(
+            f"{self.base_url}{path}", data=data, method=method,
+            headers={'Content-Type': 'application/json', 'Cookie': f"{CART_COOKIE}={self.session}"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.load(response)
+
+    def get(self) -> Dict:
+        """
+        Get the cart
+
+        Returns:
+            Dictionary with items, count, total and version
+        """
+        return self._request('GET', '/api/cart')
+
+    def add(self, name: str, price: float, quantity: int = 1) -> Dict:
+        """
+        Add a product to the cart
+
+        Returns:
+            Updated cart
+        """
+        item = {'name': name, 'price': price, 'quantity': quantity}
+        return self._request('POST', '/api/cart/items', item)
+
+    def set_quantity(self, name: str, quantity: int) -> Dict:
+        """
+        Set the quantity of a product, 0 removes it
+
+        Returns:
+            Updated cart
+        """
+        return self._request('PATCH', '/api/cart/items', {'name': name, 'quantity': quantity})
+
+    def replace(self, items: List[Dict]) -> Dict:
+        """
+        Replace the whole cart in one call
+
+        Args:
+            items: Items with name, price and optional quantity
+
+        Returns:
+            Updated cart
+        """
+        return self._request('PUT', '/api/cart', {'items': items})
+
+    def clear(self) -> Dict:
+        """
+        Empty the cart
+
+        Returns:
+            Updated cart
+        """
+        return self._request('DELETE', '/api/cart')
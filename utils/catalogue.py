@@ -0,0 +1,185 @@
+"""
+Synthetic catalogue generator for E-commerce Test Suite
+Produces deterministic, seeded product catalogues of any size for the demo site
+"""
+import random
+from typing import Dict, Iterator, Optional
+
+# Same products as demo-site/products.js, always at the start of the catalogue
+# so SEARCH_TERM and PRODUCT_NAME keep resolving to known matches
+BASE_PRODUCTS = (
+    {'name': 'Laptop', 'price': 999.99, 'category': 'electronics'},
+    {'name': 'MacBook', 'price': 1299.99, 'category': 'electronics'},
+    {'name': 'iPhone', 'price': 799.99, 'category': 'electronics'},
+    {'name': 'iPad', 'price': 599.99, 'category': 'electronics'},
+    {'name': 'Headphones', 'price': 199.99, 'category': 'electronics'},
+    {'name': 'Keyboard', 'price': 99.99, 'category': 'electronics'},
+    {'name': 'Mouse', 'price': 49.99, 'category': 'electronics'},
+    {'name': 'Monitor', 'price': 299.99, 'category': 'electronics'},
+)
+
+ADJECTIVES = (
+    'Compact', 'Pro', 'Ultra', 'Classic', 'Wireless', 'Gaming', 'Portable', 'Smart',
+    'Ergonomic', 'Slim', 'Rugged', 'Premium', 'Budget', 'Silent', 'Mini', 'Max',
+)
+NOUNS = {
+    'electronics': ('Laptop', 'MacBook', 'Monitor', 'Keyboard', 'Mouse', 'Headphones',
+                    'iPhone', 'iPad', 'Speaker', 'Webcam', 'Router', 'Charger'),
+    'home': ('Lamp', 'Kettle', 'Blender', 'Toaster', 'Fan', 'Heater', 'Vacuum'),
+    'office': ('Desk', 'Chair', 'Notebook', 'Stapler', 'Whiteboard', 'Shredder'),
+    'sports': ('Bottle', 'Backpack', 'Tracker', 'Mat', 'Racket', 'Helmet'),
+}
+CATEGORIES = tuple(NOUNS)
+
+
+class Catalogue:
+    """
+    Deterministic product catalogue generated on demand
+
+    Product i is derived only from (seed, i), so any slice can be produced
+    without generating or storing the products before it.
+    """
+
+    def __init__(self, size: int, seed: int = 0):
+        """
+        Initialize Catalogue
+
+        Args:
+            size: Number of products, at least len(BASE_PRODUCTS)
+            seed: Seed making the catalogue reproducible
+        """
+        self.size = max(size, len(BASE_PRODUCTS))
+        self.seed = seed
+
+    def __len__(self) -> int:
+        return self.size
+
+    def product(self, index: int) -> Dict:
+        """
+        Get a single product
+
+        Args:
+            index: Position in the catalogue
+
+        Returns:
+            Product dictionary with name, price and category
+        """
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        if index < len(BASE_PRODUCTS):
+            return dict(BASE_PRODUCTS[index])
+        rng = random.Random(self.seed * 1_000_003 + index)
+        category = rng.choice(CATEGORIES)
+        model = rng.choice('ABCDEFGHKMXZ')
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS[category])} {model}-{index}"
+        return {'name': name, 'price': round(rng.uniform(4.99, 2499.99), 2), 'category': category}
+
+    def iter_products(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Stream products without materializing the catalogue
+
+        Args:
+            start: First index
+            stop: Index after the last product (defaults to the catalogue size)
+
+        Yields:
+            Product dictionaries
+        """
+        stop = self.size if stop is None else min(stop, self.size)
+        for index in range(start, stop):
+            yield self.product(index)
+
+    def iter_matches(self, term: str) -> Iterator[Dict]:
+        """
+        Stream products whose name contains the term, case-insensitively
+        Same semantics as searchProducts in demo-site/products.js
+
+        Args:
+            term: Search term
+
+        Yields:
+            Matching product dictionaries
+        """
+        term = term.strip().lower()
+        for product in self.iter_products():
+            if term in product['name'].lower():
+                yield product
+
+    def page(self, page: int, per_page: int, term: str = '') -> Dict:
+        """
+        Get one page of the catalogue, optionally filtered by a search term
+
+        Args:
+            page: 1-based page number
+            per_page: Products per page
+            term: Optional search term
+
+        Returns:
+            Dictionary with products, page, per_page, total and pages
+        """
+        if term.strip():
+            return paginate(self.iter_matches(term), page, per_page)
+        first = (page - 1) * per_page
+        return page_response(self.iter_products(first, first + per_page), page, per_page, self.size)
+
+    def known_match(self, term: str) -> Dict:
+        """
+        Get the first product matching a term, e.g. to resolve SEARCH_TERM
+
+        Args:
+            term: Search term
+
+        Returns:
+            First matching product
+
+        Raises:
+            LookupError: if nothing in the catalogue matches
+        """
+        for product in self.iter_matches(term):
+            return product
+        raise LookupError(f"No product matches '{term}'")
+
+
+def paginate(products: Iterator[Dict], page: int, per_page: int) -> Dict:
+    """
+    Build one page of a paged JSON response from a product stream
+
+    Only the requested page is kept in memory; the rest of the stream is
+    consumed to count the total.
+
+    Args:
+        products: Product stream
+        page: 1-based page number
+        per_page: Products per page
+
+    Returns:
+        Dictionary with products, page, per_page, total and pages
+    """
+    first = (page - 1) * per_page
+    items, total = [], 0
+    for total, product in enumerate(products, start=1):
+        if first < total <= first + per_page:
+            items.append(product)
+    return page_response(items, page, per_page, total)
+
+
+def page_response(items, page: int, per_page: int, total: int) -> Dict:
+    """
+    Shape a page of products as returned by the catalogue endpoint
+
+    Args:
+        items: Products of the page
+        page: 1-based page number
+        per_page: Products per page
+        total: Number of products across all pages
+
+    Returns:
+        Dictionary with products, page, per_page, total and pages
+    """
+    return {
+        'products': list(items),
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': max(1, -(-total // per_page)),
+    }
@@ -14,8 +14,20 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Base URL for the e-commerce site
-# Default: local demo site (run: python -m http.server 8000 in demo-site folder)
-BASE_URL: Final[str] = os.getenv('BASE_URL', 'http://localhost:8000/')
+# Default: local demo site (run: python -m utils.demo_server)
+# Not Final: the demo_site_server fixture points it at its own server at runtime,
+# so read it as config.BASE_URL rather than importing the name
+BASE_URL: str = os.getenv('BASE_URL', 'http://localhost:8000/')
+
+# Serve the demo site from an in-process server on a free port per worker
+SERVE_DEMO_SITE: Final[bool] = os.getenv('SERVE_DEMO_SITE', 'False').lower() == 'true'
+
+# Synthetic catalogue served by the demo site server (0 = the 8 demo products)
+CATALOGUE_SIZE: Final[int] = int(os.getenv('CATALOGUE_SIZE', '0'))
+CATALOGUE_SEED: Final[int] = int(os.getenv('CATALOGUE_SEED', '0'))
+
+# Network conditions injected between the browser and BASE_URL (see utils/fault_proxy.py)
+NETWORK_PROFILE: Final[str] = os.getenv('NETWORK_PROFILE', 'none')
 
 # Test credentials
 TEST_USERNAME: Final[str] = os.getenv('TEST_USERNAME', 'test@example.com')
@@ -0,0 +1,278 @@
+"""
+Dataset-driven parametrisation for E-commerce Test Suite
+Streams test cases from CSV and JSON Lines files through a line-offset
+index: a test's row is read from disk when the test starts. pytest still
+creates one test item per selected row in every process, so large files are
+sampled or sharded down to at most DEFAULT_MAX_CASES cases per node
+
+Usage:
+    @pytest.mark.dataset("billing_details.csv")
+    def test_billing(driver, dataset_row): ...
+
+    pytest -m dataset --dataset-sample 1000 --dataset-seed 7 --shard 2/8 -n auto
+    python -m utils.datasets generate billing --rows 100000 --output sweeps/billing_details.csv
+    python -m utils.datasets info sweeps/billing_details.csv
+"""
+import argparse
+import csv
+import functools
+import json
+import os
+import random
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
+JSONL_SUFFIXES = ('.jsonl', '.ndjson')
+# Each collected case is a pytest item of a few KiB, created again by every xdist worker
+DEFAULT_MAX_CASES = 10_000
+
+
+class Dataset:
+    """
+    Random access to the records of a CSV or JSON Lines file
+
+    Opening a dataset reads it once to record the byte offset of every
+    record (8 bytes per record); rows are parsed only when asked for. CSV
+    files need a header line and one record per line, i.e. no quoted
+    newlines.
+    """
+
+    def __init__(self, path: str):
+        """
+        Index a dataset file
+
+        Args:
+            path: CSV file, or JSON Lines file with a .jsonl/.ndjson suffix
+        """
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.jsonl = path.endswith(JSONL_SUFFIXES)
+        self.header: Optional[Sequence[str]] = None
+        self.offsets = array('q')
+        with open(path, 'rb') as f:
+            if not self.jsonl:
+                self.header = next(csv.reader([f.readline().decode('utf-8-sig')]))
+            offset = f.tell()
+            for line in f:
+                if line.strip():
+                    self.offsets.append(offset)
+                offset += len(line)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _parse(self, line: bytes) -> Dict:
+        text = line.decode('utf-8')
+        if self.header is None:
+            return json.loads(text)
+        return dict(zip(self.header, next(csv.reader([text]))))
+
+    def row(self, index: int) -> Dict:
+        """
+        Read one record
+
+        Args:
+            index: Record number, 0-based, header excluded
+
+        Returns:
+            Record as a dictionary (CSV values are strings)
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(self.offsets[index])
+            return self._parse(f.readline())
+
+    def rows(self, indices: Iterable[int]) -> Iterator[Dict]:
+        """
+        Stream several records through one file handle
+
+        Args:
+            indices: Record numbers
+
+        Yields:
+            Records as dictionaries
+        """
+        with open(self.path, 'rb') as f:
+            for index in indices:
+                f.seek(self.offsets[index])
+                yield self._parse(f.readline())
+
+
+@functools.lru_cache(maxsize=None)
+def _open(path: str, mtime: float) -> Dataset:
+    return Dataset(path)
+
+
+def open_dataset(path: str, data_dir: str = DEFAULT_DATA_DIR) -> Dataset:
+    """
+    Get the indexed dataset for a path, indexing each file once per process
+
+    Args:
+        path: Dataset file, relative paths are looked up in data_dir
+        data_dir: Directory holding the datasets
+
+    Returns:
+        Dataset instance
+    """
+    path = os.path.abspath(os.path.join(data_dir, path))
+    return _open(path, os.path.getmtime(path))
+
+
+def select_cases(size: int, sample: Optional[int] = None, seed: int = 0,
+                 shard: Optional[Tuple[int, int]] = None) -> Sequence[int]:
+    """
+    Pick the record numbers to run
+
+    A sample is drawn from the whole dataset first and then split between
+    shards round-robin, so every shard runs its part of the same sample.
+    The same arguments give the same cases on every xdist worker.
+
+    Args:
+        size: Number of records
+        sample: Number of records to draw at random, None or 0 for all
+        seed: Seed of the sample
+        shard: (index, count) as given to --shard, 1-based index
+
+    Returns:
+        Ascending record numbers
+    """
+    cases: Sequence[int] = range(size)
+    if sample and sample < size:
+        cases = sorted(random.Random(seed).sample(cases, sample))
+    if shard:
+        index, count = shard
+        cases = cases[index - 1::count]
+    return cases
+
+
+FIRST_NAMES = ('John', 'Jane', 'María', 'Oliver', 'Aiko', 'Liam', "Siobhán", 'Noah', 'Zoë',
+               'Mateo', 'Amara', 'Lucas')
+LAST_NAMES = ('Doe', 'Smith', "O'Connor", 'García', 'Müller', 'Nakamura', 'Okafor', 'Rossi',
+              'Dubois', 'Kowalski')
+STREETS = ('Main Street', 'Oak Avenue', 'Maple Road', 'High Street', 'Station Road',
+           'Elm Drive', 'Park Lane')
+CITIES = ('Springfield', 'Riverside', 'Fairview', 'Kingston', 'Georgetown', 'Ashford', 'Milton')
+# Regions by country, as offered by the demo site's checkout (US states only)
+REGIONS = {'United States': ('California', 'New York', 'Texas')}
+PRODUCTS = ('Laptop', 'MacBook', 'iPhone', 'iPad', 'Headphones', 'Keyboard', 'Mouse', 'Monitor')
+
+
+def generate_rows(kind: str, rows: int, seed: int = 0) -> Iterator[Dict]:
+    """
+    Generate synthetic test cases one at a time for large sweeps
+
+    Args:
+        kind: "billing" (CheckoutPage.fill_billing_details arguments),
+              "search" (term, expected) or "credentials" (email, password, expected)
+        rows: Number of records
+        seed: Seed making the output reproducible
+
+    Yields:
+        Records as dictionaries
+    """
+    rng = random.Random(seed)
+    for i in range(rows):
+        if kind == 'billing':
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            country = rng.choice(sorted(REGIONS))
+            yield {
+                'first_name': first,
+                'last_name': last,
+                'email': f"{first.lower()}.{last.lower()}{i}@example.com".replace("'", ''),
+                'telephone': ''.join(rng.choice('0123456789') for _ in range(10)),
+                'address': f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+                'city': rng.choice(CITIES),
+                'postcode': f"{rng.randint(0, 99999):05d}",
+                'country': country,
+                'region': rng.choice(REGIONS[country]),
+            }
+        elif kind == 'search':
+            product = rng.choice(PRODUCTS)
+            if rng.random() < 0.2:
+                yield {'term': f"{product.lower()}zq{rng.randint(100, 999)}", 'expected': 'none'}
+            else:
+                start = rng.randint(0, len(product) - 3)
+                term = product[start:start + rng.randint(3, len(product) - start)]
+                term = rng.choice((term, term.lower(), term.upper()))
+                yield {'term': term, 'expected': 'results'}
+        elif kind == 'credentials':
+            valid = rng.random() < 0.3
+            yield {
+                'email': 'test@example.com' if valid else f"user{i}@example.com",
+                'password': 'test123' if valid else f"wrong{rng.randint(0, 9999)}",
+                'expected': 'success' if valid else 'error',
+            }
+        else:
+            raise ValueError(f"Unknown dataset kind: {kind}")
+
+
+def write_dataset(records: Iterable[Dict], output) -> int:
+    """
+    Write records as CSV, or as JSON Lines for a .jsonl/.ndjson output
+
+    Args:
+        records: Records with the same keys
+        output: Open text file; its name picks the format
+
+    Returns:
+        Number of records written
+    """
+    count = 0
+    if getattr(output, 'name', '').endswith(JSONL_SUFFIXES):
+        for count, record in enumerate(records, 1):
+            output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return count
+    writer = None
+    for count, record in enumerate(records, 1):
+        if writer is None:
+            writer = csv.DictWriter(output, fieldnames=list(record), lineterminator='\n')
+            writer.writeheader()
+        writer.writerow(record)
+    return count
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description='Test case datasets')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    generate = subparsers.add_parser('generate', help='Write a synthetic dataset')
+    generate.add_argument('kind', choices=('billing', 'search', 'credentials'))
+    generate.add_argument('--rows', type=int, required=True)
+    generate.add_argument('--seed', type=int, default=0)
+    generate.add_argument('--output', required=True, help='CSV file, or .jsonl for JSON Lines')
+    info = subparsers.add_parser('info', help='Index a dataset and show its size')
+    info.add_argument('path')
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            count = write_dataset(generate_rows(args.kind, args.rows, args.seed), f)
+        print(f"Wrote {count} {args.kind} records to {args.output}")
+    else:
+        started = time.perf_counter()
+        dataset = Dataset(args.path)
+        elapsed = time.perf_counter() - started
+        if dataset.header:
+            columns = ', '.join(dataset.header)
+        else:
+            columns = ', '.join(dataset.row(0)) if len(dataset) else ''
+        print(f"{args.path}: {len(dataset)} records ({columns}), "
+              f"indexed in {elapsed * 1000:.0f} ms, "
+              f"index {dataset.offsets.itemsize * len(dataset) / 1024:.0f} KiB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,545 @@
+"""
+Demo site server for E-commerce Test Suite
+Threaded, keep-alive static server for the bundled demo site with
+in-memory assets, strong ETags, Cache-Control and precompressed variants,
+plus a paged product API whose searches are answered by a trigram index
+and a per-session cart API
+
+Usage:
+    python -m utils.demo_server --port 8000
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from utils.cart_service import CART_COOKIE, CartStore, new_session_id
+from utils.catalogue import BASE_PRODUCTS, Catalogue
+from utils.search_index import SearchIndex, normalize
+
+try:
+    import brotli
+except ImportError:  # Optional: brotli variants are only served when installed
+    brotli = None
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEMO_SITE_DIR = os.path.join(PROJECT_ROOT, 'demo-site')
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+# Cache policies: "long" lets browsers keep assets and revalidate HTML,
+# "revalidate" makes them revalidate everything, "none" disables caching
+CACHE_LONG = 'long'
+CACHE_REVALIDATE = 'revalidate'
+CACHE_NONE = 'none'
+CACHE_POLICIES = (CACHE_LONG, CACHE_REVALIDATE, CACHE_NONE)
+ASSET_MAX_AGE = 86400
+MAX_PER_PAGE = 500
+
+
+class Asset:
+    """
+    Static file held in memory together with its precompressed variants
+    Every variant has its own strong ETag, computed once when the file is loaded
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize Asset
+
+        Args:
+            path: File to load
+        """
+        self.path = path
+        self.mtime = os.stat(path).st_mtime_ns
+        with open(path, 'rb') as f:
+            self.body = f.read()
+
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        self.content_type = content_type
+        self.is_html = content_type.startswith('text/html')
+
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.variants: Dict[Optional[str], Tuple[bytes, str]] = {None: (self.body, f'"{digest}"')}
+        if content_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(self.body, compresslevel=9, mtime=0)
+            if len(compressed) < len(self.body):
+                self.variants['gzip'] = (compressed, f'"{digest}-gzip"')
+            if brotli is not None:
+                compressed = brotli.compress(self.body, quality=11)
+                if len(compressed) < len(self.body):
+                    self.variants['br'] = (compressed, f'"{digest}-br"')
+
+    def negotiate(self, accept_encoding: str):
+        """
+        Pick the smallest variant the client accepts
+
+        Args:
+            accept_encoding: Accept-Encoding request header
+
+        Returns:
+            Tuple of (encoding or None, body, etag)
+        """
+        accepted = {token.split(';')[0].strip() for token in accept_encoding.split(',')}
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in self.variants:
+                return (encoding,) + self.variants[encoding]
+        return (None,) + self.variants[None]
+
+    def cache_control(self, policy: str) -> str:
+        """
+        Cache-Control header for this asset
+
+        Args:
+            policy: One of CACHE_POLICIES
+
+        Returns:
+            Header value
+        """
+        if policy == CACHE_NONE:
+            return 'no-store'
+        if policy == CACHE_REVALIDATE or self.is_html:
+            return 'no-cache'
+        return f'public, max-age={ASSET_MAX_AGE}'
+
+    def is_stale(self) -> bool:
+        """
+        Check whether the file changed on disk since it was loaded
+
+        Returns:
+            True if the file was modified or removed
+        """
+        try:
+            return os.stat(self.path).st_mtime_ns != self.mtime
+        except FileNotFoundError:
+            return True
+
+
+def load_assets(root: str) -> Dict[str, Asset]:
+    """
+    Read every file below root into memory
+
+    Args:
+        root: Directory to serve
+
+    Returns:
+        Mapping of URL path (e.g. "/cart.html") to Asset
+    """
+    assets = {}
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            url = '/' + os.path.relpath(path, root).replace(os.sep, '/')
+            assets[url] = Asset(path)
+    return assets
+
+
+class ServerStats:
+    """
+    Thread-safe request counters of the demo site server
+    """
+
+    def __init__(self):
+        """
+        Initialize ServerStats
+        """
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.not_modified = 0
+        self.latencies = []
+
+    def record(self, latency: float, size: int, status: int = 200):
+        """
+        Record a served request
+
+        Args:
+            latency: Seconds spent handling the request
+            size: Response body size in bytes
+            status: HTTP status code sent
+        """
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += size
+            if status == 304:
+                self.not_modified += 1
+            self.latencies.append(latency)
+
+    def counters(self) -> tuple:
+        """
+        Snapshot of the cumulative counters, cheap enough to take around every test
+
+        Returns:
+            Tuple of (requests, bytes sent, 304 responses)
+        """
+        with self.lock:
+            return self.requests, self.bytes_sent, self.not_modified
+
+    def summary(self) -> dict:
+        """
+        Summarize request rate and latency
+
+        Returns:
+            Dictionary with requests, bytes, rate (req/s) and latency percentiles (ms)
+        """
+        with self.lock:
+            latencies = sorted(self.latencies)
+            elapsed = time.monotonic() - self.started
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+        return {
+            'requests': len(latencies),
+            'bytes': self.bytes_sent,
+            'not_modified': self.not_modified,
+            'rate': len(latencies) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(50),
+            'p95_ms': percentile(95),
+            'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+        }
+
+
+class DemoSiteHandler(BaseHTTPRequestHandler):
+    """
+    Request handler serving in-memory assets over HTTP/1.1 keep-alive
+    """
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'DemoSite/1.0'
+    # Headers and body are separate writes; without TCP_NODELAY uncached
+    # responses wait for the client's delayed ACK (~40ms)
+    disable_nagle_algorithm = True
+    server: 'DemoSiteHTTPServer'
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_POST(self):
+        self._serve(send_body=True)
+
+    def do_PUT(self):
+        self._serve(send_body=True)
+
+    def do_PATCH(self):
+        self._serve(send_body=True)
+
+    def do_DELETE(self):
+        self._serve(send_body=True)
+
+    def _send_json(self, status: int, payload, send_body: bool = True,
+                   headers: Optional[Dict] = None) -> int:
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Vary', 'Accept-Encoding')
+        if len(body) > 1024 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5, mtime=0)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+        return len(body) if send_body else 0
+
+    def _api_products(self, query: dict, send_body: bool) -> tuple:
+        try:
+            page = max(1, int(query.get('page', ['1'])[0]))
+            per_page = min(MAX_PER_PAGE, max(1, int(query.get('per_page', ['50'])[0])))
+        except ValueError:
+            error = {'error': 'page and per_page must be integers'}
+            return 400, self._send_json(400, error, send_body)
+        term = query.get('q', [''])[0]
+        if normalize(term):
+            result = self.server.search_index.page(self.server.catalogue, page, per_page, term)
+        else:
+            result = self.server.catalogue.page(page, per_page)
+        return 200, self._send_json(200, result, send_body)
+
+    def _api_cart(self, path: str, query: dict, send_body: bool) -> tuple:
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        headers = {}
+        if CART_COOKIE in cookie:
+            session = cookie[CART_COOKIE].value
+        else:
+            session = new_session_id()
+            headers['Set-Cookie'] = f"{CART_COOKIE}={session}; Path=/; SameSite=Lax"
+
+        carts, method = self.server.carts, self.command
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length)) if length else {}
+            if path == '/api/cart' and method in ('GET', 'HEAD'):
+                cart = carts.get(session)
+            elif path == '/api/cart' and method == 'PUT':
+                cart = carts.replace(session, payload['items'])
+            elif path == '/api/cart' and method == 'DELETE':
+                cart = carts.clear(session)
+            elif path == '/api/cart/items' and method == 'POST':
+                cart = carts.add(session, payload['name'], float(payload['price']),
+                                 int(payload.get('quantity', 1)))
+            elif path == '/api/cart/items' and method == 'PATCH':
+                cart = carts.set_quantity(session, payload['name'], int(payload['quantity']))
+            elif path == '/api/cart/items' and method == 'DELETE':
+                cart = carts.remove(session, query.get('name', [payload.get('name', '')])[0])
+            else:
+                error = {'error': f"{method} not allowed on {path}"}
+                return 405, self._send_json(405, error, send_body, headers)
+        except (ValueError, KeyError, TypeError) as e:
+            error = {'error': f"Invalid cart request: {e!r}"}
+            return 400, self._send_json(400, error, send_body, headers)
+        return 200, self._send_json(200, cart, send_body, headers)
+
+    def _serve(self, send_body: bool):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        if path == '/api/products' or path.startswith('/api/cart'):
+            query = parse_qs(url.query)
+            if path == '/api/products':
+                status, size = self._api_products(query, send_body)
+            else:
+                status, size = self._api_cart(path, query, send_body)
+            self.server.stats.record(time.perf_counter() - started, size, status)
+            return
+        if self.command not in ('GET', 'HEAD'):
+            # The request body is not read, so the connection cannot be reused
+            self.close_connection = True
+            self.send_error(405)
+            self.server.stats.record(time.perf_counter() - started, 0, 405)
+            return
+        if path.endswith('/'):
+            path += 'index.html'
+
+        asset = self.server.get_asset(path)
+        if asset is None:
+            status, body = 404, b'Not Found'
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        else:
+            policy = self.server.cache_policy
+            encoding, body, etag = asset.negotiate(self.headers.get('Accept-Encoding', ''))
+            if_none_match = self.headers.get('If-None-Match', '')
+            status = 304 if policy != CACHE_NONE and etag in if_none_match else 200
+            self.send_response(status)
+            self.send_header('Content-Type', asset.content_type)
+            self.send_header('Cache-Control', asset.cache_control(policy))
+            if len(asset.variants) > 1:
+                self.send_header('Vary', 'Accept-Encoding')
+            if policy != CACHE_NONE:
+                self.send_header('ETag', etag)
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            if status == 304:
+                body = b''
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+        size = len(body) if send_body else 0
+        self.server.stats.record(time.perf_counter() - started, size, status)
+
+    def log_message(self, format, *args):
+        # Access logs would dominate the test output
+        pass
+
+
+class DemoSiteHTTPServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer holding the in-memory assets and request counters
+    """
+
+    daemon_threads = True
+    # Room for bursts of connecting clients, e.g. utils.load_runner ramping up
+    request_queue_size = 1024
+
+    def __init__(self, address, root: str, cache_policy: str, watch: bool, catalogue: Catalogue):
+        super().__init__(address, DemoSiteHandler)
+        self.catalogue = catalogue
+        self._search_index: Optional[SearchIndex] = None
+        self._search_index_lock = threading.Lock()
+        self.carts = CartStore()
+        self.root = root
+        self.cache_policy = cache_policy
+        self.watch = watch
+        self.assets = load_assets(root)
+        self.assets_lock = threading.Lock()
+        self.stats = ServerStats()
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """
+        Trigram index of the catalogue, built on the first search
+
+        Building it costs seconds for large catalogues, so servers that only
+        page through products (most xdist workers) never pay for it.
+        """
+        if self._search_index is None:
+            with self._search_index_lock:
+                if self._search_index is None:
+                    self._search_index = SearchIndex.from_catalogue(self.catalogue)
+        return self._search_index
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections (e.g. at the end of a load run) are not errors
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def get_asset(self, path: str) -> Optional[Asset]:
+        """
+        Look up an asset, reloading it first if watching and the file changed
+
+        Args:
+            path: URL path
+
+        Returns:
+            Asset, or None if there is no such file
+        """
+        asset = self.assets.get(path)
+        if not self.watch:
+            return asset
+        if asset is not None and not asset.is_stale():
+            return asset
+
+        root = os.path.abspath(self.root)
+        file_path = os.path.normpath(os.path.join(root, path.lstrip('/')))
+        if os.path.commonpath([root, file_path]) != root or not os.path.isfile(file_path):
+            with self.assets_lock:
+                self.assets.pop(path, None)
+            return None
+        asset = Asset(file_path)
+        with self.assets_lock:
+            self.assets[path] = asset
+        return asset
+
+
+class DemoSiteServer:
+    """
+    Threaded demo site server running in a background thread
+    """
+
+    def __init__(self, root: str = DEMO_SITE_DIR, host: str = '127.0.0.1', port: int = 0,
+                 cache_policy: str = CACHE_LONG, watch: bool = False,
+                 catalogue: Optional[Catalogue] = None):
+        """
+        Initialize DemoSiteServer
+
+        Args:
+            root: Directory to serve
+            host: Interface to bind
+            port: Port to bind, 0 picks a free port
+            cache_policy: One of CACHE_POLICIES
+            watch: Reload assets whose file changed on disk (one stat per request)
+            catalogue: Catalogue served by /api/products, defaults to the demo products
+        """
+        catalogue = catalogue or Catalogue(len(BASE_PRODUCTS))
+        self.host = host
+        self.httpd = DemoSiteHTTPServer((host, port), os.path.abspath(root), cache_policy, watch,
+                                        catalogue)
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL of the running server, with trailing slash
+        """
+        return f"http://{self.host}:{self.httpd.server_address[1]}/"
+
+    @property
+    def catalogue(self) -> Catalogue:
+        """
+        Catalogue served by /api/products
+        """
+        return self.httpd.catalogue
+
+    @property
+    def carts(self) -> CartStore:
+        """
+        Carts served by /api/cart
+        """
+        return self.httpd.carts
+
+    @property
+    def stats(self) -> ServerStats:
+        """
+        Request counters of the server
+        """
+        return self.httpd.stats
+
+    def start(self) -> 'DemoSiteServer':
+        """
+        Start serving in a daemon thread
+
+        Returns:
+            The server itself
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='demo-site-server',
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the socket
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description='Serve the demo e-commerce site')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--root', default=DEMO_SITE_DIR)
+    parser.add_argument('--cache', choices=CACHE_POLICIES, default=CACHE_LONG)
+    parser.add_argument('--watch', action='store_true', help='Reload files changed on disk')
+    parser.add_argument('--catalogue-size', type=int, default=0,
+                        help='Serve a synthetic catalogue of this many products')
+    parser.add_argument('--catalogue-seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    catalogue = Catalogue(args.catalogue_size, args.catalogue_seed)
+    server = DemoSiteServer(args.root, args.host, args.port, args.cache, args.watch, catalogue)
+    print(f"Serving {args.root} on port {args.port}, press Ctrl+C to stop")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
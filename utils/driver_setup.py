@@ -1,22 +1,17 @@
 """
 Driver setup utility for Selenium WebDriver
 Handles browser initialization and configuration
+
+The browser-specific Selenium classes and webdriver-manager (which pulls in
+requests) are imported inside create_driver(), only for the browser being
+started, so importing this module from conftest.py stays cheap for
+collection and for xdist workers.
 """
 import os
 from typing import Optional
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.edge.options import Options as EdgeOptions
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
-
-from utils.config import BASE_URL, BROWSER, HEADLESS, IMPLICIT_WAIT
+from utils import config
+from utils.config import BROWSER, HEADLESS, IMPLICIT_WAIT
 
 
 def _get_chromedriver_path():
@@ -27,6 +22,8 @@ def _get_chromedriver_path():
     Returns:
         str: Path to chromedriver.exe
     """
+    from webdriver_manager.chrome import ChromeDriverManager
+
     driver_path = ChromeDriverManager().install()
     
     # Normalize path separators
@@ -81,6 +78,10 @@ def create_driver(
     driver = None
     
     if browser.lower() == 'chrome':
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
+
         chrome_options = ChromeOptions()
         if is_headless:
             chrome_options.add_argument('--headless')
@@ -92,23 +93,33 @@ def create_driver(
         
         driver_path = _get_chromedriver_path()
         service = ChromeService(driver_path)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver = Chrome(service=service, options=chrome_options)
     
     elif browser.lower() == 'firefox':
+        from selenium.webdriver.firefox.options import Options as FirefoxOptions
+        from selenium.webdriver.firefox.service import Service as FirefoxService
+        from selenium.webdriver.firefox.webdriver import WebDriver as Firefox
+        from webdriver_manager.firefox import GeckoDriverManager
+
         firefox_options = FirefoxOptions()
         if is_headless:
             firefox_options.add_argument('--headless')
         
         service = FirefoxService(GeckoDriverManager().install())
-        driver = webdriver.Firefox(service=service, options=firefox_options)
+        driver = Firefox(service=service, options=firefox_options)
     
     elif browser.lower() == 'edge':
+        from selenium.webdriver.edge.options import Options as EdgeOptions
+        from selenium.webdriver.edge.service import Service as EdgeService
+        from selenium.webdriver.edge.webdriver import WebDriver as Edge
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+
         edge_options = EdgeOptions()
         if is_headless:
             edge_options.add_argument('--headless')
         
         service = EdgeService(EdgeChromiumDriverManager().install())
-        driver = webdriver.Edge(service=service, options=edge_options)
+        driver = Edge(service=service, options=edge_options)
     
     else:
         raise ValueError(f"Unsupported browser: {browser}")
@@ -120,7 +131,7 @@ def create_driver(
     driver.maximize_window()
     
     # Navigate to base URL
-    driver.get(BASE_URL)
+    driver.get(config.BASE_URL)
     
     return driver
 
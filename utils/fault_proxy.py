@@ -0,0 +1,536 @@
+"""
+Fault-injection proxy for E-commerce Test Suite
+Reverse proxy between the browser and the site under test adding latency,
+jitter, bandwidth limits and intermittent 5xx errors per path
+
+Usage:
+    pytest --serve-demo-site --network-profile 3g
+    python -m utils.fault_proxy serve --target http://localhost:8000/ --profile flaky
+    python -m utils.fault_proxy sweep --profiles none,broadband,3g,flaky --repeat 3 \\
+        tests/test_login.py tests/test_search.py tests/test_checkout.py
+"""
+import argparse
+import fnmatch
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_PROFILE = 'none'
+CHUNK_SIZE = 16 * 1024
+
+# Headers that apply to a single connection and are not forwarded
+HOP_BY_HOP = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailers', 'transfer-encoding', 'upgrade',
+}
+
+
+class Fault:
+    """
+    Network conditions applied to matching requests
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, bandwidth: Optional[float] = None,
+                 error_rate: float = 0.0, error_status: int = 503):
+        """
+        Initialize Fault
+
+        Args:
+            latency: Seconds added before the request is forwarded
+            jitter: Maximum random deviation from latency, in seconds
+            bandwidth: Response throughput limit in bytes per second, None for unlimited
+            error_rate: Probability (0.0 - 1.0) of answering with error_status instead
+            error_status: Status code of injected errors
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Fault':
+        """
+        Build a Fault from a profile file rule
+
+        Args:
+            data: Rule dictionary (extra keys such as "path" are ignored)
+
+        Returns:
+            Fault instance
+        """
+        return cls(
+            latency=data.get('latency', 0.0),
+            jitter=data.get('jitter', 0.0),
+            bandwidth=data.get('bandwidth'),
+            error_rate=data.get('error_rate', 0.0),
+            error_status=data.get('error_status', 503),
+        )
+
+
+# Built-in profiles: ordered (path pattern, Fault) rules, first match wins
+PROFILES: Dict[str, List[Tuple[str, Fault]]] = {
+    'none': [],
+    'broadband': [('*', Fault(latency=0.02, jitter=0.005))],
+    '3g': [('*', Fault(latency=0.3, jitter=0.1, bandwidth=200_000))],
+    'slow-api': [('/api/*', Fault(latency=0.8, jitter=0.2))],
+    'flaky': [
+        ('/api/*', Fault(latency=0.05, jitter=0.02, error_rate=0.05)),
+        ('*', Fault(latency=0.05, jitter=0.02, error_rate=0.01)),
+    ],
+}
+
+
+def load_profile(value: str) -> List[Tuple[str, Fault]]:
+    """
+    Resolve a network profile name or JSON profile file
+
+    A profile file holds {"rules": [{"path": "/api/*", "latency": 0.5,
+    "jitter": 0.1, "bandwidth": 50000, "error_rate": 0.05}]}.
+
+    Args:
+        value: Built-in profile name or path to a JSON file
+
+    Returns:
+        Ordered list of (path pattern, Fault) rules
+    """
+    if value in PROFILES:
+        return PROFILES[value]
+    if not os.path.exists(value):
+        raise ValueError(f"Unknown network profile '{value}', expected one of "
+                         f"{', '.join(PROFILES)} or a JSON file")
+    with open(value, encoding='utf-8') as f:
+        rules = json.load(f)['rules']
+    return [(rule.get('path', '*'), Fault.from_dict(rule)) for rule in rules]
+
+
+class ProxyStats:
+    """
+    Thread-safe counters of proxied requests and injected faults
+    """
+
+    def __init__(self):
+        """
+        Initialize ProxyStats
+        """
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors_injected = 0
+        self.delay = 0.0
+        self.throttled_bytes = 0
+
+    def record(self, delay: float, injected: bool, throttled_bytes: int = 0):
+        """
+        Record a proxied request
+
+        Args:
+            delay: Seconds of latency added
+            injected: Whether an error was injected
+            throttled_bytes: Response bytes sent under a bandwidth limit
+        """
+        with self.lock:
+            self.requests += 1
+            self.errors_injected += injected
+            self.delay += delay
+            self.throttled_bytes += throttled_bytes
+
+    def summary(self) -> dict:
+        """
+        Proxy counters for reporting
+
+        Returns:
+            Dictionary with requests, injected errors and added delay
+        """
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'errors_injected': self.errors_injected,
+                'delay_s': self.delay,
+                'throttled_bytes': self.throttled_bytes,
+            }
+
+
+class FaultProxyHandler(BaseHTTPRequestHandler):
+    """
+    Forwards requests to the upstream server over a keep-alive connection,
+    applying the fault of the first rule matching the path
+    """
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    upstream: Optional[http.client.HTTPConnection] = None
+    server: 'FaultProxyHTTPServer'
+
+    def do_GET(self):
+        self._proxy()
+
+    def do_HEAD(self):
+        self._proxy()
+
+    def do_POST(self):
+        self._proxy()
+
+    def do_PUT(self):
+        self._proxy()
+
+    def do_PATCH(self):
+        self._proxy()
+
+    def do_DELETE(self):
+        self._proxy()
+
+    def _proxy(self):
+        server = self.server
+        fault = server.match(urlsplit(self.path).path)
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else None
+
+        delay, injected = 0.0, False
+        if fault is not None:
+            delay, injected = server.draw(fault)
+            if delay:
+                time.sleep(delay)
+        if injected:
+            payload = f"Injected {fault.error_status} by fault proxy\n".encode()
+            self.send_response(fault.error_status)
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(payload)
+            server.stats.record(delay, True)
+            return
+
+        headers = {name: value for name, value in self.headers.items()
+                   if name.lower() not in HOP_BY_HOP}
+        headers['Host'] = server.upstream_netloc
+        try:
+            response = self._forward(headers, body)
+        except (OSError, http.client.HTTPException):
+            self.send_error(502, 'Upstream unavailable')
+            server.stats.record(delay, False)
+            return
+        payload = response.read()
+
+        self.send_response(response.status, response.reason)
+        for name, value in response.getheaders():
+            if name.lower() not in HOP_BY_HOP and name.lower() != 'content-length':
+                self.send_header(name, value)
+        # HEAD responses keep the upstream length of the body they describe
+        if self.command == 'HEAD':
+            length = response.getheader('Content-Length', '0')
+        else:
+            length = str(len(payload))
+        self.send_header('Content-Length', length)
+        self.end_headers()
+        if self.command == 'HEAD':
+            server.stats.record(delay, False)
+            return
+        if fault is None or not fault.bandwidth:
+            self.wfile.write(payload)
+            server.stats.record(delay, False)
+            return
+        for start in range(0, len(payload), CHUNK_SIZE):
+            chunk = payload[start:start + CHUNK_SIZE]
+            self.wfile.write(chunk)
+            time.sleep(len(chunk) / fault.bandwidth)
+        server.stats.record(delay, False, len(payload))
+
+    def _forward(self, headers: dict, body: Optional[bytes]) -> http.client.HTTPResponse:
+        try:
+            return self._request(headers, body)
+        except (ConnectionError, http.client.RemoteDisconnected):
+            # Upstream closed the idle keep-alive connection, reconnect once
+            return self._request(headers, body)
+
+    def _request(self, headers: dict, body: Optional[bytes]) -> http.client.HTTPResponse:
+        if self.upstream is None:
+            self.upstream = self.server.connect_upstream()
+        try:
+            self.upstream.request(self.command, self.path, body=body, headers=headers)
+            return self.upstream.getresponse()
+        except (ConnectionError, http.client.RemoteDisconnected):
+            self.upstream.close()
+            self.upstream = None
+            raise
+
+    def finish(self):
+        super().finish()
+        if self.upstream is not None:
+            self.upstream.close()
+
+    def log_message(self, format, *args):
+        # Access logs would dominate the test output
+        pass
+
+
+class FaultProxyHTTPServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer holding the profile, the seeded RNG and the counters
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, target: str, rules: List[Tuple[str, Fault]], seed: int):
+        super().__init__(address, FaultProxyHandler)
+        upstream = urlsplit(target)
+        self.upstream_host = upstream.hostname or 'localhost'
+        self.upstream_port = upstream.port or 80
+        self.upstream_netloc = upstream.netloc
+        self.rules = rules
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.stats = ProxyStats()
+
+    def match(self, path: str) -> Optional[Fault]:
+        """
+        Find the fault of the first rule matching a path
+
+        Args:
+            path: URL path
+
+        Returns:
+            Fault, or None when no rule matches
+        """
+        for pattern, fault in self.rules:
+            if fnmatch.fnmatchcase(path, pattern):
+                return fault
+        return None
+
+    def draw(self, fault: Fault) -> Tuple[float, bool]:
+        """
+        Draw the delay and error decision of one request from the seeded RNG
+
+        Args:
+            fault: Fault of the request
+
+        Returns:
+            Tuple of (delay in seconds, whether to inject an error)
+        """
+        with self.rng_lock:
+            delay = max(0.0, fault.latency + self.rng.uniform(-fault.jitter, fault.jitter))
+            injected = self.rng.random() < fault.error_rate
+        return delay, injected
+
+    def connect_upstream(self) -> http.client.HTTPConnection:
+        return http.client.HTTPConnection(self.upstream_host, self.upstream_port, timeout=60)
+
+    def handle_error(self, request, client_address):
+        # Browsers dropping keep-alive connections are not errors
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class FaultProxy:
+    """
+    Fault-injection proxy running in a background thread
+    """
+
+    def __init__(self, target: str, profile: str = DEFAULT_PROFILE, seed: int = 0,
+                 host: str = '127.0.0.1', port: int = 0):
+        """
+        Initialize FaultProxy
+
+        Args:
+            target: Base URL of the upstream server
+            profile: Built-in profile name or JSON profile file
+            seed: Seed of the latency and error draws
+            host: Interface to bind
+            port: Port to bind, 0 picks a free port
+        """
+        self.target = target
+        self.profile = profile
+        self.host = host
+        self.httpd = FaultProxyHTTPServer((host, port), target, load_profile(profile), seed)
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL of the proxy, keeping the path of the target URL
+        """
+        path = urlsplit(self.target).path or '/'
+        return f"http://{self.host}:{self.httpd.server_address[1]}{path}"
+
+    @property
+    def stats(self) -> ProxyStats:
+        """
+        Counters of the proxy
+        """
+        return self.httpd.stats
+
+    def start(self) -> 'FaultProxy':
+        """
+        Start proxying in a daemon thread
+
+        Returns:
+            The proxy itself
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='fault-proxy',
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop proxying and close the socket
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+
+
+def read_junit(path: str) -> Dict[str, Tuple[float, bool]]:
+    """
+    Read per-test time and outcome from a JUnit XML file
+
+    Args:
+        path: JUnit XML file
+
+    Returns:
+        Mapping of "Class::test" to (seconds, failed)
+    """
+    results = {}
+    for case in ET.parse(path).getroot().iter('testcase'):
+        name = f"{case.get('classname', '').rsplit('.', 1)[-1]}::{case.get('name')}"
+        failed = case.find('failure') is not None or case.find('error') is not None
+        results[name] = (float(case.get('time', 0.0)), failed)
+    return results
+
+
+def sweep(profiles: List[str], pytest_args: List[str], repeat: int = 1, seed: int = 0) -> Dict:
+    """
+    Run the selected tests under each network profile
+
+    Args:
+        profiles: Profile names or files
+        pytest_args: Test selection and extra pytest arguments
+        repeat: Runs per profile, to estimate flakiness
+        seed: Base seed, each run uses seed + run index
+
+    Returns:
+        Mapping of profile to {"Class::test": [(seconds, failed), ...]}
+    """
+    results: Dict[str, Dict[str, List[Tuple[float, bool]]]] = OrderedDict()
+    with tempfile.TemporaryDirectory(prefix='fault-sweep-') as directory:
+        for profile in profiles:
+            runs = results.setdefault(profile, {})
+            for run in range(repeat):
+                junit = os.path.join(directory, f"{len(results)}-{run}.xml")
+                print(f"profile {profile}: run {run + 1}/{repeat}", file=sys.stderr)
+                subprocess.call([
+                    sys.executable, '-m', 'pytest', '-q', '-p', 'no:cacheprovider',
+                    '--serve-demo-site', f"--network-profile={profile}",
+                    f"--network-seed={seed + run}", f"--junitxml={junit}", *pytest_args,
+                ], stdout=subprocess.DEVNULL)
+                if not os.path.exists(junit):
+                    raise RuntimeError(f"pytest produced no results for profile '{profile}'")
+                for name, outcome in read_junit(junit).items():
+                    runs.setdefault(name, []).append(outcome)
+    return results
+
+
+def format_sweep(results: Dict) -> List[str]:
+    """
+    Format sweep results: mean time and failure rate per JUnit test class and test
+
+    Args:
+        results: Output of sweep()
+
+    Returns:
+        List of lines
+    """
+    profiles = list(results)
+    names = sorted({name for runs in results.values() for name in runs})
+    groups: Dict[str, List[str]] = OrderedDict()
+    for name in names:
+        groups.setdefault(name.split('::')[0], []).append(name)
+
+    def cell(outcomes):
+        if not outcomes:
+            return f"{'-':>16}"
+        mean = sum(seconds for seconds, _ in outcomes) / len(outcomes)
+        failed = sum(1 for _, failed in outcomes if failed) / len(outcomes)
+        return f"{mean:>8.2f}s {failed:>5.0%}"
+
+    width = max([len(name) for name in names] + [10])
+    lines = [f"{'test class':<{width}} " + ' '.join(f"{profile:>16}" for profile in profiles)]
+    for group, members in groups.items():
+        lines.append(f"{group:<{width}} " + ' '.join(
+            cell([o for name in members for o in results[profile].get(name, [])])
+            for profile in profiles
+        ))
+        for name in members:
+            label = '  ' + name.split('::', 1)[1]
+            lines.append(f"{label:<{width}} " + ' '.join(
+                cell(results[profile].get(name, [])) for profile in profiles
+            ))
+    return lines
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description='Latency and fault-injection proxy')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='Proxy a running site')
+    serve.add_argument('--target', required=True, help='Upstream base URL')
+    serve.add_argument('--profile', default=DEFAULT_PROFILE)
+    serve.add_argument('--seed', type=int, default=0)
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8080)
+
+    bench = commands.add_parser('sweep', help='Run tests under each profile and compare')
+    bench.add_argument('--profiles', default=','.join(PROFILES))
+    bench.add_argument('--repeat', type=int, default=1)
+    bench.add_argument('--seed', type=int, default=0)
+    bench.add_argument('--json', default=None, help='Write raw results to this JSON file')
+    bench.add_argument('pytest_args', nargs='*', default=['tests/'])
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        proxy = FaultProxy(args.target, args.profile, args.seed, args.host, args.port)
+        print(f"Proxying {args.target} with profile '{args.profile}' on {proxy.url}, "
+              "press Ctrl+C to stop")
+        try:
+            proxy.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            proxy.httpd.server_close()
+        return 0
+
+    profiles = [p for p in args.profiles.split(',') if p]
+    results = sweep(profiles, args.pytest_args, args.repeat, args.seed)
+    for line in format_sweep(results):
+        print(line)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Import-time budget check for E-commerce Test Suite
+Measures what importing conftest.py (or other modules) costs on top of
+pytest itself with `python -X importtime`, which every xdist worker pays
+at start-up, and fails when it exceeds a budget or pulls in modules that
+should only be imported on demand
+
+Usage:
+    python -m utils.import_budget
+    python -m utils.import_budget conftest pages.checkout_page --budget-ms 300 --forbid requests
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Sequence
+
+DEFAULT_BUDGET_MS = 150.0
+DEFAULT_REPEAT = 5
+# Only needed once a browser is started, see utils.driver_setup.create_driver()
+DEFAULT_FORBIDDEN = ('webdriver_manager', 'requests', 'selenium.webdriver')
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$')
+
+
+def measure_imports(modules: Sequence[str]) -> Dict[str, Dict]:
+    """
+    Import modules in a fresh interpreter after pytest and time every import
+
+    Args:
+        modules: Module names, imported in order
+
+    Returns:
+        Dictionary of module name -> {"self", "cumulative" (microseconds), "depth"}
+        for the modules first imported by `modules`, in import completion order
+    """
+    code = 'import pytest\n' + ''.join(f"import {module}\n" for module in modules)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, check=False,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    timings: Dict[str, Dict] = {}
+    after_pytest = False
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        own, cumulative, indent, name = match.groups()
+        depth = len(indent) // 2
+        if not after_pytest:
+            after_pytest = depth == 0 and name == 'pytest'
+            continue
+        timings[name] = {'self': int(own), 'cumulative': int(cumulative), 'depth': depth}
+    return timings
+
+
+def check_budget(modules: Sequence[str], budget_ms: float, forbidden: Sequence[str],
+                 repeat: int = DEFAULT_REPEAT) -> Dict:
+    """
+    Measure repeatedly and compare the median against the budget
+
+    Args:
+        modules: Module names to import
+        budget_ms: Allowed import time on top of pytest
+        forbidden: Module names (and their submodules) that must not be imported
+        repeat: Number of fresh interpreters measured
+
+    Returns:
+        Dictionary with median total_ms, the last run's timings, the forbidden
+        modules found and whether the budget is kept
+    """
+    totals: List[float] = []
+    timings: Dict[str, Dict] = {}
+    for _ in range(repeat):
+        timings = measure_imports(modules)
+        totals.append(sum(t['cumulative'] for t in timings.values() if t['depth'] == 0) / 1000)
+    found = sorted(
+        name for name in timings
+        if any(name == prefix or name.startswith(prefix + '.') for prefix in forbidden)
+    )
+    total = statistics.median(totals)
+    return {
+        'total_ms': total,
+        'timings': timings,
+        'forbidden': found,
+        'ok': total <= budget_ms and not found,
+    }
+
+
+def format_report(result: Dict, budget_ms: float, top: int = 15) -> List[str]:
+    """
+    Format a budget check as text lines
+
+    Args:
+        result: Result of check_budget()
+        budget_ms: Allowed import time
+        top: Number of most expensive modules listed
+
+    Returns:
+        Report lines
+    """
+    lines = [f"import time on top of pytest: {result['total_ms']:.1f} ms (median), "
+             f"budget {budget_ms:.0f} ms"]
+    slowest = sorted(result['timings'].items(), key=lambda item: item[1]['cumulative'],
+                     reverse=True)
+    lines.append(f"{'cumulative ms':>13} {'self ms':>8}  module")
+    for name, timing in slowest[:top]:
+        indent = '  ' * timing['depth']
+        lines.append(f"{timing['cumulative'] / 1000:>13.1f} {timing['self'] / 1000:>8.1f}  "
+                     f"{indent}{name}")
+    top_level = {name.split('.')[0] for name in result['forbidden']}
+    for name in sorted(top_level):
+        lines.append(f"FORBIDDEN: {name} is imported eagerly, import it where it is used")
+    if result['total_ms'] > budget_ms:
+        lines.append(f"OVER BUDGET by {result['total_ms'] - budget_ms:.1f} ms")
+    return lines
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code, 1 when the budget is exceeded or a forbidden module is imported
+    """
+    parser = argparse.ArgumentParser(description='Check the import time of the test suite')
+    parser.add_argument('modules', nargs='*', default=['conftest'],
+                        help='Modules to import (default: conftest)')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help='Allowed median import time on top of pytest '
+                             f"(default: {DEFAULT_BUDGET_MS:.0f})")
+    parser.add_argument('--forbid', action='append',
+                        help='Module that must not be imported, repeatable '
+                             f"(default: {', '.join(DEFAULT_FORBIDDEN)})")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Fresh interpreters measured')
+    parser.add_argument('--top', type=int, default=15, help='Most expensive modules listed')
+    args = parser.parse_args(argv)
+
+    forbidden = args.forbid if args.forbid is not None else list(DEFAULT_FORBIDDEN)
+    result = check_budget(args.modules, args.budget_ms, forbidden, args.repeat)
+    for line in format_report(result, args.budget_ms, args.top):
+        print(line)
+    return 0 if result['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,576 @@
+"""
+Load runner for E-commerce Test Suite
+Browserless load generation replaying the suite's user journeys
+(login, search, add to cart, checkout) as lightweight async HTTP/1.1 requests
+
+Usage:
+    python -m utils.load_runner --stages 10:500,30:500,10:0
+    python -m utils.load_runner --base-url http://staging.example.com/ --stages 60:2000
+    python -m utils.load_runner --cart shared --stages 5:500,10:500
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from utils import config
+from utils.cart_service import CART_COOKIE, CartClient, new_session_id
+from utils.catalogue import BASE_PRODUCTS
+
+if sys.platform != 'win32':  # resource is not available on Windows
+    import resource
+
+DEFAULT_STAGES = '10:100,30:100,10:0'
+PAGE_SIZE = 48  # Same page size as demo-site/products.js
+
+# Where virtual users keep their cart: in the browser (localStorage, no
+# requests), in a server-side cart per user, or all in one server-side cart
+CART_BROWSER = 'browser'
+CART_SERVER = 'server'
+CART_SHARED = 'shared'
+CART_MODES = (CART_BROWSER, CART_SERVER, CART_SHARED)
+
+
+def build_journey(search_term: str = config.SEARCH_TERM, product_name: str = config.PRODUCT_NAME,
+                  cart: str = CART_BROWSER) -> List[Tuple[str, List[Tuple]]]:
+    """
+    Requests a browser makes for each step of the suite's checkout journey
+
+    Mirrors the page object flows against the demo site: LoginPage opens the
+    home page and login form and lands on the account page, SearchPage loads
+    the products page and queries the catalogue API, CartPage looks the
+    product up and opens the cart, CheckoutPage opens checkout and the
+    confirmation page. Login state lives in the browser on the demo site, so
+    that step only fetches what the pages load; the cart goes through
+    /api/cart unless cart is CART_BROWSER.
+
+    Args:
+        search_term: Term searched in the search step
+        product_name: Product added in the add to cart step
+        cart: One of CART_MODES
+
+    Returns:
+        List of (step name, [(method, path, JSON payload or None)]) in journey order
+    """
+    def api(term):
+        return ('GET', f"/api/products?q={quote(term)}&page=1&per_page={PAGE_SIZE}", None)
+
+    def get(path):
+        return ('GET', path, None)
+
+    price = next((p['price'] for p in BASE_PRODUCTS if p['name'] == product_name), 1.0)
+    add_to_cart = [api(product_name), get('/cart.html'), get('/cart.js')]
+    checkout = [get('/checkout.html'), get('/checkout.js'), get('/success.html')]
+    if cart != CART_BROWSER:
+        item = {'name': product_name, 'price': price, 'quantity': 1}
+        add_to_cart[1:1] = [('POST', '/api/cart/items', item)]
+        add_to_cart.append(get('/api/cart'))
+        checkout.insert(2, get('/api/cart'))
+    if cart == CART_SERVER:
+        # Placing the order empties the cart, a shared cart keeps every add
+        # to check for lost updates
+        checkout.insert(3, ('DELETE', '/api/cart', None))
+
+    return [
+        ('login', [
+            get('/'), get('/login.html'), get('/styles.css'), get('/app.js'), get('/account.html'),
+        ]),
+        ('search', [
+            get(f"/products.html?search={quote(search_term)}"), get('/products.js'),
+            api(search_term),
+        ]),
+        ('add_to_cart', add_to_cart),
+        ('checkout', checkout),
+    ]
+
+
+def parse_stages(value: str) -> List[Tuple[float, int]]:
+    """
+    Parse a ramp profile such as "10:100,30:100,10:0"
+
+    Each stage moves the number of virtual users linearly from the previous
+    target (0 at the start) to its own target over its duration.
+
+    Args:
+        value: Comma separated duration_seconds:target_users stages
+
+    Returns:
+        List of (duration, target) tuples
+    """
+    stages = []
+    for entry in value.split(','):
+        if not entry.strip():
+            continue
+        try:
+            duration, target = entry.split(':')
+            stages.append((float(duration), int(target)))
+        except ValueError:
+            raise ValueError(f"Invalid stage '{entry}', expected seconds:users (e.g. 30:100)")
+    if not stages:
+        raise ValueError("At least one stage is required")
+    return stages
+
+
+def target_users(stages: List[Tuple[float, int]], elapsed: float) -> int:
+    """
+    Number of virtual users a ramp profile asks for at a point in time
+
+    Args:
+        stages: Parsed stages
+        elapsed: Seconds since the start of the run
+
+    Returns:
+        Target number of virtual users
+    """
+    start_users, start_time = 0, 0.0
+    for duration, target in stages:
+        if elapsed < start_time + duration:
+            progress = (elapsed - start_time) / duration if duration else 1.0
+            return round(start_users + (target - start_users) * progress)
+        start_users, start_time = target, start_time + duration
+    return start_users
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+class HttpConnection:
+    """
+    Minimal keep-alive HTTP/1.1 client connection on asyncio streams
+    """
+
+    def __init__(self, host: str, port: int, timeout: float):
+        """
+        Initialize HttpConnection
+
+        Args:
+            host: Server host
+            port: Server port
+            timeout: Seconds allowed for connecting and for each response
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        # Whether any of the current response has been read
+        self.responded = False
+
+    async def request(self, method: str, target: str, headers: Optional[Dict[str, str]] = None,
+                      body: bytes = b'') -> Tuple:
+        """
+        Send a request and read the whole response
+
+        A request failing on a reused connection is sent again on a new one
+        when it is a GET or HEAD, or when no response byte had arrived: the
+        server then closed the idle connection without handling it. Other
+        requests may have been applied already and are not repeated.
+
+        Args:
+            method: HTTP method
+            target: Request path with query string
+            headers: Extra request headers
+            body: Request body
+
+        Returns:
+            Tuple of (status, lower-cased response headers, body size)
+        """
+        reused = self.writer is not None
+        try:
+            return await asyncio.wait_for(self._exchange(method, target, headers or {}, body),
+                                          self.timeout)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.close()
+            if not reused or (self.responded and method not in ('GET', 'HEAD')):
+                raise
+            # The server closed an idle keep-alive connection, retry once on a new one
+            return await asyncio.wait_for(self._exchange(method, target, headers or {}, body),
+                                          self.timeout)
+
+    async def _exchange(self, method: str, target: str, headers: Dict[str, str],
+                        body: bytes) -> Tuple:
+        self.responded = False
+        if self.reader is None or self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 'Accept-Encoding: gzip, br']
+        if body or method not in ('GET', 'HEAD'):
+            lines.append(f"Content-Length: {len(body)}")
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Connection closed by server')
+        self.responded = True
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        size = 0
+        if method != 'HEAD' and status not in (204, 304):
+            if 'content-length' in response_headers:
+                size = int(response_headers['content-length'])
+                await self.reader.readexactly(size)
+            elif response_headers.get('transfer-encoding', '').lower() == 'chunked':
+                while True:
+                    chunk = int((await self.reader.readline()).split(b';')[0], 16)
+                    await self.reader.readexactly(chunk + 2)
+                    size += chunk
+                    if not chunk:
+                        break
+            else:
+                size = len(await self.reader.read())
+                self.close()
+        if response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, response_headers, size
+
+    def close(self):
+        """
+        Close the connection, the next request reconnects
+        """
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class StepStats:
+    """
+    Latency and error counters of one journey step
+    """
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.requests = 0
+        self.bytes = 0
+
+    def summary(self) -> dict:
+        """
+        Step statistics for reporting
+
+        Returns:
+            Dictionary with completed count, errors, requests, bytes and latency percentiles (ms)
+        """
+        return {
+            'completed': len(self.latencies),
+            'errors': self.errors,
+            'requests': self.requests,
+            'bytes': self.bytes,
+            'p50_ms': _percentile(self.latencies, 0.50) * 1000,
+            'p90_ms': _percentile(self.latencies, 0.90) * 1000,
+            'p99_ms': _percentile(self.latencies, 0.99) * 1000,
+            'max_ms': max(self.latencies, default=0.0) * 1000,
+        }
+
+
+class LoadRunner:
+    """
+    Runs virtual users through the journey following a ramp profile
+
+    Each virtual user is an asyncio task with its own keep-alive connection
+    and ETag cache, so repeat visits revalidate assets like a browser would,
+    and with its own cart session unless the cart is shared. Users removed by
+    a ramp-down finish their current journey first.
+    """
+
+    def __init__(self, base_url: str, stages: List[Tuple[float, int]], think_time: float = 0.0,
+                 timeout: float = 30.0, journey: Optional[List] = None, seed: int = 0,
+                 cart: str = CART_BROWSER):
+        """
+        Initialize LoadRunner
+
+        Args:
+            base_url: Storefront base URL
+            stages: Ramp profile from parse_stages()
+            think_time: Mean pause between steps in seconds
+            timeout: Seconds allowed per request
+            journey: Steps from build_journey(), defaults to the suite's journey
+            seed: Seed of the think time jitter
+            cart: One of CART_MODES, should match the journey
+        """
+        url = urlsplit(base_url)
+        self.host = url.hostname or '127.0.0.1'
+        self.port = url.port or 80
+        self.prefix = url.path.rstrip('/')
+        self.stages = stages
+        self.think_time = think_time
+        self.timeout = timeout
+        self.journey = journey or build_journey()
+        self.rng = random.Random(seed)
+        self.stats = {name: StepStats() for name, _ in self.journey}
+        self.cart = cart
+        self.cart_session = new_session_id() if cart == CART_SHARED else None
+        self.cart_adds = 0
+        self.cart_adds_sent = 0
+        self.journeys = 0
+        self.peak_users = 0
+        self.elapsed = 0.0
+
+    async def _step(self, connection: HttpConnection, etags: Dict[str, str], cookie: Dict[str, str],
+                    requests) -> Tuple[int, int]:
+        size = 0
+        for method, path, payload in requests:
+            target = self.prefix + path
+            headers = dict(cookie)
+            if target in etags:
+                headers['If-None-Match'] = etags[target]
+            body = b''
+            if payload is not None:
+                body = json.dumps(payload).encode('utf-8')
+                headers['Content-Type'] = 'application/json'
+            add = method == 'POST' and path == '/api/cart/items'
+            if add:
+                # Counted before sending: the server may apply an add whose response
+                # never arrives because the run ended first
+                self.cart_adds_sent += 1
+            response = await connection.request(method, target, headers, body)
+            status, response_headers, body_size = response
+            if status >= 400:
+                raise ConnectionError(f"{method} {target} returned {status}")
+            if 'etag' in response_headers:
+                etags[target] = response_headers['etag']
+            if add:
+                self.cart_adds += 1
+            size += body_size
+        return len(requests), size
+
+    async def _virtual_user(self, stop: asyncio.Event):
+        connection = HttpConnection(self.host, self.port, self.timeout)
+        etags: Dict[str, str] = {}
+        cookie = {}
+        if self.cart != CART_BROWSER:
+            cookie['Cookie'] = f"{CART_COOKIE}={self.cart_session or new_session_id()}"
+        try:
+            while not stop.is_set():
+                for name, requests in self.journey:
+                    stats = self.stats[name]
+                    started = time.perf_counter()
+                    try:
+                        count, size = await self._step(connection, etags, cookie, requests)
+                    except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                        stats.errors += 1
+                        connection.close()
+                        break
+                    stats.latencies.append(time.perf_counter() - started)
+                    stats.requests += count
+                    stats.bytes += size
+                    if self.think_time:
+                        await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.think_time)
+                else:
+                    self.journeys += 1
+        finally:
+            connection.close()
+
+    async def run(self, tick: float = 0.1) -> dict:
+        """
+        Run the ramp profile to completion
+
+        Args:
+            tick: Seconds between adjustments of the number of virtual users
+
+        Returns:
+            Summary from summary()
+        """
+        duration = sum(stage[0] for stage in self.stages)
+        users: List[Tuple[asyncio.Task, asyncio.Event]] = []
+        started = time.perf_counter()
+        while True:
+            elapsed = time.perf_counter() - started
+            if elapsed >= duration:
+                break
+            users = [(task, stop) for task, stop in users if not task.done()]
+            active = [user for user in users if not user[1].is_set()]
+            target = target_users(self.stages, elapsed)
+            for _ in range(target - len(active)):
+                stop = asyncio.Event()
+                users.append((asyncio.ensure_future(self._virtual_user(stop)), stop))
+            for _, stop in active[target:]:
+                stop.set()
+            self.peak_users = max(self.peak_users, len(users))
+            await asyncio.sleep(tick)
+
+        # wait_for can swallow a cancellation that races a completed read,
+        # the stop event still ends those users after their current journey
+        for task, stop in users:
+            stop.set()
+            task.cancel()
+        await asyncio.gather(*(task for task, _ in users), return_exceptions=True)
+        self.elapsed = time.perf_counter() - started
+        return self.summary()
+
+    def summary(self) -> dict:
+        """
+        Run statistics
+
+        Returns:
+            Dictionary with per-step statistics and overall throughput
+        """
+        steps = {name: stats.summary() for name, stats in self.stats.items()}
+        requests = sum(step['requests'] for step in steps.values())
+        elapsed = self.elapsed or 1.0
+        return {
+            'duration_s': self.elapsed,
+            'peak_users': self.peak_users,
+            'journeys': self.journeys,
+            'journeys_per_s': self.journeys / elapsed,
+            'requests': requests,
+            'requests_per_s': requests / elapsed,
+            'cart_adds': self.cart_adds,
+            'steps': steps,
+        }
+
+
+def format_summary(summary: dict) -> List[str]:
+    """
+    Format a run summary as terminal lines
+
+    Args:
+        summary: Summary from LoadRunner.summary()
+
+    Returns:
+        List of lines
+    """
+    lines = [f"{'step':<12} {'completed':>9} {'errors':>7} {'p50 ms':>8} {'p90 ms':>8} "
+             f"{'p99 ms':>8} {'max ms':>8}"]
+    for name, step in summary['steps'].items():
+        lines.append(
+            f"{name:<12} {step['completed']:>9} {step['errors']:>7} {step['p50_ms']:>8.1f} "
+            f"{step['p90_ms']:>8.1f} {step['p99_ms']:>8.1f} {step['max_ms']:>8.1f}"
+        )
+    lines.append(
+        f"{summary['journeys']} journeys ({summary['journeys_per_s']:.1f}/s), "
+        f"{summary['requests']} requests ({summary['requests_per_s']:.1f}/s), "
+        f"peak {summary['peak_users']} users in {summary['duration_s']:.1f}s"
+    )
+    if 'shared_cart' in summary:
+        cart = summary['shared_cart']
+        lines.append(
+            f"shared cart: {cart['adds']} confirmed adds (+{cart['in_flight']} in flight at stop), "
+            f"final quantity {cart['quantity']}, {cart['lost_updates']} lost updates"
+        )
+    return lines
+
+
+def raise_open_files_limit():
+    """
+    Raise the soft open files limit to the hard limit
+    Every virtual user holds a socket open
+    """
+    if sys.platform == 'win32':
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def _serve_demo_site(ports, catalogue_size: int, catalogue_seed: int):
+    # Imported here so a remote target does not load the server and its catalogue
+    from utils.catalogue import Catalogue
+    from utils.demo_server import DemoSiteServer
+
+    raise_open_files_limit()
+    server = DemoSiteServer(catalogue=Catalogue(catalogue_size, catalogue_seed))
+    ports.put(server.httpd.server_address[1])
+    server.httpd.serve_forever()
+
+
+def start_demo_site(catalogue_size: int = 0, catalogue_seed: int = 0) -> Tuple:
+    """
+    Serve the bundled demo site from a child process, so the server does not
+    share the load generator's interpreter
+
+    Args:
+        catalogue_size: Synthetic catalogue size
+        catalogue_seed: Synthetic catalogue seed
+
+    Returns:
+        Tuple of (process, base URL)
+    """
+    ports: 'multiprocessing.Queue[int]' = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=_serve_demo_site, args=(ports, catalogue_size, catalogue_seed), daemon=True
+    )
+    process.start()
+    return process, f"http://127.0.0.1:{ports.get(timeout=60)}/"
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code, 1 if any step failed
+    """
+    parser = argparse.ArgumentParser(description='Replay the suite journeys as HTTP load')
+    parser.add_argument('--base-url', default=None,
+                        help='Target storefront (default: serve the bundled demo site locally)')
+    parser.add_argument('--stages', default=DEFAULT_STAGES,
+                        help='Ramp profile as seconds:users stages (default: %(default)s)')
+    parser.add_argument('--think-time', type=float, default=0.0,
+                        help='Mean pause between steps (s)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout (s)')
+    parser.add_argument('--search-term', default=config.SEARCH_TERM)
+    parser.add_argument('--product-name', default=config.PRODUCT_NAME)
+    parser.add_argument('--catalogue-size', type=int, default=config.CATALOGUE_SIZE)
+    parser.add_argument('--catalogue-seed', type=int, default=config.CATALOGUE_SEED)
+    parser.add_argument('--cart', choices=CART_MODES, default=CART_BROWSER,
+                        help='browser: localStorage cart, server: /api/cart per user, '
+                        'shared: every user updates one /api/cart and lost updates are counted')
+    parser.add_argument('--json', default=None, help='Write the summary to this JSON file')
+    args = parser.parse_args(argv)
+
+    raise_open_files_limit()
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server, base_url = start_demo_site(args.catalogue_size, args.catalogue_seed)
+    try:
+        runner = LoadRunner(
+            base_url, parse_stages(args.stages), think_time=args.think_time, timeout=args.timeout,
+            journey=build_journey(args.search_term, args.product_name, args.cart), cart=args.cart,
+        )
+        print(f"Running {args.stages} against {base_url}")
+        summary = asyncio.run(runner.run())
+        if args.cart == CART_SHARED:
+            quantity = CartClient(base_url, runner.cart_session).get()['count']
+            # Every confirmed add must be in the cart; adds still in flight when the
+            # run stopped may or may not have been applied
+            summary['shared_cart'] = {
+                'adds': runner.cart_adds,
+                'in_flight': runner.cart_adds_sent - runner.cart_adds,
+                'quantity': quantity,
+                'lost_updates': max(0, runner.cart_adds - quantity),
+            }
+    finally:
+        if server is not None:
+            server.terminate()
+
+    for line in format_summary(summary):
+        print(line)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    lost_updates = summary.get('shared_cart', {}).get('lost_updates', 0)
+    return 1 if lost_updates > 0 or any(step['errors'] for step in summary['steps'].values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
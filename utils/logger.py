@@ -1,11 +1,123 @@
 """
 Logging utility for E-commerce Test Suite
 Provides centralized logging configuration
+
+Loggers only put records on a queue; a listener thread per process writes
+them as JSON lines with test id, worker and browser fields to a rotating
+file per worker, and the run's worker files are merged by timestamp at the
+end of the session. Records still propagate to the root logger, so pytest's
+caplog and live logging (log_cli) see them.
+
+Usage:
+    python -m utils.logger merge logs/run_20240101_120000_1234
 """
+import argparse
+import atexit
+import heapq
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import sys
 from datetime import datetime
 from pathlib import Path
+from typing import Iterator, List, Optional
+
+LOG_DIR = "logs"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+MERGED_LOG_NAME = "run.jsonl"
+
+# Fields added to every record of this process, see set_log_context()
+_context = {"test_id": None, "browser": None}
+_queue: "queue.Queue" = queue.Queue(-1)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _worker() -> str:
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def run_log_dir() -> str:
+    """
+    Directory holding the log files of the current run
+
+    The first process to ask (the pytest controller) picks the directory and
+    exports it, so xdist workers started afterwards write next to it.
+
+    Returns:
+        Path such as logs/run_20240101_120000_1234
+    """
+    if "TEST_RUN_LOG_DIR" not in os.environ:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.environ["TEST_RUN_LOG_DIR"] = os.path.join(LOG_DIR, f"run_{stamp}_{os.getpid()}")
+    return os.environ["TEST_RUN_LOG_DIR"]
+
+
+def set_log_context(**fields):
+    """
+    Set the test id and browser added to the records of this process
+
+    Args:
+        fields: test_id and/or browser, None to clear
+    """
+    _context.update(fields)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Add the test id, worker and browser to records on the calling thread
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.test_id = _context["test_id"]
+        record.worker = _worker()
+        record.browser = _context["browser"]
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({
+            "ts": record.created,
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "test_id": getattr(record, "test_id", None),
+            "worker": getattr(record, "worker", None),
+            "browser": getattr(record, "browser", None),
+            "location": f"{record.filename}:{record.lineno}",
+        })
+
+
+def _start_listener():
+    global _listener
+    if _listener is not None:
+        return
+    log_dir = Path(run_log_dir())
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    # File handler - JSON lines, one rotating file per worker
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_dir / f"{_worker()}.jsonl",
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding="utf-8",
+        delay=True,
+    )
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(JsonLinesFormatter())
+
+    # The console is left to pytest's live logging, records propagate to it
+    _listener = logging.handlers.QueueListener(_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
 
 
 def setup_logger(name: str = "ecommerce_test_suite", log_level: str = "INFO") -> logging.Logger:
@@ -20,42 +132,19 @@ def setup_logger(name: str = "ecommerce_test_suite", log_level: str = "INFO") ->
         Configured logger instance
     """
     logger = logging.getLogger(name)
-    
+
     # Avoid duplicate handlers
     if logger.handlers:
         return logger
-    
+
     logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
-    
-    # Create logs directory if it doesn't exist
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    
-    # File handler - write to file
-    log_file = log_dir / f"test_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setLevel(logging.DEBUG)
-    
-    # Console handler - print to console
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    
-    # Formatter
-    detailed_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    simple_formatter = logging.Formatter(
-        '%(levelname)s - %(message)s'
-    )
-    
-    file_handler.setFormatter(detailed_formatter)
-    console_handler.setFormatter(simple_formatter)
-    
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+
+    # The test thread only enqueues, the listener thread formats and writes
+    queue_handler = logging.handlers.QueueHandler(_queue)
+    queue_handler.addFilter(ContextFilter())
+    logger.addHandler(queue_handler)
+    _start_listener()
+
     return logger
 
 
@@ -73,3 +162,99 @@ def get_logger(name: str = "ecommerce_test_suite") -> logging.Logger:
     if not logger.handlers:
         return setup_logger(name)
     return logger
+
+
+def flush_logging():
+    """
+    Write every queued record, e.g. before the run's logs are merged
+    """
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def shutdown_logging():
+    """
+    Write every queued record and stop the listener thread
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def _worker_files(directory: str) -> List[List[Path]]:
+    # Each worker's files oldest first: rotated backups (highest number first), then the live file
+    files = []
+    for live in sorted(Path(directory).glob("*.jsonl")):
+        if live.name == MERGED_LOG_NAME:
+            continue
+        backups = sorted(
+            live.parent.glob(f"{live.name}.*"),
+            key=lambda path: int(path.suffix[1:]) if path.suffix[1:].isdigit() else 0,
+            reverse=True,
+        )
+        files.append(backups + [live])
+    return files
+
+
+def _read_records(paths: List[Path]) -> Iterator[dict]:
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def merge_logs(directory: str, output: Optional[str] = None) -> Optional[str]:
+    """
+    Interleave the worker logs of a run by timestamp into one file
+
+    Args:
+        directory: Run log directory
+        output: Merged file, run.jsonl in the directory by default
+
+    Returns:
+        Path of the merged file, None when the run logged nothing
+    """
+    files = _worker_files(directory)
+    if not files:
+        return None
+    output = output or os.path.join(directory, MERGED_LOG_NAME)
+    records = (_read_records(paths) for paths in files)
+    merged = heapq.merge(*records, key=lambda record: record["ts"])
+    with open(output, "w", encoding="utf-8") as f:
+        for record in merged:
+            f.write(json.dumps(record) + "\n")
+    return output
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point: merge the worker logs of a run
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description="Test suite log tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    merge = subparsers.add_parser("merge", help="Interleave a run's worker logs by timestamp")
+    merge.add_argument("directory", help="Run log directory, e.g. logs/run_20240101_120000_1234")
+    merge.add_argument("--output", help=f"Merged file (default: <directory>/{MERGED_LOG_NAME})")
+    args = parser.parse_args(argv)
+
+    output = merge_logs(args.directory, args.output)
+    if output is None:
+        print(f"No worker logs in {args.directory}", file=sys.stderr)
+        return 1
+    print(f"Merged logs into {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+"""
+Page-object method timing for E-commerce Test Suite
+Times every public method of the page classes, keeps the timings in a local
+SQLite store keyed by commit, browser and worker, and reports percentiles
+per method over time with a regression flag
+
+Usage:
+    pytest --time-methods
+    python -m utils.method_timing report --browser chrome --last 5
+    python -m utils.method_timing report --fail-on-regression
+"""
+import argparse
+import functools
+import inspect
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from utils.browser_pool import worker_id
+
+DEFAULT_DB_PATH = '.method_timings.db'
+
+# Set by the MethodTimingRecorder plugin, None when timing is off
+_recorder = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS method_timings (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    commit_sha TEXT NOT NULL,
+    browser TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    test TEXT NOT NULL,
+    method TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    ok INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS method_timings_method ON method_timings (method, browser, commit_sha);
+"""
+
+
+def _timed(name: str, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        recorder = _recorder
+        if recorder is None:
+            return method(*args, **kwargs)
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = method(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            recorder.record(name, time.perf_counter() - started, ok)
+    return wrapper
+
+
+def timed_methods(cls):
+    """
+    Class decorator timing every public method of a page class
+
+    Generator methods are left alone, their call only creates the iterator.
+    Nested calls are timed too, so LoginPage.login includes LoginPage.enter_email.
+
+    Args:
+        cls: Page class
+
+    Returns:
+        The same class with its public methods wrapped
+    """
+    for attr, value in list(vars(cls).items()):
+        if (attr.startswith('_') or not inspect.isfunction(value)
+                or inspect.isgeneratorfunction(value)):
+            continue
+        setattr(cls, attr, _timed(f"{cls.__name__}.{attr}", value))
+    return cls
+
+
+def current_commit() -> str:
+    """
+    Get the commit under test
+
+    Returns:
+        Short SHA from CI variables or git, "unknown" outside a repository
+    """
+    for variable in ('GITHUB_SHA', 'CI_COMMIT_SHA', 'GIT_COMMIT'):
+        if os.environ.get(variable):
+            return os.environ[variable][:12]
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short=12', 'HEAD'],
+            capture_output=True, text=True, check=True, timeout=10,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return 'unknown'
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile
+
+    Args:
+        samples: Values, in any order
+        fraction: Percentile between 0 and 1
+
+    Returns:
+        Value at that rank
+    """
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class TimingStore:
+    """
+    SQLite store of page-object method timings
+
+    Workers of one run share the database file; each writes its rows in a
+    single transaction at the end of the session.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        """
+        Initialize TimingStore
+
+        Args:
+            path: Path of the SQLite database, created if missing
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """
+        Close the database
+        """
+        self.connection.close()
+
+    def add(self, rows: List[tuple]):
+        """
+        Append timings
+
+        Args:
+            rows: (recorded_at, commit_sha, browser, worker, test, method, seconds, ok) tuples
+        """
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO method_timings '
+                '(recorded_at, commit_sha, browser, worker, test, method, seconds, ok) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                rows,
+            )
+
+    def commits(self, browser: Optional[str] = None) -> List[str]:
+        """
+        Get the recorded commits
+
+        Args:
+            browser: Only commits with timings for this browser
+
+        Returns:
+            Commits, oldest first by first recording
+        """
+        query = 'SELECT commit_sha FROM method_timings'
+        params = []
+        if browser:
+            query += ' WHERE browser = ?'
+            params.append(browser)
+        query += ' GROUP BY commit_sha ORDER BY MIN(recorded_at)'
+        return [row[0] for row in self.connection.execute(query, params)]
+
+    def samples(self, commits: List[str], browser: Optional[str] = None,
+                method: Optional[str] = None) -> Dict[str, Dict[str, List[float]]]:
+        """
+        Get the durations of successful calls
+
+        Args:
+            commits: Commits to read
+            browser: Only this browser
+            method: Only methods containing this text (e.g. "LoginPage.")
+
+        Returns:
+            Dictionary of method -> commit -> seconds
+        """
+        if not commits:
+            return {}
+        query = (f"SELECT method, commit_sha, seconds FROM method_timings "
+                 f"WHERE ok = 1 AND commit_sha IN ({', '.join('?' * len(commits))})")
+        params = list(commits)
+        if browser:
+            query += ' AND browser = ?'
+            params.append(browser)
+        if method:
+            query += ' AND method LIKE ?'
+            params.append(f"%{method}%")
+        samples: Dict[str, Dict[str, List[float]]] = {}
+        for name, commit, seconds in self.connection.execute(query, params):
+            samples.setdefault(name, {}).setdefault(commit, []).append(seconds)
+        return samples
+
+
+class MethodTimingRecorder:
+    """
+    pytest plugin collecting the page-object method timings of a run
+
+    Timings are buffered in memory and written to the store once per worker
+    at the end of the session, so tests never wait on the database.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, commit: Optional[str] = None):
+        """
+        Initialize MethodTimingRecorder
+
+        Args:
+            path: Path of the SQLite database
+            commit: Commit under test, detected by default
+        """
+        self.path = path
+        self.commit = commit or current_commit()
+        self.worker = worker_id()
+        self.test = ''
+        self.browser = ''
+        self.rows: List[tuple] = []
+
+    def record(self, method: str, seconds: float, ok: bool):
+        """
+        Buffer one method call
+
+        Args:
+            method: Qualified method name (e.g. "LoginPage.login")
+            seconds: Call duration
+            ok: Whether the call returned without raising
+        """
+        self.rows.append((time.time(), self.commit, self.browser, self.worker, self.test,
+                          method, seconds, int(ok)))
+
+    def pytest_configure(self, config):
+        global _recorder
+        _recorder = self
+
+    def pytest_runtest_logstart(self, nodeid):
+        self.test = nodeid
+        self.browser = ''
+
+    def pytest_runtest_call(self, item):
+        # The driver fixture adds the browser to the user properties during setup
+        self.browser = dict(item.user_properties).get('browser', '')
+
+    def pytest_sessionfinish(self, session):
+        if not self.rows:
+            return
+        store = TimingStore(self.path)
+        try:
+            store.add(self.rows)
+        finally:
+            store.close()
+        self.rows = []
+
+    def pytest_unconfigure(self, config):
+        global _recorder
+        if _recorder is self:
+            _recorder = None
+
+
+def report(store: TimingStore, browser: Optional[str] = None, method: Optional[str] = None,
+           last: int = 5, baseline: int = 5, threshold: float = 0.2, min_samples: int = 5) -> Dict:
+    """
+    Compute percentiles per method and commit and flag regressions
+
+    A method regressed when its p95 on the latest commit exceeds the p95 of
+    the pooled samples of the previous `baseline` commits by more than
+    `threshold`, with at least `min_samples` calls on both sides.
+
+    Args:
+        store: Timing store
+        browser: Only this browser
+        method: Only methods containing this text
+        last: Number of most recent commits shown
+        baseline: Number of commits before the latest pooled as baseline
+        threshold: Allowed relative p95 increase (0.2 = 20%)
+        min_samples: Minimum calls on both sides to judge a regression
+
+    Returns:
+        Dictionary with the shown commits, per-method rows and regressions
+    """
+    commits = store.commits(browser)
+    if not commits:
+        return {'commits': [], 'methods': {}, 'regressions': []}
+    shown = commits[-last:]
+    latest = commits[-1]
+    before = commits[:-1][-baseline:]
+    samples = store.samples(sorted(set(shown + before)), browser, method)
+
+    methods = {}
+    regressions = []
+    for name in sorted(samples):
+        by_commit = samples[name]
+        methods[name] = [
+            {
+                'commit': commit,
+                'n': len(by_commit[commit]),
+                'p50': percentile(by_commit[commit], 0.5),
+                'p95': percentile(by_commit[commit], 0.95),
+                'p99': percentile(by_commit[commit], 0.99),
+            }
+            for commit in shown if commit in by_commit
+        ]
+        current = by_commit.get(latest, [])
+        pooled = [seconds for commit in before for seconds in by_commit.get(commit, [])]
+        if len(current) >= min_samples and len(pooled) >= min_samples:
+            base_p95, new_p95 = percentile(pooled, 0.95), percentile(current, 0.95)
+            if base_p95 > 0 and new_p95 > base_p95 * (1 + threshold):
+                regressions.append({
+                    'method': name, 'commit': latest,
+                    'baseline_p95': base_p95, 'p95': new_p95, 'change': new_p95 / base_p95 - 1,
+                })
+    return {'commits': shown, 'methods': methods, 'regressions': regressions}
+
+
+def format_report(result: Dict) -> str:
+    """
+    Format a report as a plain text table
+
+    Args:
+        result: Output of report()
+
+    Returns:
+        Table with one line per method and commit, regressions marked
+    """
+    regressed = {entry['method']: entry for entry in result['regressions']}
+    lines = [f"{'method':<40} {'commit':<12} {'n':>6} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8}"]
+    for name, rows in result['methods'].items():
+        for position, row in enumerate(rows):
+            label = name if position == 0 else ''
+            line = (f"{label:<40} {row['commit']:<12} {row['n']:>6} "
+                    f"{row['p50']:>8.3f} {row['p95']:>8.3f} {row['p99']:>8.3f}")
+            entry = regressed.get(name)
+            if entry and row['commit'] == entry['commit']:
+                line += (f"  REGRESSED p95 +{entry['change']:.0%} "
+                         f"(baseline {entry['baseline_p95']:.3f}s)")
+            lines.append(line)
+    if not result['methods']:
+        lines.append('No timings recorded')
+    lines.append(f"{len(result['regressions'])} regressed method(s)")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code, 1 when --fail-on-regression is given and a method regressed
+    """
+    parser = argparse.ArgumentParser(description='Page-object method timing history')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    show = subparsers.add_parser('report', help='Show p50/p95/p99 per method and commit')
+    show.add_argument('--db', default=DEFAULT_DB_PATH)
+    show.add_argument('--browser')
+    show.add_argument('--method', help='Only methods containing this text')
+    show.add_argument('--last', type=int, default=5, help='Most recent commits shown')
+    show.add_argument('--baseline', type=int, default=5, help='Previous commits pooled as baseline')
+    show.add_argument('--threshold', type=float, default=0.2, help='Allowed relative p95 increase')
+    show.add_argument('--min-samples', type=int, default=5)
+    show.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No timing database at {args.db}, run pytest --time-methods first", file=sys.stderr)
+        return 2
+    store = TimingStore(args.db)
+    try:
+        result = report(store, args.browser, args.method, args.last, args.baseline,
+                        args.threshold, args.min_samples)
+    finally:
+        store.close()
+    print(format_report(result))
+    return 1 if args.fail_on_regression and result['regressions'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,473 @@
+"""
+Failure screencasts for E-commerce Test Suite
+Records the last seconds of every test from Chrome's DevTools screencast into
+an in-memory ring buffer and encodes it to disk only when the test fails
+
+The DevTools connection is a minimal websocket client on the standard
+library, the video is Motion JPEG in an AVI container, which needs no
+encoder since the browser already sends JPEG frames.
+
+Usage:
+    pytest --screencast --screencast-seconds 15
+"""
+import base64
+import collections
+import json
+import os
+import socket
+import struct
+import threading
+import time
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import pytest
+
+from utils.browser_memory import sample_cpu
+from utils.browser_report import teardown_properties
+
+DEFAULT_SECONDS = 10.0
+DEFAULT_FPS = 5
+JPEG_QUALITY = 60
+MAX_WIDTH = 1024
+MAX_FRAMES = 600
+
+# Chromium drivers expose the DevTools endpoint of the browser in these capabilities
+DEBUGGER_CAPABILITIES = ('goog:chromeOptions', 'ms:edgeOptions')
+
+_WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+class DevToolsConnection:
+    """
+    Minimal websocket client for the Chrome DevTools Protocol
+
+    Only what CDP needs: text frames, client-side masking, fragmented
+    messages and ping/pong.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        """
+        Open the websocket
+
+        Args:
+            url: webSocketDebuggerUrl of a DevTools target
+            timeout: Connect and handshake timeout in seconds
+        """
+        parsed = urlparse(url)
+        self.sock = socket.create_connection((parsed.hostname, parsed.port or 80), timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.sock.makefile('rb')
+        self.next_id = 0
+        self.send_lock = threading.Lock()
+
+        key = base64.b64encode(os.urandom(16)).decode()
+        # No Origin header: Chrome only rejects websocket clients that send one
+        self.sock.sendall((
+            f"GET {parsed.path} HTTP/1.1\r\n"
+            f"Host: {parsed.netloc}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n"
+        ).encode())
+        status = self.file.readline()
+        while self.file.readline() not in (b'\r\n', b''):
+            pass
+        if b' 101 ' not in status:
+            self.close()
+            raise ConnectionError(f"DevTools websocket handshake failed: {status.decode().strip()}")
+        self.sock.settimeout(None)
+
+    def _send_frame(self, opcode: int, payload: bytes):
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([0x80 | length])
+        elif length < 1 << 16:
+            header += bytes([0x80 | 126]) + struct.pack('!H', length)
+        else:
+            header += bytes([0x80 | 127]) + struct.pack('!Q', length)
+        mask = os.urandom(4)
+        # XOR the payload with the repeated mask as one big integer
+        repeated = (mask * (length // 4 + 1))[:length]
+        masked = (int.from_bytes(payload, 'big')
+                  ^ int.from_bytes(repeated, 'big')).to_bytes(length, 'big')
+        with self.send_lock:
+            self.sock.sendall(header + mask + masked)
+
+    def send(self, method: str, params: Optional[Dict] = None) -> int:
+        """
+        Send a CDP command without waiting for its result
+
+        Args:
+            method: CDP method (e.g. "Page.startScreencast")
+            params: Method parameters
+
+        Returns:
+            Message id
+        """
+        # The test thread and the receiver thread (frame acks) both send
+        with self.send_lock:
+            self.next_id += 1
+            message_id = self.next_id
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        self._send_frame(0x1, json.dumps(message).encode())
+        return message_id
+
+    def _read(self, size: int) -> bytes:
+        data = self.file.read(size)
+        if len(data) < size:
+            raise ConnectionError('DevTools websocket closed')
+        return data
+
+    def receive(self) -> Dict:
+        """
+        Wait for the next CDP message (command result or event)
+
+        Returns:
+            Decoded message
+
+        Raises:
+            ConnectionError: The connection was closed
+        """
+        parts = []
+        while True:
+            first, second = self._read(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack('!H', self._read(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', self._read(8))[0]
+            payload = self._read(length)
+            if opcode == 0x8:
+                raise ConnectionError('DevTools websocket closed')
+            if opcode == 0x9:
+                self._send_frame(0xA, payload)
+                continue
+            if opcode in (0x0, 0x1, 0x2):
+                parts.append(payload)
+                if first & 0x80:
+                    return json.loads(b''.join(parts))
+
+    def close(self):
+        """
+        Close the connection, which also ends a blocked receive()
+        """
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def page_websocket_url(driver) -> Optional[str]:
+    """
+    DevTools websocket URL of the driver's current tab
+
+    Args:
+        driver: WebDriver instance
+
+    Returns:
+        webSocketDebuggerUrl, None for browsers without DevTools (Firefox)
+    """
+    capabilities = getattr(driver, 'capabilities', None) or {}
+    address = next(
+        (capabilities[key].get('debuggerAddress')
+         for key in DEBUGGER_CAPABILITIES if key in capabilities),
+        None,
+    )
+    if not address:
+        return None
+    with urllib.request.urlopen(f"http://{address}/json/list", timeout=5) as response:
+        targets = [target for target in json.load(response) if target.get('type') == 'page']
+    # chromedriver window handles are DevTools target ids
+    handle = driver.current_window_handle
+    for target in targets:
+        if target.get('id') == handle:
+            return target['webSocketDebuggerUrl']
+    return targets[0]['webSocketDebuggerUrl'] if targets else None
+
+
+class Screencast:
+    """
+    Ring buffer of the screencast frames of one tab
+
+    A daemon thread receives the frames, acknowledges them (Chrome stops
+    sending until the previous frame is acknowledged) and keeps those of
+    the last `seconds`. Frames stay base64 encoded until they are saved.
+    """
+
+    def __init__(self, url: str, seconds: float = DEFAULT_SECONDS,
+                 max_frames: int = MAX_FRAMES):
+        """
+        Connect to a tab and start the screencast
+
+        Args:
+            url: webSocketDebuggerUrl from page_websocket_url()
+            seconds: Length of the kept recording
+            max_frames: Upper bound on kept frames
+        """
+        self.seconds = seconds
+        self.frames: collections.deque = collections.deque(maxlen=max_frames)
+        self.lock = threading.Lock()
+        self.received = 0
+        self.received_bytes = 0
+        self.cpu_time = 0.0
+        self.started = time.monotonic()
+        self.connection = DevToolsConnection(url)
+        self.connection.send('Page.startScreencast', {
+            'format': 'jpeg', 'quality': JPEG_QUALITY,
+            'maxWidth': MAX_WIDTH, 'maxHeight': MAX_WIDTH,
+        })
+        self.thread = threading.Thread(target=self._run, name='screencast', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        cpu_start = time.thread_time()
+        try:
+            while True:
+                message = self.connection.receive()
+                if message.get('method') != 'Page.screencastFrame':
+                    continue
+                params = message['params']
+                self.connection.send('Page.screencastFrameAck', {'sessionId': params['sessionId']})
+                timestamp = params['metadata'].get('timestamp') or time.time()
+                self.received += 1
+                self.received_bytes += len(params['data'])
+                with self.lock:
+                    self.frames.append((timestamp, params['data']))
+                    while self.frames and self.frames[0][0] < timestamp - self.seconds:
+                        self.frames.popleft()
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            self.cpu_time = time.thread_time() - cpu_start
+
+    def snapshot(self) -> List[Tuple[float, str]]:
+        """
+        Frames currently in the buffer
+
+        Returns:
+            List of (timestamp, base64 JPEG), oldest first
+        """
+        with self.lock:
+            return list(self.frames)
+
+    def stop(self) -> Dict:
+        """
+        Stop the screencast and drop the buffer
+
+        Returns:
+            Overhead figures: frames, bytes, receiver CPU seconds and recording seconds
+        """
+        try:
+            self.connection.send('Page.stopScreencast')
+        except OSError:
+            pass
+        self.connection.close()
+        self.thread.join(timeout=5)
+        with self.lock:
+            self.frames.clear()
+        return {
+            'frames': self.received,
+            'bytes': self.received_bytes,
+            'cpu': self.cpu_time,
+            'wall': time.monotonic() - self.started,
+        }
+
+
+def jpeg_size(data: bytes) -> Tuple[int, int]:
+    """
+    Width and height of a JPEG image from its start-of-frame marker
+
+    Args:
+        data: JPEG bytes
+
+    Returns:
+        (width, height), (0, 0) if no start-of-frame marker is found
+    """
+    position = 2
+    while position + 9 < len(data):
+        if data[position] != 0xFF:
+            position += 1
+            continue
+        marker = data[position + 1]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('!HH', data[position + 5:position + 9])
+            return width, height
+        position += 2 + struct.unpack('!H', data[position + 2:position + 4])[0]
+    return 0, 0
+
+
+def _chunk(fourcc: bytes, data: bytes) -> bytes:
+    return fourcc + struct.pack('<I', len(data)) + data + (b'\0' if len(data) % 2 else b'')
+
+
+def _list(kind: bytes, data: bytes) -> bytes:
+    return _chunk(b'LIST', kind + data)
+
+
+def encode_mjpeg_avi(frames: List[Tuple[float, str]], fps: int = DEFAULT_FPS) -> bytes:
+    """
+    Encode screencast frames as a constant frame rate Motion JPEG AVI
+
+    The screencast only sends a frame when the page changes, so each tick
+    of the output shows the latest frame received by then.
+
+    Args:
+        frames: (timestamp, base64 JPEG) pairs from Screencast.snapshot(), oldest first
+        fps: Output frame rate
+
+    Returns:
+        AVI file content
+    """
+    decoded = [(timestamp, base64.b64decode(data)) for timestamp, data in frames]
+    start, end = decoded[0][0], decoded[-1][0]
+    ticks = int((end - start) * fps) + 1
+    sequence, index = [], 0
+    for tick in range(ticks):
+        while index + 1 < len(decoded) and decoded[index + 1][0] <= start + tick / fps:
+            index += 1
+        sequence.append(decoded[index][1])
+
+    width, height = jpeg_size(decoded[-1][1])
+    largest = max(len(image) for image in sequence)
+    movi, idx1, offset = [], [], 4
+    for image in sequence:
+        chunk = _chunk(b'00dc', image)
+        movi.append(chunk)
+        # AVIIF_KEYFRAME; offsets count from the 'movi' fourcc
+        idx1.append(b'00dc' + struct.pack('<III', 0x10, offset, len(image)))
+        offset += len(chunk)
+
+    avih = struct.pack(
+        '<14I', 1000000 // fps, largest * fps, 0, 0x10, len(sequence), 0, 1, largest,
+        width, height, 0, 0, 0, 0,
+    )
+    strh = b'vidsMJPG' + struct.pack(
+        '<IHHIIIIIIIIhhhh', 0, 0, 0, 0, 1, fps, 0, len(sequence), largest, 0xFFFFFFFF,
+        0, 0, 0, width, height,
+    )
+    strf = struct.pack(
+        '<IiiHH4sIiiII', 40, width, height, 1, 24, b'MJPG', width * height * 3, 0, 0, 0, 0
+    )
+    stream = _list(b'strl', _chunk(b'strh', strh) + _chunk(b'strf', strf))
+    header = _list(b'hdrl', _chunk(b'avih', avih) + stream)
+    body = header + _list(b'movi', b''.join(movi)) + _chunk(b'idx1', b''.join(idx1))
+    return _chunk(b'RIFF', b'AVI ' + body)
+
+
+class ScreencastRecorder:
+    """
+    pytest plugin recording every test on a Chromium browser
+
+    Recording starts once the test's fixtures are set up and stops before
+    they are torn down; failure capture saves the buffer through the
+    failure artifact writer, so encoding and disk writes stay off the test
+    thread. Overhead figures, including the CPU time of the browser's
+    process tree while recording, are attached as "screencast" user
+    properties and summed on the controller under xdist.
+    """
+
+    def __init__(self, seconds: float = DEFAULT_SECONDS, fps: int = DEFAULT_FPS):
+        """
+        Initialize ScreencastRecorder
+
+        Args:
+            seconds: Length of the recording kept for a failing test
+            fps: Frame rate of saved videos
+        """
+        self.seconds = seconds
+        self.fps = fps
+        self.active: Dict[str, Screencast] = {}
+        self.browser_cpu: Dict[str, Tuple[object, Optional[Dict[int, float]]]] = {}
+        self.saved: Dict[str, str] = {}
+        self.stats: List[Dict] = []
+        self.errors: List[str] = []
+
+    def save(self, item, writer, stem: str) -> Optional[str]:
+        """
+        Queue the running test's recording for encoding
+
+        Args:
+            item: Failing test item
+            writer: ArtifactWriter of the failure artifacts
+            stem: Stem reserved for the test's artifacts
+
+        Returns:
+            Path of the video, None if nothing was recorded
+        """
+        screencast = self.active.get(item.nodeid)
+        frames = screencast.snapshot() if screencast else []
+        if not frames:
+            return None
+        fps = self.fps
+        path = writer.submit(f"{stem}.avi", lambda: encode_mjpeg_avi(frames, fps))
+        self.saved[item.nodeid] = path
+        return path
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        yield
+        funcargs = getattr(item, 'funcargs', {})
+        driver = funcargs.get('driver') or funcargs.get('session_driver')
+        if driver is None:
+            return
+        try:
+            url = page_websocket_url(driver)
+            if url:
+                self.browser_cpu[item.nodeid] = (driver, sample_cpu(driver))
+                self.active[item.nodeid] = Screencast(url, self.seconds)
+        except Exception as e:
+            self.errors.append(f"{item.nodeid}: {e}")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        screencast = self.active.pop(item.nodeid, None)
+        driver, cpu_before = self.browser_cpu.pop(item.nodeid, (None, None))
+        if screencast is not None:
+            stats = screencast.stop()
+            cpu_after = sample_cpu(driver) if cpu_before is not None else None
+            # Processes started while recording count in full, exited ones are lost
+            stats['browser_cpu'] = None if cpu_after is None else sum(
+                cpu - cpu_before.get(pid, 0.0) for pid, cpu in cpu_after.items()
+            )
+            stats['saved'] = item.nodeid in self.saved
+            item.user_properties.append(("screencast", stats))
+        yield
+
+    def pytest_runtest_logreport(self, report):
+        self.stats.extend(teardown_properties(report, 'screencast'))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        for error in self.errors:
+            terminalreporter.write_line(f"Screencast not started for {error}")
+        if not self.stats:
+            return
+        cpu = sum(stats['cpu'] for stats in self.stats)
+        wall = sum(stats['wall'] for stats in self.stats)
+        frames = sum(stats['frames'] for stats in self.stats)
+        received = sum(stats['bytes'] for stats in self.stats) * 3 / 4
+        saved = sum(1 for stats in self.stats if stats['saved'])
+        terminalreporter.write_sep('=', 'screencast')
+        terminalreporter.write_line(
+            f"{len(self.stats)} tests recorded, {frames} frames ({received / 1024 ** 2:.1f} MiB) "
+            f"received, failure videos saved: {saved}"
+        )
+        terminalreporter.write_line(
+            f"receiver CPU {cpu:.2f}s over {wall:.1f}s of recording "
+            f"({100 * cpu / wall if wall else 0:.1f}% of one core)"
+        )
+        sampled = [stats for stats in self.stats if stats.get('browser_cpu') is not None]
+        if sampled:
+            browser_cpu = sum(stats['browser_cpu'] for stats in sampled)
+            browser_wall = sum(stats['wall'] for stats in sampled)
+            share = 100 * browser_cpu / browser_wall if browser_wall else 0
+            terminalreporter.write_line(
+                f"browser process tree CPU {browser_cpu:.2f}s over {browser_wall:.1f}s of "
+                f"recording ({share:.1f}% of one core, includes the tests' own page work; "
+                "compare with a run without --screencast)"
+            )
@@ -0,0 +1,245 @@
+"""
+Search index utility for E-commerce Test Suite
+Trigram inverted index answering the demo site's product search without
+scanning the catalogue
+
+Usage:
+    python -m utils.search_index --sizes 1000,10000,100000,1000000
+"""
+import argparse
+import random
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from utils.catalogue import Catalogue, page_response
+
+NGRAM = 3
+
+
+def normalize(term: str) -> str:
+    """
+    Normalize a search term the way searchProducts in demo-site/products.js does
+
+    Args:
+        term: Raw search term
+
+    Returns:
+        Trimmed, lower-cased term
+    """
+    return term.strip().lower()
+
+
+def ngrams(text: str, n: int = NGRAM) -> set:
+    """
+    Get the distinct n-grams of a string
+
+    Args:
+        text: Normalized text
+        n: Gram length
+
+    Returns:
+        Set of substrings of length n
+    """
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def index_grams(text: str) -> set:
+    """
+    Get every distinct substring of length 1 to NGRAM of a string
+
+    Args:
+        text: Normalized text
+
+    Returns:
+        Set of grams stored in the index for this text
+    """
+    return {text[i:i + n] for n in range(1, NGRAM + 1) for i in range(len(text) - n + 1)}
+
+
+class SearchIndex:
+    """
+    Trigram inverted index over product names
+
+    Every substring of up to three characters maps to the ascending positions
+    of the products containing it, so terms that short are answered by a
+    single posting list. Longer terms are looked up through their rarest
+    trigram and the candidates are confirmed with a substring check. Results
+    are exactly those of a case-insensitive includes() scan, in catalogue order.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        """
+        Build the index
+
+        Args:
+            names: Product names in catalogue order
+        """
+        self.names: List[str] = []
+        self.postings: Dict[str, array] = {}
+        for position, name in enumerate(names):
+            name = name.lower()
+            self.names.append(name)
+            for gram in index_grams(name):
+                postings = self.postings.get(gram)
+                if postings is None:
+                    postings = self.postings[gram] = array('I')
+                postings.append(position)
+
+    @classmethod
+    def from_catalogue(cls, catalogue: Catalogue) -> 'SearchIndex':
+        """
+        Build the index of every product of a catalogue
+
+        Args:
+            catalogue: Catalogue to index
+
+        Returns:
+            SearchIndex instance
+        """
+        return cls(product['name'] for product in catalogue.iter_products())
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, term: str) -> List[int]:
+        """
+        Find the products whose name contains the term, case-insensitively
+
+        Args:
+            term: Search term
+
+        Returns:
+            Ascending catalogue positions of the matching products
+        """
+        term = normalize(term)
+        if not term:
+            return list(range(len(self.names)))
+        if len(term) <= NGRAM:
+            return list(self.postings.get(term, ()))
+
+        rarest: Optional[array] = None
+        for gram in ngrams(term):
+            postings = self.postings.get(gram)
+            if postings is None:
+                return []
+            if rarest is None or len(postings) < len(rarest):
+                rarest = postings
+        names = self.names
+        return [position for position in rarest or () if term in names[position]]
+
+    def scan(self, term: str) -> List[int]:
+        """
+        Find matches without the index, as products.js filters its list
+
+        Args:
+            term: Search term
+
+        Returns:
+            Ascending catalogue positions of the matching products
+        """
+        term = normalize(term)
+        return [position for position, name in enumerate(self.names) if term in name]
+
+    def page(self, catalogue: Catalogue, page: int, per_page: int, term: str = '') -> Dict:
+        """
+        Get one page of search results
+
+        Args:
+            catalogue: Catalogue the index was built from
+            page: 1-based page number
+            per_page: Products per page
+            term: Search term, empty for the whole catalogue
+
+        Returns:
+            Dictionary with products, page, per_page, total and pages
+        """
+        if not normalize(term):
+            return catalogue.page(page, per_page)
+        matches = self.search(term)
+        first = (page - 1) * per_page
+        items = (catalogue.product(position) for position in matches[first:first + per_page])
+        return page_response(items, page, per_page, len(matches))
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def benchmark(size: int, seed: int = 0, queries: int = 200) -> Dict:
+    """
+    Measure index build time and query latency against a linear scan
+
+    Args:
+        size: Catalogue size
+        seed: Catalogue seed
+        queries: Number of search terms, drawn from product names
+
+    Returns:
+        Dictionary of timings in milliseconds
+    """
+    catalogue = Catalogue(size, seed)
+    started = time.perf_counter()
+    index = SearchIndex.from_catalogue(catalogue)
+    build = time.perf_counter() - started
+
+    # Substrings of random product names, from 1 character to whole words,
+    # plus a miss, mirroring what the search tests type
+    rng = random.Random(seed)
+    terms = ['laptop', 'MacBook', 'nonexistentproductxyz123']
+    while len(terms) < queries:
+        name = index.names[rng.randrange(len(index))]
+        start = rng.randrange(len(name))
+        terms.append(name[start:start + rng.randint(1, 8)].upper())
+
+    indexed, scanned = [], []
+    for term in terms:
+        started = time.perf_counter()
+        result = index.search(term)
+        indexed.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        expected = index.scan(term)
+        scanned.append(time.perf_counter() - started)
+        if result != expected:
+            raise AssertionError(f"Index and scan disagree for '{term}'")
+    return {
+        'size': size,
+        'build_ms': build * 1000,
+        'index_p50_ms': _percentile(indexed, 0.5) * 1000,
+        'index_p95_ms': _percentile(indexed, 0.95) * 1000,
+        'scan_p50_ms': _percentile(scanned, 0.5) * 1000,
+        'scan_p95_ms': _percentile(scanned, 0.95) * 1000,
+    }
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point: sweep catalogue sizes and print latencies
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the product search index')
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help='Comma separated catalogue sizes')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(f"{'size':>9} {'build ms':>10} {'index p50':>10} {'index p95':>10} "
+          f"{'scan p50':>10} {'scan p95':>10}")
+    for size in (int(s) for s in args.sizes.split(',') if s.strip()):
+        result = benchmark(size, args.seed, args.queries)
+        print(f"{result['size']:>9} {result['build_ms']:>10.1f} "
+              f"{result['index_p50_ms']:>10.3f} {result['index_p95_ms']:>10.3f} "
+              f"{result['scan_p50_ms']:>10.3f} {result['scan_p95_ms']:>10.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""
+Sharding utility for E-commerce Test Suite
+Splits the suite into duration-balanced shards and merges per-shard results
+
+Usage:
+    pytest --shard 1/3 --store-durations --junitxml=shard-1/junit.xml
+    python -m utils.sharding merge --out merged shard-1 shard-2 shard-3
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import xml.etree.ElementTree as ET
+from html import escape
+from typing import Dict, Iterable, List, Tuple
+
+DEFAULT_DURATIONS_PATH = '.test_durations.json'
+DEFAULT_TEST_DURATION = 1.0
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse a shard spec such as "2/4"
+
+    Args:
+        value: Shard spec, 1-based index followed by the number of shards
+
+    Returns:
+        Tuple of (index, count) with 1 <= index <= count
+    """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N (e.g. 1/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}', index must be between 1 and {count}")
+    return index, count
+
+
+def load_durations(path: str) -> Dict[str, float]:
+    """
+    Load recorded test durations
+
+    Args:
+        path: Path of the durations JSON file
+
+    Returns:
+        Mapping of test node id to duration in seconds (empty if missing)
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_durations(path: str, durations: Dict[str, float]):
+    """
+    Merge new durations into the durations file
+
+    Args:
+        path: Path of the durations JSON file
+        durations: Mapping of test node id to duration in seconds
+    """
+    merged = load_durations(path)
+    merged.update(durations)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(merged.items())), f, indent=2)
+
+
+def partition(nodeids: Iterable[str], durations: Dict[str, float], count: int) -> List[List[str]]:
+    """
+    Split tests into shards with balanced total duration
+
+    Uses longest-processing-time-first: tests are sorted by duration (ties by
+    node id) and each goes to the currently lightest shard (ties by shard
+    index), so the result is deterministic for a given durations file.
+    Tests without history are assumed to take the average recorded duration.
+
+    Args:
+        nodeids: Test node ids to distribute
+        durations: Recorded durations
+        count: Number of shards
+
+    Returns:
+        List of node id lists, one per shard
+    """
+    nodeids = sorted(set(nodeids))
+    known = [durations[n] for n in nodeids if n in durations]
+    default = sum(known) / len(known) if known else DEFAULT_TEST_DURATION
+
+    weighted = sorted(((durations.get(n, default), n) for n in nodeids),
+                      key=lambda t: (-t[0], t[1]))
+    loads = [0.0] * count
+    shards: List[List[str]] = [[] for _ in range(count)]
+    for duration, nodeid in weighted:
+        target = min(range(count), key=lambda i: (loads[i], i))
+        loads[target] += duration
+        shards[target].append(nodeid)
+    return shards
+
+
+class DurationRecorder:
+    """
+    pytest plugin recording per-test durations into the durations file
+    Registered on the controller only, where reports from every worker arrive
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize DurationRecorder
+
+        Args:
+            path: Path of the durations JSON file
+        """
+        self.path = path
+        self.durations: Dict[str, float] = {}
+
+    def pytest_runtest_logreport(self, report):
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0.0) + report.duration
+
+    def pytest_sessionfinish(self, session):
+        if self.durations:
+            save_durations(self.path, {k: round(v, 3) for k, v in self.durations.items()})
+
+
+def merge_junit(paths: List[str], output: str) -> ET.Element:
+    """
+    Merge several JUnit XML files into a single <testsuites> document
+
+    Args:
+        paths: JUnit XML files to merge
+        output: Path of the merged file
+
+    Returns:
+        Root element of the merged document
+    """
+    root = ET.Element('testsuites')
+    totals = {'tests': 0, 'failures': 0, 'errors': 0, 'skipped': 0}
+    time_total = 0.0
+    for path in paths:
+        tree = ET.parse(path)
+        suites = tree.getroot()
+        suites = [suites] if suites.tag == 'testsuite' else list(suites)
+        for suite in suites:
+            for key in totals:
+                totals[key] += int(suite.get(key, 0))
+            time_total += float(suite.get('time', 0))
+            root.append(suite)
+    for key, value in totals.items():
+        root.set(key, str(value))
+    root.set('time', f"{time_total:.3f}")
+    ET.ElementTree(root).write(output, encoding='utf-8', xml_declaration=True)
+    return root
+
+
+def write_html_summary(root: ET.Element, shard_reports: List[str], output: str):
+    """
+    Write an HTML summary of the merged JUnit results
+
+    Args:
+        root: Merged <testsuites> element
+        shard_reports: Relative links to the per-shard pytest-html reports
+        output: Path of the HTML file
+    """
+    rows = []
+    for case in root.iter('testcase'):
+        outcome = 'passed'
+        for tag in ('failure', 'error', 'skipped'):
+            if case.find(tag) is not None:
+                outcome = 'failed' if tag == 'failure' else tag
+        name = f"{case.get('classname', '')}::{case.get('name', '')}"
+        rows.append(
+            f"<tr class='{outcome}'><td>{escape(name)}</td><td>{outcome}</td>"
+            f"<td>{float(case.get('time', 0)):.2f}s</td></tr>"
+        )
+    links = ''.join(f"<li><a href='{escape(r)}'>{escape(r)}</a></li>" for r in shard_reports)
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Merged test report</title>"
+            "<style>.failed,.error{color:#c00}.skipped{color:#888}</style></head><body>"
+            f"<h1>Merged test report</h1><p>{root.get('tests')} tests, "
+            f"{root.get('failures')} failures, {root.get('errors')} errors, "
+            f"{root.get('skipped')} skipped, {root.get('time')}s</p>"
+            f"<h2>Shard reports</h2><ul>{links}</ul>"
+            "<table><tr><th>Test</th><th>Outcome</th><th>Time</th></tr>"
+            f"{''.join(rows)}</table></body></html>"
+        )
+
+
+def merge_shards(shard_dirs: List[str], output_dir: str,
+                 durations_path: str = DEFAULT_DURATIONS_PATH):
+    """
+    Merge per-shard JUnit, HTML, Allure and timing outputs
+
+    Each shard directory may contain junit.xml, report.html, allure-results/
+    and a durations file named like durations_path.
+
+    Args:
+        shard_dirs: Directories with the outputs of each shard
+        output_dir: Directory receiving the merged outputs
+        durations_path: File name of the per-shard durations files
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    junit_files, shard_reports, durations = [], [], {}
+    durations_name = os.path.basename(durations_path)
+
+    for index, shard_dir in enumerate(shard_dirs, start=1):
+        junit = os.path.join(shard_dir, 'junit.xml')
+        if os.path.exists(junit):
+            junit_files.append(junit)
+
+        html = os.path.join(shard_dir, 'report.html')
+        if os.path.exists(html):
+            name = f"shard-{index}.html"
+            shutil.copyfile(html, os.path.join(output_dir, name))
+            shard_reports.append(name)
+
+        allure = os.path.join(shard_dir, 'allure-results')
+        if os.path.isdir(allure):
+            # Allure result files have unique uuid names, so copying merges them
+            shutil.copytree(allure, os.path.join(output_dir, 'allure-results'), dirs_exist_ok=True)
+
+        durations.update(load_durations(os.path.join(shard_dir, durations_name)))
+
+    if durations:
+        save_durations(os.path.join(output_dir, durations_name), durations)
+    if junit_files:
+        root = merge_junit(junit_files, os.path.join(output_dir, 'junit.xml'))
+        write_html_summary(root, shard_reports, os.path.join(output_dir, 'report.html'))
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    merge = commands.add_parser('merge', help='Merge per-shard outputs into one report')
+    merge.add_argument('shards', nargs='+', help='Per-shard output directories')
+    merge.add_argument('--out', default='merged-report', help='Output directory')
+    merge.add_argument('--durations-path', default=DEFAULT_DURATIONS_PATH)
+
+    plan = commands.add_parser('plan', help='Show the shard sizes for a durations file')
+    plan.add_argument('count', type=int)
+    plan.add_argument('--durations-path', default=DEFAULT_DURATIONS_PATH)
+
+    args = parser.parse_args(argv)
+    if args.command == 'merge':
+        merge_shards(args.shards, args.out, args.durations_path)
+        print(f"Merged {len(args.shards)} shard(s) into {args.out}")
+    else:
+        durations = load_durations(args.durations_path)
+        for index, shard in enumerate(partition(durations, durations, args.count), start=1):
+            total = sum(durations[n] for n in shard)
+            print(f"shard {index}/{args.count}: {len(shard)} tests, {total:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Staged execution utility for E-commerce Test Suite
+Runs smoke tests before regression tests and aborts or shrinks the
+regression stage when too many smoke tests fail
+"""
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+import pytest
+
+from utils.browser_pool import run_id
+
+SMOKE = 'smoke'
+REGRESSION = 'regression'
+ABORT = 'abort'
+SHRINK = 'shrink'
+
+
+def stage_of(keywords) -> str:
+    """
+    Get the stage a test belongs to
+
+    Args:
+        keywords: Item or report keywords
+
+    Returns:
+        "smoke" for smoke tests, "regression" for everything else
+    """
+    return SMOKE if SMOKE in keywords else REGRESSION
+
+
+def _stage_dir() -> str:
+    return os.path.join(tempfile.gettempdir(), f"ecommerce-stages-{run_id()}")
+
+
+class StagedExecution:
+    """
+    pytest plugin implementing smoke-first staged execution
+
+    Smoke tests are moved to the front of the run. Every process appends smoke
+    outcomes to a file shared by all xdist workers; before the first regression
+    test, a worker waits until all smoke tests have finished and decides
+    whether the regression stage runs in full, shrinks or is aborted. A worker
+    whose controller has died stops waiting and exits.
+    """
+
+    def __init__(self, threshold: float, mode: str = ABORT, timeout: float = 600,
+                 poll: float = 0.2):
+        """
+        Initialize StagedExecution
+
+        Args:
+            threshold: Maximum tolerated smoke failure rate (0.0 - 1.0)
+            mode: "abort" skips the regression stage, "shrink" keeps one test per class
+            timeout: Seconds to wait for the smoke stage of other workers
+            poll: Seconds between checks of the smoke results file
+        """
+        self.threshold = threshold
+        self.mode = mode
+        self.timeout = timeout
+        self.poll = poll
+        self.results_path = os.path.join(_stage_dir(), 'smoke.log')
+        self.smoke_total = 0
+        self.canaries: Set[str] = set()
+        self.decision: Optional[str] = None
+        self.failure_rate = 0.0
+        self.failed_smoke: Set[str] = set()
+        self.timings: Dict[str, Dict] = OrderedDict()
+        # xdist workers are child processes of the controller
+        self.controller_pid = os.getppid() if 'PYTEST_XDIST_WORKER' in os.environ else None
+
+    # Collection
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, items):
+        # Stable sort keeps the original order within each stage
+        items.sort(key=lambda item: stage_of(item.keywords) != SMOKE)
+
+    def pytest_collection_finish(self, session):
+        os.makedirs(_stage_dir(), exist_ok=True)
+        self.smoke_total = sum(1 for item in session.items if stage_of(item.keywords) == SMOKE)
+
+        # Shrunk regression stage keeps the first test of each class
+        seen = set()
+        for item in session.items:
+            parent = item.nodeid.rsplit('::', 1)[0]
+            if stage_of(item.keywords) == REGRESSION and parent not in seen:
+                seen.add(parent)
+                self.canaries.add(item.nodeid)
+
+    # Execution
+
+    def _smoke_results(self) -> dict:
+        results = {}
+        if os.path.exists(self.results_path):
+            with open(self.results_path, encoding='utf-8') as f:
+                for line in f:
+                    nodeid, _, outcome = line.rstrip('\n').rpartition('\t')
+                    results[nodeid] = outcome
+        return results
+
+    def _decide(self) -> str:
+        deadline = time.monotonic() + self.timeout
+        results = self._smoke_results()
+        while len(results) < self.smoke_total and time.monotonic() < deadline:
+            if self.controller_pid is not None and os.getppid() != self.controller_pid:
+                # Orphaned: the smoke results of the other workers will never arrive
+                pytest.exit(
+                    f"pytest controller {self.controller_pid} exited during the smoke stage",
+                    returncode=pytest.ExitCode.INTERRUPTED,
+                )
+            time.sleep(self.poll)
+            results = self._smoke_results()
+
+        failures = sum(1 for outcome in results.values() if outcome == 'failed')
+        self.failure_rate = failures / len(results) if results else 0.0
+        return self.mode if self.failure_rate > self.threshold else 'run'
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        if stage_of(item.keywords) != REGRESSION or not self.smoke_total:
+            return
+        if self.decision is None:
+            self.decision = self._decide()
+        shrunk = self.decision == SHRINK and item.nodeid not in self.canaries
+        if self.decision == ABORT or shrunk:
+            pytest.skip(
+                f"Regression stage {'aborted' if self.decision == ABORT else 'shrunk'}: "
+                f"smoke failure rate {self.failure_rate:.0%} exceeds {self.threshold:.0%}"
+            )
+
+    def pytest_runtest_logreport(self, report):
+        stage = stage_of(report.keywords)
+        timing = self.timings.setdefault(
+            stage, {'tests': set(), 'failed': set(), 'duration': 0.0, 'start': None, 'stop': None}
+        )
+        timing['tests'].add(report.nodeid)
+        timing['duration'] += report.duration
+        if report.failed:
+            timing['failed'].add(report.nodeid)
+        if timing['start'] is None:
+            timing['start'], timing['stop'] = report.start, report.stop
+        else:
+            timing['start'] = min(timing['start'], report.start)
+            timing['stop'] = max(timing['stop'], report.stop)
+
+        if stage != SMOKE:
+            return
+        if report.failed:
+            self.failed_smoke.add(report.nodeid)
+        # Only the process that ran the test publishes its outcome
+        if report.when == 'teardown' and not hasattr(report, 'node'):
+            outcome = 'failed' if report.nodeid in self.failed_smoke else 'passed'
+            with open(self.results_path, 'a', encoding='utf-8') as f:
+                f.write(f"{report.nodeid}\t{outcome}\n")
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.timings:
+            return
+        terminalreporter.write_sep('=', 'stages')
+        for stage, timing in self.timings.items():
+            wall = timing['stop'] - timing['start']
+            terminalreporter.write_line(
+                f"{stage}: {len(timing['tests'])} tests, {len(timing['failed'])} failed, "
+                f"test time {timing['duration']:.2f}s, wall time {wall:.2f}s"
+            )
+
+    def pytest_unconfigure(self, config):
+        if not hasattr(config, 'workerinput'):
+            shutil.rmtree(_stage_dir(), ignore_errors=True)
@@ -0,0 +1,60 @@
+"""
+State guard utility for E-commerce Test Suite
+Detects browser state mutations by tests that share a driver
+"""
+from typing import Dict, List
+
+_SNAPSHOT_SCRIPT = """
+function dump(storage) {
+    var data = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        data[key] = storage.getItem(key);
+    }
+    return data;
+}
+return {
+    localStorage: dump(window.localStorage),
+    sessionStorage: dump(window.sessionStorage),
+    cookies: document.cookie
+};
+"""
+
+
+def snapshot_state(driver) -> Dict:
+    """
+    Capture the site's client-side state in a single script call
+
+    Args:
+        driver: WebDriver instance
+
+    Returns:
+        Dictionary with localStorage, sessionStorage and cookies
+    """
+    return driver.execute_script(_SNAPSHOT_SCRIPT)
+
+
+def diff_state(before: Dict, after: Dict) -> List[str]:
+    """
+    Describe the differences between two state snapshots
+
+    Args:
+        before: Snapshot taken before the test
+        after: Snapshot taken after the test
+
+    Returns:
+        List of human readable changes, empty if the state is unchanged
+    """
+    changes = []
+    for area in ('localStorage', 'sessionStorage'):
+        old, new = before.get(area) or {}, after.get(area) or {}
+        for key in sorted(set(old) | set(new)):
+            if key not in old:
+                changes.append(f"{area}['{key}'] added")
+            elif key not in new:
+                changes.append(f"{area}['{key}'] removed")
+            elif old[key] != new[key]:
+                changes.append(f"{area}['{key}'] changed")
+    if before.get('cookies') != after.get('cookies'):
+        changes.append('cookies changed')
+    return changes
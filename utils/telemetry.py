@@ -0,0 +1,446 @@
+"""
+Live run telemetry for E-commerce Test Suite
+xdist workers stream test, driver pool and wait timeout events over a local
+socket to the controller, which serves live progress as JSON and as
+Prometheus metrics
+
+Usage:
+    pytest -n 8 --telemetry-port 9464
+    curl http://127.0.0.1:9464/          # throughput, ETA, slowest in-flight tests
+    curl http://127.0.0.1:9464/metrics   # Prometheus exposition format
+"""
+import json
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from utils.browser_pool import worker_id
+
+DURATION_BUCKETS = (1, 2.5, 5, 10, 30, 60, 120, 300)
+RATE_WINDOW = 60
+
+
+class RunState:
+    """
+    Aggregate of the events of every worker, safe to read while it is updated
+    """
+
+    def __init__(self):
+        """
+        Initialize RunState
+        """
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.collected = 0
+        self.outcomes = Counter()
+        self.duration_sum = 0.0
+        self.duration_buckets = Counter()
+        self.recent = deque()
+        self.in_flight: Dict[str, tuple] = {}
+        self.workers: Dict[str, Dict] = {}
+        self.pools: Dict[tuple, Dict] = {}
+        self.wait_timeouts = 0
+        self.last_timeouts = deque(maxlen=10)
+
+    def handle(self, event: Dict):
+        """
+        Apply one event
+
+        Args:
+            event: Dictionary with "type" (start, end, pool or timeout), "worker" and "ts"
+        """
+        worker = event['worker']
+        with self.lock:
+            state = self.workers.setdefault(worker, {'current': None, 'completed': 0})
+            kind = event['type']
+            if kind == 'start':
+                self.in_flight[event['nodeid']] = (worker, event['ts'])
+                state['current'] = event['nodeid']
+            elif kind == 'end':
+                self.in_flight.pop(event['nodeid'], None)
+                state['current'] = None
+                state['completed'] += 1
+                self.outcomes[event['outcome']] += 1
+                self.duration_sum += event['duration']
+                for bucket in DURATION_BUCKETS:
+                    if event['duration'] <= bucket:
+                        self.duration_buckets[bucket] += 1
+                self.recent.append(event['ts'])
+            elif kind == 'pool':
+                for stats in event['pools']:
+                    self.pools[(worker, stats['browser'])] = stats
+            elif kind == 'timeout':
+                self.wait_timeouts += 1
+                self.last_timeouts.append(
+                    {key: event.get(key) for key in ('nodeid', 'worker', 'ts', 'timeout')}
+                )
+
+    def status(self, top: int = 10) -> Dict:
+        """
+        Live progress summary
+
+        Args:
+            top: Number of slowest in-flight tests listed
+
+        Returns:
+            Dictionary of counts, throughput, ETA, in-flight tests, workers and pools
+        """
+        now = time.time()
+        with self.lock:
+            while self.recent and self.recent[0] < now - RATE_WINDOW:
+                self.recent.popleft()
+            completed = sum(self.outcomes.values())
+            elapsed = now - self.started
+            # Prefer the rate of the last minute, the whole run's rate until it has enough samples
+            window = min(RATE_WINDOW, elapsed)
+            if len(self.recent) >= 5:
+                rate = len(self.recent) / window
+            else:
+                rate = completed / max(elapsed, 1e-9)
+            remaining = max(self.collected - completed, 0)
+            in_flight = sorted(
+                ({'nodeid': nodeid, 'worker': worker, 'running_s': round(now - started, 1)}
+                 for nodeid, (worker, started) in self.in_flight.items()),
+                key=lambda test: -test['running_s'],
+            )
+            return {
+                'elapsed_s': round(elapsed, 1),
+                'collected': self.collected,
+                'completed': completed,
+                'outcomes': dict(self.outcomes),
+                'tests_per_minute': round(rate * 60, 2),
+                'eta_s': round(remaining / rate, 1) if rate > 0 else None,
+                'in_flight': in_flight[:top],
+                'workers': {worker: dict(state) for worker, state in sorted(self.workers.items())},
+                'pools': [dict(stats, worker=worker)
+                          for (worker, _), stats in sorted(self.pools.items())],
+                'wait_timeouts': self.wait_timeouts,
+                'last_wait_timeouts': list(self.last_timeouts),
+            }
+
+    def metrics(self) -> str:
+        """
+        Render the state in the Prometheus text exposition format
+
+        Returns:
+            Metrics page
+        """
+        status = self.status()
+        with self.lock:
+            count = sum(self.outcomes.values())
+            lines = [
+                '# HELP suite_tests_collected Tests selected for this run.',
+                '# TYPE suite_tests_collected gauge',
+                f"suite_tests_collected {status['collected']}",
+                '# HELP suite_tests_completed_total Finished tests by outcome.',
+                '# TYPE suite_tests_completed_total counter',
+            ]
+            lines += [f'suite_tests_completed_total{{outcome="{outcome}"}} {value}'
+                      for outcome, value in sorted(self.outcomes.items())]
+            lines += [
+                '# HELP suite_tests_in_flight Tests currently running.',
+                '# TYPE suite_tests_in_flight gauge',
+                f"suite_tests_in_flight {len(self.in_flight)}",
+                '# HELP suite_test_duration_seconds Test duration (setup, call and teardown).',
+                '# TYPE suite_test_duration_seconds histogram',
+            ]
+            lines += [f'suite_test_duration_seconds_bucket{{le="{bucket}"}} '
+                      f'{self.duration_buckets[bucket]}'
+                      for bucket in DURATION_BUCKETS]
+            lines += [
+                f'suite_test_duration_seconds_bucket{{le="+Inf"}} {count}',
+                f"suite_test_duration_seconds_sum {self.duration_sum:.3f}",
+                f"suite_test_duration_seconds_count {count}",
+                '# HELP suite_tests_per_minute Recent test throughput.',
+                '# TYPE suite_tests_per_minute gauge',
+                f"suite_tests_per_minute {status['tests_per_minute']}",
+                '# HELP suite_eta_seconds Estimated time until the run completes.',
+                '# TYPE suite_eta_seconds gauge',
+                f"suite_eta_seconds {status['eta_s'] if status['eta_s'] is not None else 'NaN'}",
+                '# HELP suite_wait_timeouts_total Explicit waits that timed out.',
+                '# TYPE suite_wait_timeouts_total counter',
+                f"suite_wait_timeouts_total {self.wait_timeouts}",
+            ]
+            for key in ('created', 'reused', 'idle', 'in_use'):
+                lines.append(f'# TYPE suite_driver_pool_{key} gauge')
+                lines += [f'suite_driver_pool_{key}{{worker="{worker}",browser="{browser}"}} '
+                          f'{stats[key]}'
+                          for (worker, browser), stats in sorted(self.pools.items())]
+        return '\n'.join(lines) + '\n'
+
+
+class _EventServer(socketserver.ThreadingTCPServer):
+    """
+    ThreadingTCPServer applying the workers' events to the run state
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, state: RunState):
+        super().__init__(address, _EventHandler)
+        self.state = state
+
+
+class _StatusServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer serving the run state
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, state: RunState):
+        super().__init__(address, _StatusHandler)
+        self.state = state
+
+
+class _EventHandler(socketserver.StreamRequestHandler):
+
+    server: _EventServer
+
+    def handle(self):
+        for line in self.rfile:
+            if line.strip():
+                self.server.state.handle(json.loads(line))
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+
+    server: _StatusServer
+
+    def do_GET(self):
+        state = self.server.state
+        if self.path in ('/', '/status'):
+            body = json.dumps(state.status(), indent=2).encode('utf-8')
+            content_type = 'application/json'
+        elif self.path == '/metrics':
+            body = state.metrics().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TelemetryServer:
+    """
+    Controller side: event socket for the workers and the HTTP status endpoint
+    """
+
+    def __init__(self, state: RunState, host: str = '127.0.0.1', http_port: int = 0):
+        """
+        Initialize TelemetryServer
+
+        Args:
+            state: State the events are applied to
+            host: Interface both servers listen on
+            http_port: Port of the HTTP endpoint, 0 for a free port
+        """
+        self.host = host
+        self.events = _EventServer((host, 0), state)
+        self.http = _StatusServer((host, http_port), state)
+        self.threads: List[threading.Thread] = []
+
+    @property
+    def events_address(self) -> str:
+        return f"{self.host}:{self.events.server_address[1]}"
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.http.server_address[1]}"
+
+    def start(self) -> 'TelemetryServer':
+        """
+        Serve both sockets from daemon threads
+
+        Returns:
+            self
+        """
+        for server in (self.events, self.http):
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        """
+        Stop both servers
+        """
+        for server in (self.events, self.http):
+            server.shutdown()
+            server.server_close()
+
+
+class TelemetryClient:
+    """
+    Worker side: sends events from a background thread so tests never wait on the socket
+    """
+
+    def __init__(self, address: str):
+        """
+        Initialize TelemetryClient
+
+        Args:
+            address: "host:port" of the controller's event socket
+        """
+        host, _, port = address.rpartition(':')
+        self.address = (host, int(port))
+        self.events: queue.Queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name='telemetry-client', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            connection = socket.create_connection(self.address, timeout=10)
+        except OSError:
+            return
+        with connection:
+            while True:
+                event = self.events.get()
+                if event is None:
+                    return
+                try:
+                    connection.sendall((json.dumps(event) + '\n').encode('utf-8'))
+                except OSError:
+                    # The controller went away, telemetry is best effort
+                    return
+
+    def send(self, event: Dict):
+        """
+        Queue an event
+
+        Args:
+            event: JSON-serializable event
+        """
+        self.events.put(event)
+
+    def close(self):
+        """
+        Send the queued events and disconnect
+        """
+        self.events.put(None)
+        self.thread.join(timeout=5)
+
+
+class TelemetryPlugin:
+    """
+    pytest plugin producing telemetry events and, on the controller, serving them
+
+    Without xdist the single process applies its events directly. With xdist
+    the controller passes its event socket to the workers, which stream their
+    events to it; the controller then ignores its own copies of the reports.
+    """
+
+    def __init__(self, config, http_port: int = 0):
+        """
+        Initialize TelemetryPlugin
+
+        Args:
+            config: pytest config
+            http_port: Port of the HTTP endpoint on the controller, 0 for a free port
+        """
+        self.worker = worker_id()
+        self.server = None
+        self.client = None
+        self.distributed = False
+        self.current = None
+        self.phases: Dict[str, List] = {}
+        workerinput = getattr(config, 'workerinput', None)
+        if workerinput is None:
+            self.state = RunState()
+            self.server = TelemetryServer(self.state, http_port=http_port).start()
+            self.emit = self.state.handle
+        else:
+            address = workerinput.get('telemetry')
+            self.client = TelemetryClient(address) if address else None
+            self.emit = self.client.send if self.client else (lambda event: None)
+        # Imported here, selenium.webdriver is only loaded at conftest import when telemetry is on
+        from selenium.webdriver.support.wait import WebDriverWait
+        self.wait_class = WebDriverWait
+        self._until = WebDriverWait.until
+
+    def _event(self, kind: str, **fields):
+        if not self.distributed:
+            self.emit(dict(fields, type=kind, worker=self.worker, ts=time.time()))
+
+    def pool_stats(self, pools: List[Dict]):
+        """
+        Report driver pool counters
+
+        Args:
+            pools: BrowserPool.stats() of each pool of this worker
+        """
+        self._event('pool', pools=pools)
+
+    def pytest_configure(self, config):
+        plugin = self
+        original = self._until
+
+        def until(wait, method, message=''):
+            try:
+                return original(wait, method, message)
+            except TimeoutException:
+                plugin._event('timeout', nodeid=plugin.current,
+                              timeout=getattr(wait, '_timeout', None))
+                raise
+
+        self.wait_class.until = until
+
+    def pytest_unconfigure(self, config):
+        self.wait_class.until = self._until
+        if self.client:
+            self.client.close()
+        if self.server:
+            self.server.stop()
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        self.distributed = True
+        node.workerinput['telemetry'] = self.server.events_address
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_node_collection_finished(self, node, ids):
+        with self.state.lock:
+            self.state.collected = max(self.state.collected, len(ids))
+
+    def pytest_collection_finish(self, session):
+        if self.server and not self.distributed:
+            self.state.collected = len(session.items)
+
+    def pytest_report_header(self, config):
+        if self.server:
+            return f"telemetry: {self.server.url} (Prometheus metrics at {self.server.url}/metrics)"
+        return None
+
+    def pytest_runtest_logstart(self, nodeid):
+        self.current = nodeid
+        self._event('start', nodeid=nodeid)
+
+    def pytest_runtest_logreport(self, report):
+        phases = self.phases.setdefault(report.nodeid, [])
+        phases.append(report)
+        if report.when != 'teardown':
+            return
+        del self.phases[report.nodeid]
+        if any(phase.failed for phase in phases):
+            outcome = 'failed'
+        elif any(phase.skipped for phase in phases):
+            outcome = 'skipped'
+        else:
+            outcome = 'passed'
+        self._event('end', nodeid=report.nodeid, outcome=outcome,
+                    duration=sum(phase.duration for phase in phases))
@@ -0,0 +1,272 @@
+"""
+Web Vitals collection for E-commerce Test Suite
+Collects Navigation Timing, Paint, LCP and CLS metrics of every page the page
+objects navigate to, attaches them to the test result and aggregates them
+per page in the terminal, HTML and Allure reports
+
+Usage:
+    pytest --web-vitals --html=report.html
+"""
+import json
+from typing import Dict, Iterable, List, Optional, Set
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from utils.browser_report import teardown_properties
+from utils.method_timing import percentile
+
+try:
+    import allure
+except ImportError:  # allure-pytest is optional
+    allure = None
+
+# Metrics in milliseconds since navigation start, CLS is unitless
+METRICS = ('ttfb', 'first_paint', 'fcp', 'lcp', 'dom_content_loaded', 'load', 'cls')
+
+# One async script: wait until the expected page has loaded, then read the
+# navigation and paint entries and the buffered LCP and layout-shift entries
+VITALS_SCRIPT = """
+var expected = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+var started = Date.now();
+
+function buffered(type) {
+    var types = window.PerformanceObserver && PerformanceObserver.supportedEntryTypes || [];
+    if (types.indexOf(type) < 0) return null;
+    var observer = new PerformanceObserver(function () {});
+    observer.observe({type: type, buffered: true});
+    var entries = observer.takeRecords();
+    observer.disconnect();
+    return entries;
+}
+
+function collect() {
+    var nav = performance.getEntriesByType('navigation')[0] || {};
+    var paints = {};
+    performance.getEntriesByType('paint').forEach(function (entry) {
+        paints[entry.name] = entry.startTime;
+    });
+    var lcp = buffered('largest-contentful-paint');
+    var shifts = buffered('layout-shift');
+    var cls = null;
+    if (shifts) {
+        cls = 0;
+        shifts.forEach(function (entry) { if (!entry.hadRecentInput) cls += entry.value; });
+    }
+    done({
+        page: location.pathname.split('/').pop() || 'index.html',
+        url: location.href,
+        origin: performance.timeOrigin,
+        ttfb: nav.responseStart || null,
+        first_paint: paints['first-paint'] || null,
+        fcp: paints['first-contentful-paint'] || null,
+        lcp: lcp && lcp.length ? lcp[lcp.length - 1].startTime : null,
+        dom_content_loaded: nav.domContentLoadedEventEnd || null,
+        load: nav.loadEventEnd || null,
+        cls: cls,
+        transfer_size: nav.transferSize || null
+    });
+}
+
+(function poll() {
+    var nav = performance.getEntriesByType('navigation')[0];
+    var onPage = !expected || location.pathname.slice(-expected.length) === expected;
+    if ((onPage && document.readyState === 'complete' && (!nav || nav.loadEventEnd > 0))
+            || Date.now() - started > timeout) {
+        collect();
+    } else {
+        setTimeout(poll, 25);
+    }
+})();
+"""
+
+# Set by the WebVitalsCollector plugin, None when collection is off
+_collector = None
+
+
+def collect_web_vitals(driver, expected_page: Optional[str] = None,
+                       timeout: float = 3.0) -> Optional[Dict]:
+    """
+    Collect the metrics of the current page in one script call
+
+    Args:
+        driver: WebDriver instance
+        expected_page: Page file name to wait for (e.g. "cart.html") after a navigating click
+        timeout: Seconds to wait for the page to finish loading
+
+    Returns:
+        Dictionary of page, url, origin and METRICS, or None if the page went away meanwhile
+    """
+    try:
+        return driver.execute_async_script(VITALS_SCRIPT, expected_page, int(timeout * 1000))
+    except WebDriverException:
+        return None
+
+
+def record_page_visit(driver, expected_page: Optional[str] = None):
+    """
+    Attach the current page's metrics to the running test when --web-vitals is on
+
+    Called by the page objects after they navigate. Each document is recorded
+    once per test, so repeated calls on the same page cost a script call only.
+
+    Args:
+        driver: WebDriver instance
+        expected_page: Page file name the navigation leads to, if known
+    """
+    collector = _collector
+    if collector is not None:
+        collector.record(driver, expected_page)
+
+
+def aggregate_web_vitals(visits: Iterable[Dict]) -> Dict[str, Dict[str, Dict]]:
+    """
+    Aggregate page visits per page
+
+    Args:
+        visits: Metrics dictionaries from collect_web_vitals()
+
+    Returns:
+        Dictionary of page -> metric -> {"n", "p50", "p95"}
+    """
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    for visit in visits:
+        page = samples.setdefault(visit['page'], {})
+        for metric in METRICS:
+            if visit.get(metric) is not None:
+                page.setdefault(metric, []).append(visit[metric])
+    return {
+        page: {
+            metric: {
+                'n': len(values),
+                'p50': percentile(values, 0.5),
+                'p95': percentile(values, 0.95),
+            }
+            for metric, values in metrics.items()
+        }
+        for page, metrics in sorted(samples.items())
+    }
+
+
+def _cell(stats: Optional[Dict], metric: str) -> str:
+    if stats is None:
+        return '-'
+    if metric == 'cls':
+        return f"{stats['p50']:.3f}/{stats['p95']:.3f}"
+    return f"{stats['p50']:.0f}/{stats['p95']:.0f}"
+
+
+def format_web_vitals(aggregate: Dict[str, Dict[str, Dict]]) -> List[str]:
+    """
+    Format per-page stats as text lines
+
+    Args:
+        aggregate: Result of aggregate_web_vitals()
+
+    Returns:
+        Table lines, p50/p95 per metric
+    """
+    widths = [max(len(metric), 11) for metric in METRICS]
+    header = ' '.join(f"{m:>{w}}" for m, w in zip(METRICS, widths))
+    lines = [f"{'page':<16} {'visits':>6} {header}"]
+    for page, metrics in aggregate.items():
+        visits = max(stats['n'] for stats in metrics.values())
+        cells = ' '.join(f"{_cell(metrics.get(m), m):>{w}}" for m, w in zip(METRICS, widths))
+        lines.append(f"{page:<16} {visits:>6} {cells}")
+    return lines
+
+
+def format_html_web_vitals(aggregate: Dict[str, Dict[str, Dict]]) -> List[str]:
+    """
+    Render per-page stats as HTML snippets for pytest-html
+
+    Args:
+        aggregate: Result of aggregate_web_vitals()
+
+    Returns:
+        List of HTML strings
+    """
+    if not aggregate:
+        return []
+    header = ''.join(f"<th>{metric}</th>" for metric in METRICS)
+    rows = ''.join(
+        f"<tr><td>{page}</td><td>{max(stats['n'] for stats in metrics.values())}</td>"
+        + ''.join(f"<td>{_cell(metrics.get(metric), metric)}</td>" for metric in METRICS)
+        + "</tr>"
+        for page, metrics in aggregate.items()
+    )
+    return [
+        "<h2>Web Vitals (p50/p95, ms)</h2>"
+        f"<table><tr><th>Page</th><th>Visits</th>{header}</tr>{rows}</table>"
+    ]
+
+
+class WebVitalsCollector:
+    """
+    pytest plugin collecting page metrics during tests and aggregating them
+
+    Metrics are attached to the test as "web_vitals" user properties, so they
+    reach the controller with the reports under xdist and are aggregated there.
+    """
+
+    def __init__(self, timeout: float = 3.0):
+        """
+        Initialize WebVitalsCollector
+
+        Args:
+            timeout: Seconds a page may take to finish loading before it is measured anyway
+        """
+        self.timeout = timeout
+        self.item = None
+        self.seen: Set[float] = set()
+        self.visits: List[Dict] = []
+
+    def record(self, driver, expected_page: Optional[str] = None):
+        """
+        Collect and attach the current page's metrics to the running test
+
+        Args:
+            driver: WebDriver instance
+            expected_page: Page file name the navigation leads to, if known
+        """
+        if self.item is None:
+            return
+        vitals = collect_web_vitals(driver, expected_page, self.timeout)
+        if not vitals or vitals['origin'] in self.seen:
+            return
+        self.seen.add(vitals['origin'])
+        self.item.user_properties.append(("web_vitals", vitals))
+        if allure is not None:
+            allure.attach(json.dumps(vitals, indent=2), name=f"web vitals {vitals['page']}",
+                          attachment_type=allure.attachment_type.JSON)
+
+    def pytest_configure(self, config):
+        global _collector
+        _collector = self
+
+    def pytest_unconfigure(self, config):
+        global _collector
+        if _collector is self:
+            _collector = None
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        self.item = item
+        self.seen = set()
+
+    def pytest_runtest_logfinish(self, nodeid):
+        self.item = None
+
+    def pytest_runtest_logreport(self, report):
+        self.visits.extend(teardown_properties(report, 'web_vitals'))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.visits:
+            return
+        terminalreporter.write_sep('=', 'web vitals (p50/p95, ms)')
+        for line in format_web_vitals(aggregate_web_vitals(self.visits)):
+            terminalreporter.write_line(line)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_html_results_summary(self, prefix, summary, postfix, session):
+        prefix.extend(format_html_web_vitals(aggregate_web_vitals(self.visits)))
@@ -0,0 +1,230 @@
+"""
+WebDriver command tracing for E-commerce Test Suite
+Attributes every WebDriver command and its duration to the calling
+page-object method and test, and writes a collapsed-stack (flamegraph)
+file and a Chrome trace-event JSON per test
+
+Usage:
+    pytest --trace-webdriver traces/
+    flamegraph.pl traces/session-master.folded > webdriver.svg
+    # or open traces/<test>.trace.json in chrome://tracing or ui.perfetto.dev
+"""
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from typing import Counter as CounterType, Dict, List, Tuple
+
+import pytest
+
+from utils.browser_pool import worker_id
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(PROJECT_ROOT, 'pages') + os.sep
+# Wrappers installed by utils.method_timing, not part of the caller's stack
+SKIPPED_FILES = (os.path.abspath(__file__), os.path.join(PROJECT_ROOT, 'utils', 'method_timing.py'))
+
+
+def trace_file_stem(nodeid: str) -> str:
+    """
+    File name stem for a test's trace files
+
+    Args:
+        nodeid: Test node id
+
+    Returns:
+        Node id with path separators and brackets replaced, at most 150 characters
+    """
+    return re.sub(r'[^\w.-]+', '_', nodeid).strip('_')[-150:]
+
+
+def _label(frame) -> str:
+    # Methods are labelled with their instance's class, e.g. "LoginPage.enter_email"
+    name = frame.f_code.co_name
+    owner = frame.f_locals.get('self')
+    return f"{type(owner).__name__}.{name}" if owner is not None else name
+
+
+class WebDriverTracer:
+    """
+    pytest plugin tracing the WebDriver commands of each test
+
+    attach() wraps a driver's execute(), which every WebDriver and WebElement
+    command goes through. For each command only the project's own frames are
+    kept from the call stack (tests, fixtures, page objects, utils), so a
+    command is attributed to e.g. test_login;LoginPage.login;LoginPage.enter_email.
+    Page-object method spans in the Chrome trace are derived from the
+    commands they issued, so tracing costs one stack walk per command and no
+    profiling hook.
+    """
+
+    def __init__(self, output_dir: str, top: int = 10):
+        """
+        Initialize WebDriverTracer
+
+        Args:
+            output_dir: Directory receiving the trace files
+            top: Number of page-object methods listed in the terminal summary
+        """
+        self.output_dir = output_dir
+        self.top = top
+        self.current = None
+        self.test_started = 0.0
+        self.events: List[Tuple] = []
+        self.session_folded: CounterType[str] = Counter()
+        self.totals: Dict[str, List] = {}
+        self.commands = 0
+        self.overhead = 0.0
+        os.makedirs(output_dir, exist_ok=True)
+
+    def attach(self, driver):
+        """
+        Trace a driver's commands, once per driver
+
+        Args:
+            driver: WebDriver instance
+
+        Returns:
+            The same driver
+        """
+        if getattr(driver, '_webdriver_tracer', None) is self:
+            return driver
+        execute = driver.execute
+        tracer = self
+
+        def traced_execute(driver_command, params=None):
+            started = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                tracer.record(driver_command, started, time.perf_counter(), sys._getframe(1))
+
+        driver.execute = traced_execute
+        driver._webdriver_tracer = self
+        return driver
+
+    def record(self, command: str, started: float, finished: float, frame):
+        """
+        Record one command with the project frames that issued it
+
+        Args:
+            command: WebDriver command name (e.g. "findElement")
+            started: perf_counter() before the command
+            finished: perf_counter() after the command
+            frame: Frame of the caller of execute()
+        """
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            filename = code.co_filename
+            if (filename.startswith(PROJECT_ROOT) and filename not in SKIPPED_FILES
+                    and 'site-packages' not in filename):
+                stack.append((_label(frame), id(frame), filename.startswith(PAGES_DIR)))
+            frame = frame.f_back
+        stack.reverse()
+
+        if self.current is not None:
+            self.events.append((started, finished - started, command, stack))
+        owner = next((label for label, _, is_page in reversed(stack) if is_page), None)
+        owner = owner or (stack[-1][0] if stack else '<unattributed>')
+        total = self.totals.setdefault(owner, [0, 0.0])
+        total[0] += 1
+        total[1] += finished - started
+        self.commands += 1
+        self.overhead += time.perf_counter() - finished
+
+    # Per-test lifecycle, logstart/logfinish also bracket in-session retries
+
+    def pytest_runtest_logstart(self, nodeid):
+        self.current = nodeid
+        self.test_started = time.perf_counter()
+        self.events = []
+
+    def pytest_runtest_logfinish(self, nodeid):
+        if self.current != nodeid:
+            return
+        finished = time.perf_counter()
+        events, self.events, self.current = self.events, [], None
+        if events:
+            self.write(nodeid, events, self.test_started, finished)
+
+    def write(self, nodeid: str, events: List[Tuple], test_started: float, test_finished: float):
+        """
+        Write the collapsed stacks and the Chrome trace of one test
+
+        Args:
+            nodeid: Test node id
+            events: Recorded (start, duration, command, stack) tuples
+            test_started: perf_counter() at the start of the test
+            test_finished: perf_counter() at the end of the test
+        """
+        folded: CounterType[str] = Counter()
+        for _, duration, command, stack in events:
+            labels = [nodeid] + [label for label, _, _ in stack] + [command]
+            folded[';'.join(labels)] += round(duration * 1e6)
+        self.session_folded.update(folded)
+        stem = os.path.join(self.output_dir, trace_file_stem(nodeid))
+        with open(stem + '.folded', 'w', encoding='utf-8') as f:
+            f.writelines(f"{stack} {value}\n" for stack, value in folded.items())
+
+        def us(seconds):
+            return round((seconds - test_started) * 1e6, 1)
+
+        pid, tid = os.getpid(), 1
+        trace = [{'name': nodeid, 'cat': 'test', 'ph': 'X', 'ts': 0, 'dur': us(test_finished),
+                  'pid': pid, 'tid': tid}]
+        # Spans of the project frames, from the first to the last command each frame issued
+        spans: Dict[Tuple, List] = {}
+        for started, duration, command, stack in events:
+            for depth, (label, frame_id, is_page) in enumerate(stack):
+                span = spans.setdefault((depth, frame_id, label),
+                                        [started, started + duration, is_page])
+                span[1] = started + duration
+            trace.append({'name': command, 'cat': 'webdriver', 'ph': 'X', 'ts': us(started),
+                          'dur': round(duration * 1e6, 1), 'pid': pid, 'tid': tid})
+        for (_, _, label), (started, finished, is_page) in spans.items():
+            trace.append({'name': label, 'cat': 'page-object' if is_page else 'suite', 'ph': 'X',
+                          'ts': us(started), 'dur': round((finished - started) * 1e6, 1),
+                          'pid': pid, 'tid': tid})
+        with open(stem + '.trace.json', 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+
+    # Session summary
+
+    def pytest_sessionfinish(self, session):
+        if self.session_folded:
+            path = os.path.join(self.output_dir, f"session-{worker_id()}.folded")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines(f"{stack} {value}\n"
+                             for stack, value in sorted(self.session_folded.items()))
+        workeroutput = getattr(session.config, 'workeroutput', None)
+        if workeroutput is not None:
+            workeroutput['webdriver_trace'] = {
+                'commands': self.commands, 'overhead': self.overhead, 'totals': self.totals,
+            }
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        trace = getattr(node, 'workeroutput', {}).get('webdriver_trace')
+        if not trace:
+            return
+        self.commands += trace['commands']
+        self.overhead += trace['overhead']
+        for owner, (count, seconds) in trace['totals'].items():
+            total = self.totals.setdefault(owner, [0, 0.0])
+            total[0] += count
+            total[1] += seconds
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.commands:
+            return
+        terminalreporter.write_sep('=', 'webdriver trace')
+        terminalreporter.write_line(
+            f"{self.commands} commands traced, tracing overhead {self.overhead * 1000:.1f} ms "
+            f"({self.overhead / self.commands * 1e6:.0f} us/command), files in {self.output_dir}"
+        )
+        ranked = sorted(self.totals.items(), key=lambda entry: -entry[1][1])[:self.top]
+        for owner, (count, seconds) in ranked:
+            terminalreporter.write_line(f"{seconds:>8.2f}s {count:>6} commands  {owner}")